@@ -0,0 +1,33 @@
+import os
+import sys
+
+# Настройки читаются при импорте src.config: задаём обязательные до импорта src.
+# Значения из окружения и .env имеют приоритет
+BENCH_DATABASE_URL = os.environ.get("BENCH_DATABASE_URL")
+if not BENCH_DATABASE_URL:
+    sys.exit("Set BENCH_DATABASE_URL to an empty PostgreSQL database: its schema is recreated")
+os.environ.setdefault("DATABASE_URL", BENCH_DATABASE_URL)
+os.environ.setdefault("API_HOST", "127.0.0.1")
+os.environ.setdefault("API_PORT", "8000")
+os.environ.setdefault("JWT_SECRET", "bench-secret")
+os.environ.setdefault("DOMAIN", "http://localhost")
+os.environ.setdefault("GOOGLE_AUTH_SECRET", "bench-google-secret")
+os.environ.setdefault("GOOGLE_AUTH_CLIENT_ID", "bench-client-id")
+os.environ["LLM_PROVIDER"] = "fake"
+
+from sqlalchemy.ext.asyncio import AsyncEngine  # noqa: E402
+
+from src import models  # noqa: E402,F401 — регистрирует таблицы в metadata
+from src.database import Base  # noqa: E402
+
+
+async def reset_schema(engine: AsyncEngine) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+
+def print_table(headers, rows) -> None:
+    widths = [max(len(str(value)) for value in column) for column in zip(headers, *rows)]
+    for row in (headers, *rows):
+        print("  ".join(str(value).rjust(width) for value, width in zip(row, widths)))
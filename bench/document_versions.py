@@ -0,0 +1,142 @@
+"""
+Хранение версий документа: полные копии против дельт с периодическими снимками.
+
+Один и тот же поток правок резюме (в каждой версии меняется одно поле)
+записывается двумя DocumentRepository: с snapshot_interval=1 — каждая версия
+целиком, как было раньше, — и с DOCUMENT_SNAPSHOT_INTERVAL. Сравниваются
+размер строк document_versions (pg_column_size, то есть после сжатия TOAST)
+и задержка get_version для случайных версий.
+
+    BENCH_DATABASE_URL=postgresql+asyncpg://... python -m bench.document_versions
+"""
+import argparse
+import asyncio
+import copy
+import random
+import statistics
+import time
+
+from bench.common import BENCH_DATABASE_URL, print_table, reset_schema
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src import models
+from src.config import settings
+from src.repositories.document_repository import DocumentRepository
+
+WORDS = (
+    "designed built migrated scaled owned led reduced latency throughput service "
+    "pipeline postgres kafka python api team platform billing search payments "
+    "observability reliability cost onboarding mentoring roadmap"
+).split()
+
+
+def _sentence(rng: random.Random, words: int = 14) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _resume(rng: random.Random) -> dict:
+    return {
+        "name": "Jane Doe",
+        "title": "Senior Backend Engineer",
+        "summary": " ".join(_sentence(rng) for _ in range(4)),
+        "skills": sorted(rng.sample(WORDS, 12)),
+        "experience": [
+            {
+                "company": f"Company {index}",
+                "position": "Backend Engineer",
+                "years": f"{2010 + index}-{2011 + index}",
+                "highlights": [_sentence(rng) for _ in range(5)],
+            }
+            for index in range(8)
+        ],
+        "education": [{"school": "State University", "degree": "BSc Computer Science"}],
+    }
+
+
+def _edit(rng: random.Random, content: dict) -> dict:
+    """Правка одного поля — типичное сохранение в редакторе."""
+    content = copy.deepcopy(content)
+    job = rng.choice(content["experience"])
+    job["highlights"][rng.randrange(len(job["highlights"]))] = _sentence(rng)
+    return content
+
+
+async def _write_history(session_maker, owner_id, contents, snapshot_interval: int):
+    async with session_maker() as session:
+        repo = DocumentRepository(session, snapshot_interval=snapshot_interval)
+        document = await repo.create_document(owner_id, contents[0])
+        await repo.commit()
+        for content in contents[1:]:
+            await repo.create_new_version(document.id, content)
+            await repo.commit()
+        return document.id
+
+
+async def _stored_bytes(session_maker, document_id) -> int:
+    version = models.DocumentVersion
+    async with session_maker() as session:
+        return await session.scalar(
+            select(
+                func.coalesce(func.sum(func.pg_column_size(version.content)), 0)
+                + func.coalesce(func.sum(func.pg_column_size(version.delta)), 0)
+            ).where(version.document_id == document_id)
+        )
+
+
+async def _read_latencies(session_maker, document_id, version_numbers, expected) -> list:
+    latencies = []
+    async with session_maker() as session:
+        repo = DocumentRepository(session)
+        for number in version_numbers:
+            started = time.perf_counter()
+            version = await repo.get_version(document_id, number)
+            latencies.append((time.perf_counter() - started) * 1000)
+            assert version.content == expected[number - 1]
+            await repo.release_connection()
+    return latencies
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--versions", type=int, default=200)
+    parser.add_argument("--reads", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    contents = [_resume(rng)]
+    for _ in range(args.versions - 1):
+        contents.append(_edit(rng, contents[-1]))
+    version_numbers = [rng.randint(1, args.versions) for _ in range(args.reads)]
+
+    engine = create_async_engine(BENCH_DATABASE_URL)
+    session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await reset_schema(engine)
+    async with session_maker() as session:
+        user = models.User(email="bench@example.com")
+        session.add(user)
+        await session.commit()
+
+    rows = []
+    for label, interval in (("full copies", 1), ("deltas", settings.DOCUMENT_SNAPSHOT_INTERVAL)):
+        document_id = await _write_history(session_maker, user.id, contents, interval)
+        stored = await _stored_bytes(session_maker, document_id)
+        latencies = await _read_latencies(session_maker, document_id, version_numbers, contents)
+        rows.append((
+            label,
+            interval,
+            args.versions,
+            f"{stored / 1024:.1f}",
+            f"{statistics.median(latencies):.2f}",
+            f"{statistics.quantiles(latencies, n=20)[-1]:.2f}",
+        ))
+    await engine.dispose()
+
+    print_table(("storage", "snapshot every", "versions", "KiB", "get p50 ms", "get p95 ms"), rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,122 @@
+"""
+Сколько одновременных ходов интервью проходит при маленьком пуле соединений.
+
+Каждый ход — InterviewChatService.send_message с фейковым провайдером,
+который отвечает через --latency-ms. Режим released — текущий код: соединение
+возвращается в пул на время вызова модели. Режим held подменяет
+release_connection на no-op и воспроизводит прежнее поведение, когда
+соединение было занято весь ход.
+
+    BENCH_DATABASE_URL=postgresql+asyncpg://... python -m bench.llm_pool_release
+
+При released время не зависит от размера пула, при held растёт как
+turns / pool_size * latency.
+"""
+import argparse
+import asyncio
+import time
+
+from bench.common import BENCH_DATABASE_URL, print_table, reset_schema
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src import models
+from src.models.interview import MessageRole
+from src.repositories.interview_repository import InterviewChatRepository
+from src.repositories.job_repository import JobRepository
+from src.services.interview_service import InterviewChatService
+from src.services.job_service import JobService
+from src.utils import ai
+from src.utils.llm.fake import FakeProvider
+
+
+async def _create_chats(session_maker, count: int):
+    async with session_maker() as session:
+        user = models.User(email="bench@example.com")
+        session.add(user)
+        await session.flush()
+        repo = InterviewChatRepository(session)
+        chat_ids = []
+        for _ in range(count):
+            chat = await repo.create_chat(user.id)
+            # После приветствия модели следующий ответ идёт через провайдера
+            await repo.add_messages(
+                chat.id,
+                [(MessageRole.USER, "Hi"), (MessageRole.ASSISTANT, "Hello! What position?")],
+            )
+            chat_ids.append(chat.id)
+        await session.commit()
+        return user.id, chat_ids
+
+
+async def _turn(session_maker, owner_id, chat_id) -> None:
+    async with session_maker() as session:
+        service = InterviewChatService(
+            InterviewChatRepository(session), JobService(JobRepository(session))
+        )
+        await service.send_message(chat_id, owner_id, "Backend developer, five years of Python")
+
+
+async def _run(pool_size: int, turns: int, held: bool) -> tuple:
+    engine = create_async_engine(BENCH_DATABASE_URL, pool_size=pool_size, max_overflow=0)
+    session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await reset_schema(engine)
+    owner_id, chat_ids = await _create_chats(session_maker, turns)
+
+    in_use = peak = 0
+
+    def on_checkout(*args) -> None:
+        nonlocal in_use, peak
+        in_use += 1
+        peak = max(peak, in_use)
+
+    def on_checkin(*args) -> None:
+        nonlocal in_use
+        in_use -= 1
+
+    event.listen(engine.sync_engine.pool, "checkout", on_checkout)
+    event.listen(engine.sync_engine.pool, "checkin", on_checkin)
+
+    original_release = InterviewChatRepository.release_connection
+    if held:
+        async def keep_connection(self) -> None:
+            pass
+
+        InterviewChatRepository.release_connection = keep_connection
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(_turn(session_maker, owner_id, chat_id) for chat_id in chat_ids))
+        elapsed = time.perf_counter() - started
+    finally:
+        InterviewChatRepository.release_connection = original_release
+        await engine.dispose()
+    return elapsed, peak
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--turns", type=int, default=30)
+    parser.add_argument("--latency-ms", type=float, default=500)
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[2, 5, 10])
+    args = parser.parse_args()
+
+    ai.provider = FakeProvider(latency_ms=args.latency_ms)
+    rows = []
+    for held in (False, True):
+        for pool_size in args.pool_sizes:
+            elapsed, peak = await _run(pool_size, args.turns, held)
+            rows.append((
+                "held" if held else "released",
+                pool_size,
+                args.turns,
+                f"{elapsed:.2f}",
+                f"{args.turns / elapsed:.1f}",
+                peak,
+            ))
+    print_table(("mode", "pool", "turns", "seconds", "turns/s", "peak conns"), rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,39 @@
+"""document current content
+
+Revision ID: 0d4b7c2e5f19
+Revises: f1c9d8e2a7b4
+Create Date: 2026-10-18 14:48:52.307145
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0d4b7c2e5f19'
+down_revision: Union[str, Sequence[str], None] = 'f1c9d8e2a7b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('documents', sa.Column('content', sa.JSON(), nullable=True))
+    op.execute(
+        """
+        UPDATE documents AS d
+        SET content = v.content
+        FROM document_versions AS v
+        WHERE v.document_id = d.id
+          AND v.version_number = d.current_version
+        """
+    )
+    op.execute("UPDATE documents SET content = '{}'::json WHERE content IS NULL")
+    op.alter_column('documents', 'content', nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('documents', 'content')
@@ -0,0 +1,41 @@
+"""keyset pagination indexes
+
+Revision ID: 3a8e6f0b2c71
+Revises: 0d4b7c2e5f19
+Create Date: 2026-10-18 15:26:37.840216
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a8e6f0b2c71'
+down_revision: Union[str, Sequence[str], None] = '0d4b7c2e5f19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Индексы покрывают ключ сортировки (created_at, id) целиком,
+    # поэтому любая страница читается одним range scan
+    with op.get_context().autocommit_block():
+        op.create_index('ix_documents_owner_id_created_at_id', 'documents', ['owner_id', 'created_at', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_interview_chats_owner_id_created_at_id', 'interview_chats', ['owner_id', 'created_at', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_interview_messages_chat_id_created_at_id', 'interview_messages', ['chat_id', 'created_at', 'id'], unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_documents_owner_id', table_name='documents', postgresql_concurrently=True)
+        op.drop_index('ix_interview_chats_owner_id_created_at', table_name='interview_chats', postgresql_concurrently=True)
+        op.drop_index('ix_interview_messages_chat_id_created_at', table_name='interview_messages', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_interview_messages_chat_id_created_at', 'interview_messages', ['chat_id', 'created_at'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_interview_chats_owner_id_created_at', 'interview_chats', ['owner_id', 'created_at'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_documents_owner_id', 'documents', ['owner_id'], unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_interview_messages_chat_id_created_at_id', table_name='interview_messages', postgresql_concurrently=True)
+        op.drop_index('ix_interview_chats_owner_id_created_at_id', table_name='interview_chats', postgresql_concurrently=True)
+        op.drop_index('ix_documents_owner_id_created_at_id', table_name='documents', postgresql_concurrently=True)
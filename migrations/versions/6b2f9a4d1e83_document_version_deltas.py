@@ -0,0 +1,117 @@
+"""document version deltas
+
+Revision ID: 6b2f9a4d1e83
+Revises: 3a8e6f0b2c71
+Create Date: 2026-10-18 16:02:11.418305
+
+"""
+import json
+from typing import Any, List, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6b2f9a4d1e83'
+down_revision: Union[str, Sequence[str], None] = '3a8e6f0b2c71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Интервал снимков на момент миграции; код читает любой интервал,
+# поэтому его последующее изменение не требует пересчёта
+SNAPSHOT_INTERVAL = 10
+
+
+# Копия src.utils.json_delta: миграция не должна зависеть от кода приложения
+def _diff(old: Any, new: Any, path: Sequence[Any] = ()) -> List[list]:
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops: List[list] = []
+        for key in old:
+            if key not in new:
+                ops.append(["del", [*path, key]])
+        for key, value in new.items():
+            if key not in old:
+                ops.append(["set", [*path, key], value])
+            elif old[key] != value:
+                ops.extend(_diff(old[key], value, (*path, key)))
+        return ops
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        ops = []
+        for index, (old_item, new_item) in enumerate(zip(old, new)):
+            if old_item != new_item:
+                ops.extend(_diff(old_item, new_item, (*path, index)))
+        return ops
+    if old == new:
+        return []
+    return [["set", list(path), new]]
+
+
+def _apply(base: Any, ops: List[list]) -> Any:
+    result = json.loads(json.dumps(base))
+    for op_ in ops:
+        action, path = op_[0], op_[1]
+        if not path:
+            result = op_[2] if action == "set" else None
+            continue
+        target = result
+        for key in path[:-1]:
+            target = target[key]
+        if action == "set":
+            target[path[-1]] = op_[2]
+        else:
+            target.pop(path[-1], None)
+    return result
+
+
+def _document_ids(bind) -> List[Any]:
+    return list(bind.execute(sa.text("SELECT id FROM documents")).scalars())
+
+
+def _versions(bind, document_id):
+    return bind.execute(
+        sa.text(
+            "SELECT id, version_number, content, delta FROM document_versions "
+            "WHERE document_id = :document_id ORDER BY version_number"
+        ),
+        {"document_id": document_id},
+    ).all()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('document_versions', sa.Column('delta', sa.JSON(), nullable=True))
+    op.alter_column('document_versions', 'content', existing_type=sa.JSON(), nullable=True)
+
+    bind = op.get_bind()
+    to_delta = sa.text(
+        "UPDATE document_versions SET content = NULL, delta = CAST(:delta AS json) "
+        "WHERE id = :id"
+    )
+    for document_id in _document_ids(bind):
+        previous = None
+        for row in _versions(bind, document_id):
+            if previous is not None and (row.version_number - 1) % SNAPSHOT_INTERVAL != 0:
+                bind.execute(to_delta, {"id": row.id, "delta": json.dumps(_diff(previous, row.content))})
+            previous = row.content
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    to_snapshot = sa.text(
+        "UPDATE document_versions SET content = CAST(:content AS json), delta = NULL "
+        "WHERE id = :id"
+    )
+    for document_id in _document_ids(bind):
+        content = None
+        for row in _versions(bind, document_id):
+            if row.content is not None:
+                content = row.content
+                continue
+            content = _apply(content, row.delta)
+            bind.execute(to_snapshot, {"id": row.id, "content": json.dumps(content)})
+
+    op.execute("UPDATE document_versions SET content = '{}'::json WHERE content IS NULL")
+    op.alter_column('document_versions', 'content', existing_type=sa.JSON(), nullable=False)
+    op.drop_column('document_versions', 'delta')
@@ -0,0 +1,60 @@
+"""document content jsonb
+
+Revision ID: 9e4c1a7b3d52
+Revises: 6b2f9a4d1e83
+Create Date: 2026-10-18 16:31:45.092716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4c1a7b3d52'
+down_revision: Union[str, Sequence[str], None] = '6b2f9a4d1e83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = [
+    ('documents', 'content'),
+    ('document_versions', 'content'),
+    ('document_versions', 'delta'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, column in COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=postgresql.JSONB(),
+            existing_type=sa.JSON(),
+            postgresql_using=f'{column}::jsonb',
+        )
+
+    # Выражения должны совпадать с теми, что строит DocumentRepository.list_by_owner
+    with op.get_context().autocommit_block():
+        op.create_index('ix_documents_content_path_ops', 'documents', ['content'], unique=False, postgresql_using='gin', postgresql_ops={'content': 'jsonb_path_ops'}, postgresql_concurrently=True)
+        op.create_index('ix_documents_content_fts', 'documents', [sa.text("""jsonb_to_tsvector('simple'::regconfig, content, '["string"]'::jsonb)""")], unique=False, postgresql_using='gin', postgresql_concurrently=True)
+        op.create_index('ix_documents_owner_id_aimark', 'documents', ['owner_id', sa.text("coalesce(content -> 'aimark', 'null'::jsonb)"), 'created_at', 'id'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_documents_owner_id_aimark', table_name='documents', postgresql_concurrently=True)
+        op.drop_index('ix_documents_content_fts', table_name='documents', postgresql_concurrently=True)
+        op.drop_index('ix_documents_content_path_ops', table_name='documents', postgresql_concurrently=True)
+
+    for table, column in COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=sa.JSON(),
+            existing_type=postgresql.JSONB(),
+            postgresql_using=f'{column}::json',
+        )
@@ -0,0 +1,91 @@
+"""hot lookup indexes
+
+Revision ID: f1c9d8e2a7b4
+Revises: e7a3b5f91d26
+Create Date: 2026-10-18 14:11:09.562871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c9d8e2a7b4'
+down_revision: Union[str, Sequence[str], None] = 'e7a3b5f91d26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+VERSIONS_UNIQUE_INDEX = 'uq_document_versions_document_id_version_number'
+INDEXES = (
+    VERSIONS_UNIQUE_INDEX,
+    'ix_documents_owner_id',
+    'ix_interview_chats_owner_id_created_at',
+    'ix_interview_messages_chat_id_created_at',
+)
+
+
+def _drop_invalid_indexes() -> None:
+    """Оборванный CREATE INDEX CONCURRENTLY оставляет INVALID-индекс — убираем перед повтором."""
+    invalid = op.get_bind().execute(
+        sa.text(
+            "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE NOT i.indisvalid AND c.relname = ANY(:names)"
+        ),
+        {"names": list(INDEXES)},
+    ).scalars().all()
+    for name in invalid:
+        op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+
+
+def _dedupe_document_versions() -> None:
+    """
+    Старый create_new_version при параллельных правках мог записать два
+    раза один и тот же номер версии. Оставляем последнюю запись каждого
+    номера: documents.current_version указывает на номер, а из двух
+    одновременных правок в силе осталась последняя.
+    """
+    op.execute(
+        """
+        DELETE FROM document_versions dv
+        USING (
+            SELECT id, row_number() OVER (
+                PARTITION BY document_id, version_number
+                ORDER BY created_at DESC, id DESC
+            ) AS rn
+            FROM document_versions
+        ) ranked
+        WHERE dv.id = ranked.id AND ranked.rn > 1
+        """
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY не блокирует запись в большие таблицы, но не работает внутри транзакции
+    with op.get_context().autocommit_block():
+        _drop_invalid_indexes()
+        _dedupe_document_versions()
+        try:
+            op.create_index(VERSIONS_UNIQUE_INDEX, 'document_versions', ['document_id', 'version_number'], unique=True, postgresql_concurrently=True, if_not_exists=True)
+        except sa.exc.IntegrityError as e:
+            _drop_invalid_indexes()
+            raise RuntimeError(
+                "document_versions got new duplicate (document_id, version_number) rows "
+                "while the unique index was being built; stop writers running the old "
+                "code and re-run the migration"
+            ) from e
+        op.create_index(op.f('ix_documents_owner_id'), 'documents', ['owner_id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_interview_chats_owner_id_created_at', 'interview_chats', ['owner_id', 'created_at'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_interview_messages_chat_id_created_at', 'interview_messages', ['chat_id', 'created_at'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_interview_messages_chat_id_created_at', table_name='interview_messages', postgresql_concurrently=True)
+        op.drop_index('ix_interview_chats_owner_id_created_at', table_name='interview_chats', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_documents_owner_id'), table_name='documents', postgresql_concurrently=True)
+        op.drop_index('uq_document_versions_document_id_version_number', table_name='document_versions', postgresql_concurrently=True)
@@ -1,9 +1,19 @@
+import math
 from typing import Dict, Any
 
 from fastapi import Request
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
-from starlette.status import HTTP_422_UNPROCESSABLE_ENTITY
+from starlette.status import (
+    HTTP_422_UNPROCESSABLE_ENTITY,
+    HTTP_429_TOO_MANY_REQUESTS,
+    HTTP_503_SERVICE_UNAVAILABLE,
+    HTTP_504_GATEWAY_TIMEOUT,
+)
+
+from src.utils.passwords import PasswordHasherBusyError
+from src.utils.rate_limit import RateLimitExceededError
+from src.utils.resilience import LLMTimeoutError, LLMUnavailableError
 
 def _get_field_from_loc(loc: tuple[Any, ...]) -> str:
     """
@@ -51,4 +61,35 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
                 _format_validation_error(err) for err in exc.errors()
             ],
         },
-    )
\ No newline at end of file
+    )
+
+
+async def llm_unavailable_handler(request: Request, exc: LLMUnavailableError):
+    return JSONResponse(
+        status_code=HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "AI service is temporarily unavailable"},
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+    )
+
+
+async def llm_timeout_handler(request: Request, exc: LLMTimeoutError):
+    return JSONResponse(
+        status_code=HTTP_504_GATEWAY_TIMEOUT,
+        content={"detail": "AI service did not respond in time"},
+    )
+
+
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusyError):
+    return JSONResponse(
+        status_code=HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Authentication service is busy, try again later"},
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+    )
+
+
+async def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceededError):
+    return JSONResponse(
+        status_code=HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": "Too many requests"},
+        headers=exc.result.headers(),
+    )
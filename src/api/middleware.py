@@ -0,0 +1,137 @@
+import json
+import logging
+import math
+import random
+import time
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from starlette.datastructures import MutableHeaders
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.status import HTTP_429_TOO_MANY_REQUESTS
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config import settings
+from src.database import db_router
+from src.dependencies.rate_limit import client_ip, record_rate_limit
+from src.services.rate_limit_service import IP_LIMIT, USER_LIMIT, rate_limit_service
+from src.utils.jwt import request_user_id
+from src.utils.timing import start_timing, stop_timing, current_timing
+
+timing_logger = logging.getLogger("src.request_timing")
+
+RATE_LIMIT_EXEMPT_PATHS = {"/api/ping", "/api/docs", "/api/redoc", "/openapi.json"}
+
+
+class RateLimitMiddleware(BaseHTTPMiddleware):
+    """
+    Общие бакеты на IP и на пользователя для всех запросов.
+    Бакеты LLM-маршрутов проверяет зависимость llm_rate_limit.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        if (
+            not rate_limit_service.enabled
+            or request.method == "OPTIONS"
+            or request.url.path in RATE_LIMIT_EXEMPT_PATHS
+        ):
+            return await call_next(request)
+
+        record_rate_limit(request, await rate_limit_service.hit(IP_LIMIT, client_ip(request)))
+        user_id = request_user_id(request)
+        if user_id is not None:
+            record_rate_limit(request, await rate_limit_service.hit(USER_LIMIT, str(user_id)))
+
+        result = request.state.rate_limit
+        if not result.allowed:
+            return JSONResponse(
+                status_code=HTTP_429_TOO_MANY_REQUESTS,
+                content={"detail": "Too many requests"},
+                headers=result.headers(),
+            )
+
+        response = await call_next(request)
+        # Зависимость могла записать более строгий результат
+        response.headers.update(request.state.rate_limit.headers())
+        return response
+
+
+class ReadYourWritesMiddleware:
+    """
+    Ответ на запрос, который открыл сессию primary на запись, получает cookie
+    со временем записи. get_db по нему читает с primary в любом воркере.
+    Без реплик cookie не нужен и не выставляется.
+
+    Cookie уходит вместе с заголовками: потоковый ответ, который пишет
+    после начала тела, отсчитывает окно от начала ответа.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not db_router.replicas:
+            await self.app(scope, receive, send)
+            return
+
+        # Тот же dict, что и request.state у обработчика и зависимостей
+        state = scope.setdefault("state", {})
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and state.get("db_wrote"):
+                MutableHeaders(scope=message).append("Set-Cookie", _last_write_cookie())
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
+
+def _last_write_cookie() -> str:
+    max_age = math.ceil(settings.DB_READ_STICKY_SECONDS)
+    return (
+        f"{settings.DB_READ_STICKY_COOKIE}={time.time():.3f}; "
+        f"Max-Age={max_age}; Path=/; HttpOnly; SameSite=Lax"
+    )
+
+
+class ServerTimingMiddleware:
+    """
+    Для доли запросов sample_rate собирает разбивку времени по фазам,
+    отдаёт её в заголовке Server-Timing и пишет одну JSON-строку в лог.
+    Остальные запросы проходят без замеров. Чистый ASGI, а не
+    BaseHTTPMiddleware: ничего не добавляет к несэмплированным запросам
+    и досчитывает потоковые ответы до конца тела.
+    """
+
+    def __init__(self, app: ASGIApp, sample_rate: float):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+
+        token = start_timing()
+        timing = current_timing()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # У потоковых ответов заголовок уходит раньше тела:
+                # в нём только время до первого байта, полное — в логе
+                MutableHeaders(scope=message).append("Server-Timing", timing.header())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            stop_timing(token)
+            route = scope.get("route")
+            timing_logger.info(json.dumps({
+                "method": scope["method"],
+                "path": getattr(route, "path", scope["path"]),
+                "status": status_code,
+                **timing.summary(),
+            }))
@@ -1,6 +1,5 @@
 import urllib
 
-import httpx
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import RedirectResponse
 from starlette import status
@@ -8,7 +7,7 @@ from authlib.integrations.starlette_client import OAuth
 
 from src.config import settings
 from src.dependencies.auth import get_current_user
-from src.dependencies.misc import get_user_service
+from src.dependencies.misc import get_user_service, use_read_replica
 from src.schemas.user_schemas import (
     UserRegisterRequest,
     UserRegisterResponse,
@@ -18,6 +17,7 @@ from src.schemas.user_schemas import (
 )
 from src.services.user_service import UserService
 from src.utils import jwt
+from src.utils.google_oauth import GoogleOAuthError, google_oauth
 from src import utils
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -64,7 +64,7 @@ async def login(
         token=jwt.create_access_token(authenticated_user.id)
     )
 
-@router.get("/me", response_model=User)
+@router.get("/me", response_model=User, dependencies=[Depends(use_read_replica)])
 async def me(user: User = Depends(get_current_user)):
     return user
 
@@ -84,7 +84,7 @@ async def google_login():
         "access_type": "offline",
         "prompt": "consent",
     }
-    url = "https://accounts.google.com/o/oauth2/v2/auth?" + urllib.parse.urlencode(params)
+    url = settings.GOOGLE_AUTH_URL + "?" + urllib.parse.urlencode(params)
     return RedirectResponse(url)
 
 
@@ -97,38 +97,23 @@ async def google_callback(
     if not code:
         raise HTTPException(status_code=400, detail="Missing code")
 
-    token_url = "https://oauth2.googleapis.com/token"
-    data = {
-        "code": code,
-        "client_id": settings.GOOGLE_AUTH_CLIENT_ID,
-        "client_secret": settings.GOOGLE_AUTH_SECRET,
-        "redirect_uri": f"{settings.DOMAIN}/google/callback/",
-        "grant_type": "authorization_code",
-    }
-
-    async with httpx.AsyncClient() as client:
-        try:
-            token_res = await client.post(token_url, data=data)
-            token_res.raise_for_status()
-            tokens = token_res.json()
-
-            userinfo_res = await client.get(
-                "https://www.googleapis.com/oauth2/v3/userinfo",
-                headers={"Authorization": f"Bearer {tokens['access_token']}"}
-            )
-            userinfo_res.raise_for_status()
-            user_info = userinfo_res.json()
-        except:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Something went wrong while authenticating with Google."
-            )
+    # Один запрос к Google: данные пользователя берутся из проверенного id_token
+    try:
+        tokens = await google_oauth.exchange_code(
+            code, redirect_uri=f"{settings.DOMAIN}/google/callback/"
+        )
+        user_info = await google_oauth.verify_id_token(tokens.get("id_token", ""))
+    except GoogleOAuthError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Something went wrong while authenticating with Google."
+        )
 
     user = await user_service.register_or_login_google(
-        name=user_info["name"],
+        name=user_info.get("name") or user_info["email"],
         email=user_info["email"],
     )
 
     token = jwt.create_access_token(user.id)
 
-    return {"token": token, "user": user}
\ No newline at end of file
+    return {"token": token, "user": user}
@@ -1,14 +1,20 @@
 # src/routers/document_router.py (или src/api/routes/documents.py)
-from typing import List
+from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+
+from src.config import settings
 
 from src.dependencies.auth import get_current_user
-from src.dependencies.misc import get_document_service
+from src.dependencies.misc import get_document_service, use_read_replica
+from src.dependencies.rate_limit import llm_rate_limit
 from src.schemas.user_schemas import User
 from src.schemas import document_schemas as schemas
+from src.schemas.pagination import Page
 from src.services.document_service import DocumentService
+from src.utils.ndjson import iter_lines
 
 router = APIRouter(prefix="/documents", tags=["documents"])
 
@@ -25,62 +31,121 @@ async def create_document(
     )
     return doc
 
-@router.get("/", response_model=List[schemas.DocumentResponse])
+@router.get(
+    "/",
+    response_model=Page[schemas.DocumentResponse],
+    dependencies=[Depends(use_read_replica)],
+)
 async def list_documents(
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    min_score: Optional[float] = Query(None, description="Минимальная оценка aimark"),
+    max_score: Optional[float] = Query(None, description="Максимальная оценка aimark"),
+    q: Optional[str] = Query(None, description="Полнотекстовый поиск по строкам документа"),
+    contains: Optional[str] = Query(
+        None,
+        description='JSON-объект, который должен содержаться в документе, например {"skills": ["Kubernetes"]}',
+    ),
+    sort: schemas.DocumentSort = schemas.DocumentSort.CREATED_AT_DESC,
+    current_user: User = Depends(get_current_user),
+    document_service: DocumentService = Depends(get_document_service),
+):
+    try:
+        return await document_service.list_documents(
+            owner_id=current_user.id,
+            limit=limit,
+            cursor=cursor,
+            min_score=min_score,
+            max_score=max_score,
+            text=q,
+            contains=contains,
+            sort=sort,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+@router.get("/export", dependencies=[Depends(use_read_replica)])
+async def export_documents(
+    with_versions: bool = False,
+    current_user: User = Depends(get_current_user),
+    document_service: DocumentService = Depends(get_document_service),
+):
+    return StreamingResponse(
+        document_service.export_documents(current_user.id, with_versions),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.post(
+    "/import",
+    response_model=schemas.DocumentImportResult,
+    dependencies=[Depends(llm_rate_limit)],
+)
+async def import_documents(
+    request: Request,
+    score: bool = False,
     current_user: User = Depends(get_current_user),
     document_service: DocumentService = Depends(get_document_service),
 ):
-    return await document_service.list_documents(owner_id=current_user.id)
+    lines = iter_lines(request.stream(), settings.DOCUMENT_IMPORT_MAX_LINE_BYTES)
+    return await document_service.import_documents(
+        owner_id=current_user.id,
+        lines=lines,
+        schedule_scoring=score,
+    )
+
 
-@router.get("/{document_id}", response_model=schemas.DocumentResponse)
+@router.get(
+    "/{document_id}",
+    response_model=schemas.DocumentResponse,
+    dependencies=[Depends(use_read_replica)],
+)
 async def get_document(
     document_id: UUID,
     current_user: User = Depends(get_current_user),
     document_service: DocumentService = Depends(get_document_service),
 ):
-    doc = await document_service.get_document(document_id)
+    # Чужой документ не находится запросом и выглядит как несуществующий
+    doc = await document_service.get_document(document_id, owner_id=current_user.id)
     if not doc:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Document not found",
         )
-    if doc.owner_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not allowed",
-        )
     return doc
 
 
-@router.put("/{document_id}", response_model=schemas.DocumentResponse)
+@router.put(
+    "/{document_id}",
+    response_model=schemas.DocumentResponse,
+    dependencies=[Depends(llm_rate_limit)],
+)
 async def update_document(
     document_id: UUID,
     body: schemas.DocumentUpdateRequest,
     current_user: User = Depends(get_current_user),
     document_service: DocumentService = Depends(get_document_service),
 ):
-    doc = await document_service.get_document(document_id)
-    if not doc:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Document not found",
-        )
-    if doc.owner_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not allowed",
-        )
-
     updated = await document_service.update_document(
         document_id=document_id,
         content=body.content,
+        owner_id=current_user.id,
     )
+    if not updated:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found",
+        )
     return updated
 
 
 @router.get(
     "/{document_id}/versions/{version_number}",
     response_model=schemas.DocumentVersionResponse,
+    dependencies=[Depends(use_read_replica)],
 )
 async def get_document_version(
     document_id: UUID,
@@ -88,21 +153,10 @@ async def get_document_version(
     current_user: User = Depends(get_current_user),
     document_service: DocumentService = Depends(get_document_service),
 ):
-    doc = await document_service.get_document(document_id)
-    if not doc:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Document not found",
-        )
-    if doc.owner_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not allowed",
-        )
-
     version = await document_service.get_document_version(
         document_id=document_id,
         version_number=version_number,
+        owner_id=current_user.id,
     )
     if not version:
         raise HTTPException(
@@ -118,17 +172,10 @@ async def delete_document(
     current_user: User = Depends(get_current_user),
     document_service: DocumentService = Depends(get_document_service),
 ):
-    doc = await document_service.get_document(document_id)
-    if not doc:
+    deleted = await document_service.delete_document(document_id, owner_id=current_user.id)
+    if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Document not found",
         )
-    if doc.owner_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not allowed",
-        )
-
-    await document_service.delete_document(document_id)
-    return {"success": True}
\ No newline at end of file
+    return {"success": True}
@@ -1,17 +1,32 @@
+import json
 import uuid
-from typing import List
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 
+from src.config import settings
 from src.schemas.user_schemas import User
 from src.schemas import interview_schemas as schemas
+from src.schemas.pagination import Page
 from src.dependencies.auth import get_current_user
-from src.dependencies.misc import get_interview_chat_service
+from src.dependencies.misc import get_interview_chat_service, use_read_replica
+from src.dependencies.rate_limit import llm_rate_limit
 from src.services.interview_service import InterviewChatService
 
 router = APIRouter(prefix="/interview", tags=["interview-chat"])
 
 
+async def _to_sse(
+    events: AsyncIterator[Tuple[str, Dict[str, Any]]],
+) -> AsyncIterator[str]:
+    try:
+        async for event, data in events:
+            yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    finally:
+        await events.aclose()
+
+
 @router.post("/chats", response_model=schemas.InterviewChat)
 async def create_chat(
     chat_in: schemas.InterviewChatCreate,
@@ -27,22 +42,50 @@ async def create_chat(
     return chat
 
 
-@router.get("/chats", response_model=List[schemas.InterviewChat])
+@router.get(
+    "/chats",
+    response_model=Page[schemas.InterviewChat],
+    dependencies=[Depends(use_read_replica)],
+)
 async def list_chats(
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     service: InterviewChatService = Depends(get_interview_chat_service),
 ):
-
-    return await service.list_chats_for_user(owner_id=current_user.id)
-
-
-@router.get("/chats/{chat_id}", response_model=schemas.InterviewChatDetail)
+    try:
+        return await service.list_chats_for_user(
+            owner_id=current_user.id,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get(
+    "/chats/{chat_id}",
+    response_model=schemas.InterviewChatDetail,
+    dependencies=[Depends(use_read_replica)],
+)
 async def get_chat(
     chat_id: uuid.UUID,
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    tail: bool = False,
     current_user: User = Depends(get_current_user),
     service: InterviewChatService = Depends(get_interview_chat_service),
 ):
-    chat = await service.get_chat_detail(chat_id, current_user.id)
+    try:
+        chat = await service.get_chat_detail(
+            chat_id,
+            current_user.id,
+            limit=limit,
+            cursor=cursor,
+            tail=tail,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     if not chat:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chat not found")
     return chat
@@ -63,6 +106,7 @@ async def delete_chat(
 @router.post(
     "/chats/{chat_id}/messages",
     response_model=schemas.InterviewMessageWithReply,
+    dependencies=[Depends(llm_rate_limit)],
 )
 async def send_message(
     chat_id: uuid.UUID,
@@ -78,4 +122,25 @@ async def send_message(
     )
     if not res:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chat not found")
-    return res
\ No newline at end of file
+    return res
+
+
+@router.post("/chats/{chat_id}/messages/stream", dependencies=[Depends(llm_rate_limit)])
+async def stream_message(
+    chat_id: uuid.UUID,
+    message_in: schemas.InterviewMessageCreate,
+    current_user: User = Depends(get_current_user),
+    service: InterviewChatService = Depends(get_interview_chat_service),
+):
+    events = await service.stream_message(
+        chat_id=chat_id,
+        owner_id=current_user.id,
+        content=message_in.content,
+    )
+    if events is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chat not found")
+    return StreamingResponse(
+        _to_sse(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
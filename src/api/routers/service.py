@@ -1,7 +1,22 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+
+from src.database import db_router
+from src.dependencies.auth import require_metrics_token
+from src.utils import ai
 
 router = APIRouter()
 
 @router.get("/ping")
 async def test():
-    return "pong"
\ No newline at end of file
+    return "pong"
+
+@router.get("/metrics/ai", dependencies=[Depends(require_metrics_token)])
+async def ai_metrics():
+    return {
+        "concurrency": ai.governor.snapshot(),
+        "resilience": ai.resilience.snapshot(),
+    }
+
+@router.get("/metrics/db", dependencies=[Depends(require_metrics_token)])
+async def db_metrics():
+    return {"replicas": db_router.snapshot()}
@@ -1,8 +1,22 @@
+from typing import List
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    # Реплики для только читающих обработчиков; пусто — всё идёт на primary
+    DATABASE_REPLICA_URLS: List[str] = []
+    DB_READ_STICKY_SECONDS: float = 5.0
+    # Cookie со временем последней записи: окно sticky действует во всех воркерах
+    DB_READ_STICKY_COOKIE: str = "db_last_write"
+    DB_REPLICA_RETRY_SECONDS: float = 30.0
+    DB_REPLICA_CONNECT_TIMEOUT_SECONDS: float = 2.0
+    # Логирование каждого SQL-запроса; заметно снижает пропускную способность
+    DB_ECHO: bool = False
+
+    # Доля запросов с разбивкой Server-Timing и строкой в логе; 0 — выключено
+    SERVER_TIMING_SAMPLE_RATE: float = 0.0
 
     API_HOST: str
     API_PORT: int
@@ -11,12 +25,108 @@ class Settings(BaseSettings):
 
     DOMAIN: str
 
+    # Токен для /api/metrics/* (заголовок X-Metrics-Token); пусто — эндпоинты выключены
+    METRICS_TOKEN: str = ""
+
     GOOGLE_AUTH_SECRET: str
     GOOGLE_AUTH_CLIENT_ID: str
+    # Адреса вынесены в настройки, чтобы можно было подставить локальный OAuth-сервер
+    GOOGLE_AUTH_URL: str = "https://accounts.google.com/o/oauth2/v2/auth"
+    GOOGLE_TOKEN_URL: str = "https://oauth2.googleapis.com/token"
+    GOOGLE_JWKS_URL: str = "https://www.googleapis.com/oauth2/v3/certs"
+    GOOGLE_JWKS_CACHE_SECONDS: float = 3600.0
+    GOOGLE_JWKS_MIN_REFRESH_SECONDS: float = 60.0
+    GOOGLE_HTTP_TIMEOUT_SECONDS: float = 10.0
+
+    PAGE_SIZE_DEFAULT: int = 50
+    PAGE_SIZE_MAX: int = 200
+
+    LLM_PROVIDER: str = "gemini"
 
-    GEMINI_API_KEY: str
+    GEMINI_API_KEY: str = ""
     GEMINI_MODEL: str = "gemini-2.5-flash"
 
+    FAKE_LLM_SEED: int = 0
+    FAKE_LLM_LATENCY_DISTRIBUTION: str = "fixed"
+    FAKE_LLM_LATENCY_MS: float = 0.0
+    FAKE_LLM_LATENCY_SPREAD_MS: float = 0.0
+    FAKE_LLM_ERROR_RATE: float = 0.0
+
+    AI_HTTP_MAX_CONNECTIONS: int = 64
+    AI_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 32
+    AI_MAX_CONCURRENT_INTERVIEW_REPLY: int = 32
+    AI_MAX_CONCURRENT_CHAT_TITLE: int = 8
+    AI_MAX_CONCURRENT_RESUME_SCORING: int = 8
+    AI_MAX_CONCURRENT_INTERVIEW_SUMMARY: int = 8
+
+    LLM_DEADLINE_INTERVIEW_REPLY_SECONDS: float = 30.0
+    LLM_DEADLINE_CHAT_TITLE_SECONDS: float = 10.0
+    LLM_DEADLINE_RESUME_SCORING_SECONDS: float = 90.0
+    LLM_DEADLINE_INTERVIEW_SUMMARY_SECONDS: float = 20.0
+    LLM_HEDGE_CALL_TYPES: List[str] = ["interview_reply"]
+    LLM_HEDGE_PERCENTILE: float = 0.95
+    LLM_HEDGE_MIN_SAMPLES: int = 20
+    LLM_MAX_RETRIES: int = 2
+    LLM_RETRY_BACKOFF_SECONDS: float = 0.5
+    LLM_RETRY_BUDGET_RATIO: float = 0.2
+    LLM_RETRY_BUDGET_MAX_TOKENS: float = 20.0
+    LLM_BREAKER_FAILURE_THRESHOLD: int = 5
+    LLM_BREAKER_OPEN_SECONDS: float = 30.0
+
+    INTERVIEW_CONTEXT_WINDOW_TURNS: int = 6
+    INTERVIEW_CONTEXT_SLIDE_TURNS: int = 4
+    INTERVIEW_CONTEXT_TOKEN_BUDGET: int = 6000
+
+    # Каждая N-я версия документа хранится целиком, остальные — дельтой
+    DOCUMENT_SNAPSHOT_INTERVAL: int = 10
+
+    DOCUMENT_EXPORT_BATCH_SIZE: int = 500
+    DOCUMENT_IMPORT_BATCH_SIZE: int = 500
+    DOCUMENT_IMPORT_MAX_LINE_BYTES: int = 1024 * 1024
+    DOCUMENT_IMPORT_MAX_REPORTED_ERRORS: int = 100
+
+    SCORING_DEBOUNCE_SECONDS: float = 5.0
+    SCORING_BATCH_MAX_SIZE: int = 10
+    SCORING_BATCH_MAX_WAIT_MS: int = 200
+
+    JOB_WORKER_CONCURRENCY: int = 8
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BASE_SECONDS: float = 5.0
+    JOB_RETRY_MAX_SECONDS: float = 600.0
+    JOB_LOCK_TIMEOUT_SECONDS: int = 300
+
+    # Work factor bcrypt; при изменении хэши пересчитываются при входе
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: float = 1.0
+
+    # Token bucket: BURST — допустимый всплеск, PER_MINUTE — скорость пополнения
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_STORE: str = "memory"  # memory | postgres
+    # За reverse proxy все клиенты приходят с адреса прокси и делят один
+    # IP-бакет; True берёт адрес из X-Forwarded-For — включать только если
+    # прокси свой и перезаписывает этот заголовок
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = False
+    RATE_LIMIT_IP_BURST: int = 100
+    RATE_LIMIT_IP_PER_MINUTE: float = 300
+    RATE_LIMIT_USER_BURST: int = 60
+    RATE_LIMIT_USER_PER_MINUTE: float = 120
+    RATE_LIMIT_LLM_BURST: int = 5
+    RATE_LIMIT_LLM_PER_MINUTE: float = 10
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+    RATE_LIMIT_STALE_SECONDS: float = 3600
+    RATE_LIMIT_PURGE_INTERVAL_SECONDS: float = 600
+
+    # Кэш пользователей для get_current_user; 0 — выключен
+    AUTH_USER_CACHE_SIZE: int = 10_000
+    AUTH_USER_CACHE_TTL_SECONDS: float = 60.0
+
+    SCORE_CACHE_TTL_SECONDS: int = 30 * 24 * 3600
+    SCORE_CACHE_LRU_SIZE: int = 1024
+    SCORE_CACHE_PURGE_INTERVAL_SECONDS: int = 3600
+
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
 
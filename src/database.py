@@ -1,19 +1,167 @@
+import asyncio
+import logging
+import time
+from typing import Any, List, Optional
+
+from fastapi import Request
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
 from .config import settings
+from .utils.cache import TTLCache
+from .utils.jwt import request_user_id
+from .utils.timing import install_sqlalchemy_timing
+
+logger = logging.getLogger(__name__)
 
-engine = create_async_engine(settings.DATABASE_URL, echo=True)
+engine = create_async_engine(settings.DATABASE_URL, echo=settings.DB_ECHO)
 async_session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 Base = declarative_base()
 
+replica_engines = [
+    create_async_engine(
+        url,
+        echo=settings.DB_ECHO,
+        connect_args={"timeout": settings.DB_REPLICA_CONNECT_TIMEOUT_SECONDS},
+    )
+    for url in settings.DATABASE_REPLICA_URLS
+]
+
+if settings.SERVER_TIMING_SAMPLE_RATE > 0:
+    for _engine in (engine, *replica_engines):
+        install_sqlalchemy_timing(_engine)
+
+# Сколько пользователей с недавней записью помнит процесс
+STICKY_USERS_MAX = 100_000
+
+
+class ReplicaRouter:
+    """
+    Выбирает сессию для запроса. Только читающие обработчики идут на реплики
+    по кругу, всё остальное — на primary. Пользователь, который недавно писал,
+    sticky_seconds читает с primary, чтобы видеть свои изменения несмотря
+    на отставание реплик. Реплика, к которой не удалось подключиться,
+    исключается на retry_seconds.
+
+    Время записи приходит от клиента в cookie (см. ReadYourWritesMiddleware),
+    поэтому окно действует в любом воркере. Память процесса — запасной путь
+    для клиентов без cookie и работает только в том воркере, где была запись.
+    """
+
+    def __init__(
+        self,
+        primary: sessionmaker,
+        replicas: List[sessionmaker],
+        sticky_seconds: float,
+        retry_seconds: float,
+    ):
+        self.primary = primary
+        self.replicas = replicas
+        self.sticky_seconds = sticky_seconds
+        self.retry_seconds = retry_seconds
+        self._next = 0
+        self._unhealthy_until = [0.0] * len(replicas)
+        self._recent_writers: TTLCache[Any, bool] = TTLCache(
+            maxsize=STICKY_USERS_MAX, ttl=sticky_seconds
+        )
+
+    def record_write(self, user_key: Any) -> None:
+        if user_key is not None:
+            self._recent_writers.set(user_key, True)
+
+    def _is_sticky(self, user_key: Any, last_write_at: Optional[float]) -> bool:
+        # Время из cookie в будущем не продлевает окно
+        if last_write_at is not None and 0 <= time.time() - last_write_at < self.sticky_seconds:
+            return True
+        return user_key is not None and self._recent_writers.get(user_key) is not None
+
+    def _pick_replica(self) -> Optional[int]:
+        now = time.monotonic()
+        for _ in range(len(self.replicas)):
+            index = self._next % len(self.replicas)
+            self._next += 1
+            if self._unhealthy_until[index] <= now:
+                return index
+        return None
+
+    async def open_session(
+        self,
+        read_only: bool,
+        user_key: Any = None,
+        last_write_at: Optional[float] = None,
+    ) -> AsyncSession:
+        if read_only and not self._is_sticky(user_key, last_write_at):
+            index = self._pick_replica()
+            if index is not None:
+                session = self.replicas[index]()
+                try:
+                    # Соединение берётся сразу: недоступность реплики видна
+                    # до того, как обработчик начнёт работу
+                    await session.connection()
+                    return session
+                except (OSError, SQLAlchemyError, asyncio.TimeoutError):
+                    await session.close()
+                    self._unhealthy_until[index] = time.monotonic() + self.retry_seconds
+                    logger.warning("Read replica #%s is unavailable, using primary", index)
+        return self.primary()
+
+    def snapshot(self) -> List[dict]:
+        now = time.monotonic()
+        return [
+            {"replica": index, "healthy": until <= now}
+            for index, until in enumerate(self._unhealthy_until)
+        ]
+
+
+db_router = ReplicaRouter(
+    primary=async_session_maker,
+    replicas=[
+        sessionmaker(replica, class_=AsyncSession, expire_on_commit=False)
+        for replica in replica_engines
+    ],
+    sticky_seconds=settings.DB_READ_STICKY_SECONDS,
+    retry_seconds=settings.DB_REPLICA_RETRY_SECONDS,
+)
+
+
+def request_last_write_at(request: Request) -> Optional[float]:
+    """Время последней записи клиента (unix time) из cookie или None."""
+    try:
+        return float(request.cookies[settings.DB_READ_STICKY_COOKIE])
+    except (KeyError, ValueError):
+        return None
+
+
+async def get_db(request: Request):
+    """
+    Единица работы запроса: все репозитории запроса делят эту сессию и
+    не коммитят сами — сервис фиксирует изменения один раз в конце.
+    Если обработчик упал, незафиксированные изменения откатываются.
+
+    Обработчики, помеченные use_read_replica, получают сессию реплики.
+    """
+    read_only = request.method in ("GET", "HEAD") and getattr(
+        request.state, "db_read_only", False
+    )
+    user_key = request_user_id(request)
+    if not read_only:
+        db_router.record_write(user_key)
+        # ReadYourWritesMiddleware выставит cookie в ответе
+        request.state.db_wrote = True
 
-async def get_db():
-    async with async_session_maker() as session:
+    session = await db_router.open_session(read_only, user_key, request_last_write_at(request))
+    async with session:
         try:
             yield session
+        except Exception:
+            await session.rollback()
+            raise
         finally:
             await session.close()
+            if not read_only:
+                # Окно отсчитывается и от конца записи, а не только от её начала
+                db_router.record_write(user_key)
 
 
 async def get_db_session() -> AsyncSession:
-    return async_session_maker()
\ No newline at end of file
+    return async_session_maker()
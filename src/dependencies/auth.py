@@ -1,38 +1,48 @@
-from fastapi import Depends, HTTPException, Request
+import secrets
+from typing import Optional
+
+from fastapi import Depends, Header, HTTPException, Request
 from starlette import status
 
+from src.config import settings
 from src.dependencies.misc import get_user_service
 from src.schemas import User
 from src.services.user_service import UserService
-from src.utils.jwt import decode_access_token
+from src.utils.jwt import request_user_id
 
 
 async def get_current_user(
     request: Request,
     user_service: UserService = Depends(get_user_service),
 ) -> User:
-    auth_header = request.headers.get("Authorization")
-
-    if not auth_header or not auth_header.startswith("Bearer "):
+    user_id = request_user_id(request)
+    if not user_id:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Unauthenticated",
         )
 
-    token = auth_header[len("Bearer "):].strip()
-
-    user_id = decode_access_token(token)
-    if not user_id:
+    user = await user_service.get(user_id)
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Unauthenticated",
         )
 
-    user = await user_service.get(user_id)
-    if not user:
+    return user
+
+
+async def require_metrics_token(
+    x_metrics_token: Optional[str] = Header(None),
+) -> None:
+    """
+    Метрики раскрывают внутреннюю ёмкость и счётчики отказов, поэтому
+    доступны только с METRICS_TOKEN. Без токена в настройках их нет вовсе.
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not x_metrics_token or not secrets.compare_digest(x_metrics_token, settings.METRICS_TOKEN):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Unauthenticated",
         )
-
-    return user
\ No newline at end of file
@@ -1,15 +1,27 @@
-from fastapi import Depends
+from fastapi import Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database import get_db
 from src.repositories.document_repository import DocumentRepository
 from src.repositories.interview_repository import InterviewChatRepository
+from src.repositories.job_repository import JobRepository
+from src.repositories.score_cache_repository import ScoreCacheRepository
 from src.repositories.user_repository import UserRepository
 from src.services.document_service import DocumentService
 from src.services.interview_service import InterviewChatService
+from src.services.job_service import JobService
+from src.services.score_cache_service import ScoreCacheService
 from src.services.user_service import UserService
 
 
+async def use_read_replica(request: Request) -> None:
+    """
+    Помечает обработчик как только читающий: get_db отдаст ему сессию реплики.
+    Подключается через dependencies=[...] маршрута, чтобы выполниться раньше get_db.
+    """
+    request.state.db_read_only = True
+
+
 async def get_user_repository(
         session: AsyncSession = Depends(get_db),
 ) -> UserRepository:
@@ -26,14 +38,29 @@ async def get_document_repository(session: AsyncSession = Depends(get_db), ) ->
     return DocumentRepository(session)
 
 
+async def get_score_cache_service(
+        session: AsyncSession = Depends(get_db),
+) -> ScoreCacheService:
+    return ScoreCacheService(ScoreCacheRepository(session))
+
+
+async def get_job_service(
+        session: AsyncSession = Depends(get_db),
+) -> JobService:
+    return JobService(JobRepository(session))
+
+
 async def get_document_service(
         document_repository: DocumentRepository = Depends(get_document_repository),
+        score_cache_service: ScoreCacheService = Depends(get_score_cache_service),
+        job_service: JobService = Depends(get_job_service),
 ) -> DocumentService:
-    return DocumentService(document_repository)
+    return DocumentService(document_repository, score_cache_service, job_service)
 
 
 async def get_interview_chat_service(
         session: AsyncSession = Depends(get_db),
+        job_service: JobService = Depends(get_job_service),
 ) -> InterviewChatService:
     repo = InterviewChatRepository(session)
-    return InterviewChatService(repo)
+    return InterviewChatService(repo, job_service)
@@ -0,0 +1,42 @@
+from typing import Optional
+
+from fastapi import Depends, Request
+
+from src.config import settings
+from src.dependencies.auth import get_current_user
+from src.schemas import User
+from src.services.rate_limit_service import LLM_LIMIT, rate_limit_service
+from src.utils.rate_limit import RateLimitExceededError, RateLimitResult
+
+
+def client_ip(request: Request) -> str:
+    if settings.RATE_LIMIT_TRUST_FORWARDED_FOR:
+        # Только за своим прокси: иначе клиент подставит любой адрес
+        forwarded = request.headers.get("X-Forwarded-For")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def record_rate_limit(request: Request, result: Optional[RateLimitResult]) -> None:
+    """В заголовки ответа попадает самый строгий из проверенных бакетов."""
+    if result is None:
+        return
+    current: Optional[RateLimitResult] = getattr(request.state, "rate_limit", None)
+    if (
+        current is None
+        or (current.allowed and not result.allowed)
+        or (current.allowed == result.allowed and result.remaining < current.remaining)
+    ):
+        request.state.rate_limit = result
+
+
+async def llm_rate_limit(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+) -> None:
+    """Отдельный бакет для маршрутов, которые вызывают LLM."""
+    result = await rate_limit_service.hit(LLM_LIMIT, str(current_user.id))
+    record_rate_limit(request, result)
+    if result is not None and not result.allowed:
+        raise RateLimitExceededError(result)
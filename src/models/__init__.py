@@ -2,5 +2,8 @@ from src.database import Base
 from src.models.user import User
 from src.models.document import Document, DocumentVersion
 from src.models.interview import InterviewMessage, InterviewChat
+from src.models.score_cache import ResumeScoreCache
+from src.models.job import Job, JobStatus
+from src.models.rate_limit import RateLimitBucket
 
-__all__ = ["Base", "User", "Document", "DocumentVersion", "InterviewMessage", "InterviewChat"]
\ No newline at end of file
+__all__ = ["Base", "User", "Document", "DocumentVersion", "InterviewMessage", "InterviewChat", "ResumeScoreCache", "Job", "JobStatus", "RateLimitBucket"]
\ No newline at end of file
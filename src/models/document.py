@@ -1,6 +1,7 @@
 import uuid
 
-from sqlalchemy import Column, String, UUID, ForeignKey, JSON, Integer, DateTime, func
+from sqlalchemy import Column, String, UUID, ForeignKey, Integer, DateTime, Index, func, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 
 from src.database import Base
@@ -8,11 +9,36 @@ from src.database import Base
 
 class Document(Base):
     __tablename__ = "documents"
+    __table_args__ = (
+        Index("ix_documents_owner_id_created_at_id", "owner_id", "created_at", "id"),
+        # Фильтры по содержимому: @> (containment) и полнотекстовый поиск по строкам
+        Index(
+            "ix_documents_content_path_ops",
+            "content",
+            postgresql_using="gin",
+            postgresql_ops={"content": "jsonb_path_ops"},
+        ),
+        Index(
+            "ix_documents_content_fts",
+            text("""jsonb_to_tsvector('simple'::regconfig, content, '["string"]'::jsonb)"""),
+            postgresql_using="gin",
+        ),
+        # Фильтр и keyset-сортировка по оценке
+        Index(
+            "ix_documents_owner_id_aimark",
+            "owner_id",
+            text("coalesce(content -> 'aimark', 'null'::jsonb)"),
+            "created_at",
+            "id",
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
 
     current_version = Column(Integer, nullable=False, default=1)
+    # Копия содержимого текущей версии: чтение документа не трогает историю
+    content = Column(JSONB, nullable=False)
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -22,18 +48,30 @@ class Document(Base):
         "DocumentVersion",
         back_populates="document",
         cascade="all, delete-orphan",
+        passive_deletes=True,
         order_by="DocumentVersion.version_number",
     )
 
 
 class DocumentVersion(Base):
     __tablename__ = "document_versions"
+    __table_args__ = (
+        Index(
+            "uq_document_versions_document_id_version_number",
+            "document_id",
+            "version_number",
+            unique=True,
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     document_id = Column(UUID(as_uuid=True), ForeignKey("documents.id", ondelete="CASCADE"))
 
     version_number = Column(Integer, nullable=False)
-    content = Column(JSON, nullable=False)
+    # Заполнено ровно одно из полей: content у полных снимков,
+    # delta (изменения относительно предыдущей версии) у остальных
+    content = Column(JSONB(none_as_null=True), nullable=True)
+    delta = Column(JSONB(none_as_null=True), nullable=True)
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
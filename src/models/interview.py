@@ -9,6 +9,8 @@ from sqlalchemy import (
     DateTime,
     Text,
     Enum,
+    Integer,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -24,6 +26,9 @@ class MessageRole(str, PyEnum):
 
 class InterviewChat(Base):
     __tablename__ = "interview_chats"
+    __table_args__ = (
+        Index("ix_interview_chats_owner_id_created_at_id", "owner_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"))
@@ -31,6 +36,10 @@ class InterviewChat(Base):
     title = Column(String, nullable=True)
     position = Column(String, nullable=True)
 
+    # Сжатое содержание старых сообщений, не попадающих в окно контекста
+    summary = Column(Text, nullable=True)
+    summarized_count = Column(Integer, nullable=False, default=0, server_default="0")
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(
         DateTime(timezone=True),
@@ -49,6 +58,9 @@ class InterviewChat(Base):
 
 class InterviewMessage(Base):
     __tablename__ = "interview_messages"
+    __table_args__ = (
+        Index("ix_interview_messages_chat_id_created_at_id", "chat_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     chat_id = Column(
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, String, Float, DateTime, func
+
+from src.database import Base
+
+
+class RateLimitBucket(Base):
+    """Общее для всех процессов состояние token bucket (RATE_LIMIT_STORE=postgres)."""
+
+    __tablename__ = "rate_limit_buckets"
+
+    key = Column(String, primary_key=True)
+    tokens = Column(Float, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, Integer, Text, DateTime, func
+
+from src.database import Base
+
+
+class ResumeScoreCache(Base):
+    __tablename__ = "resume_score_cache"
+
+    content_hash = Column(String(64), primary_key=True)
+    model = Column(String, primary_key=True)
+    prompt_version = Column(String, primary_key=True)
+
+    score = Column(Integer, nullable=False)
+    reason = Column(Text, nullable=False, default="")
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
@@ -1,48 +1,135 @@
-from typing import Optional, Dict, Any, List
+import uuid
+from itertools import groupby
+from typing import Optional, Dict, Any, List, Sequence
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import case, delete, exists, func, insert, literal, literal_column, select, tuple_, update
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from src import models
+from src.config import settings
+from src.schemas.document_schemas import DocumentSort
+from src.utils import json_delta
+from src.utils.pagination import Cursor
+
+# Ключи JSON подставляются литералами, а не параметрами: иначе выражение
+# в запросе не совпадёт с индексом
+AIMARK = func.coalesce(
+    models.Document.content.op("->", return_type=JSONB)(literal_column("'aimark'")),
+    literal_column("'null'::jsonb"),
+)
+SIMPLE_CONFIG = literal_column("'simple'::regconfig")
+CONTENT_TSVECTOR = func.jsonb_to_tsvector(
+    SIMPLE_CONFIG,
+    models.Document.content,
+    literal_column("""'["string"]'::jsonb"""),
+)
 
 
 class DocumentRepository:
-    def __init__(self, session: AsyncSession):
+    def __init__(
+        self,
+        session: AsyncSession,
+        snapshot_interval: int = settings.DOCUMENT_SNAPSHOT_INTERVAL,
+    ):
         self.session = session
+        self.snapshot_interval = max(1, snapshot_interval)
+
+    async def release_connection(self) -> None:
+        """
+        Завершает текущую транзакцию, чтобы соединение вернулось в пул
+        (например, перед долгим вызовом LLM). Загруженные объекты остаются доступны.
+        """
+        await self.session.commit()
+
+    async def commit(self) -> None:
+        await self.session.commit()
+
+    async def rollback(self) -> None:
+        await self.session.rollback()
 
     async def create_document(
         self,
         owner_id: UUID,
         content: Dict[str, Any],
     ) -> models.Document:
-        doc = models.Document(owner_id=owner_id, current_version=1)
-        self.session.add(doc)
-        await self.session.flush()
+        doc = await self.session.scalar(
+            insert(models.Document)
+            .values(owner_id=owner_id, current_version=1, content=content)
+            .returning(models.Document)
+        )
+        # Версия уходит в базу при коммите вместе с остальными изменениями запроса
+        self.session.add(self._new_version(doc.id, 1, None, content))
+        return doc
 
+    def _is_snapshot(self, version_number: int) -> bool:
+        return (version_number - 1) % self.snapshot_interval == 0
+
+    def _new_version(
+        self,
+        document_id: UUID,
+        version_number: int,
+        previous_content: Optional[Dict[str, Any]],
+        content: Dict[str, Any],
+    ) -> models.DocumentVersion:
+        """
+        Каждая snapshot_interval-я версия хранится целиком, остальные —
+        дельтой к предыдущей. Восстановление версии читает не больше
+        snapshot_interval строк.
+        """
         version = models.DocumentVersion(
-            document_id=doc.id,
-            version_number=1,
-            content=content,
+            document_id=document_id,
+            version_number=version_number,
         )
-        self.session.add(version)
-        await self.session.commit()
+        if previous_content is None or self._is_snapshot(version_number):
+            version.content = content
+        else:
+            version.delta = json_delta.diff(previous_content, content)
+        return version
 
-        query = (
-            select(models.Document)
-            .options(selectinload(models.Document.versions))
-            .where(models.Document.id == doc.id)
-        )
-        result = await self.session.execute(query)
-        return result.scalar_one()
+    @staticmethod
+    def _materialize(rows: List[models.DocumentVersion]) -> List[models.DocumentVersion]:
+        """
+        Применяет дельты по порядку, начиная со снимка. Возвращает новые
+        объекты, не привязанные к сессии, чтобы восстановленное содержимое
+        не записалось обратно в базу.
+        """
+        result = []
+        content: Optional[Dict[str, Any]] = None
+        for row in rows:
+            if row.content is not None:
+                content = row.content
+            elif content is not None:
+                content = json_delta.apply(content, row.delta)
+            else:
+                continue
+            result.append(
+                models.DocumentVersion(
+                    id=row.id,
+                    document_id=row.document_id,
+                    version_number=row.version_number,
+                    content=content,
+                    created_at=row.created_at,
+                )
+            )
+        return result
 
-    async def get_by_id(self, document_id: UUID) -> Optional[models.Document]:
-        stmt = (
-            select(models.Document)
-            .options(selectinload(models.Document.versions))
-            .where(models.Document.id == document_id)
-        )
+    @staticmethod
+    def _owned(document_id: UUID, owner_id: Optional[UUID]) -> List[Any]:
+        """Условия выборки документа; с owner_id чужой документ просто не находится."""
+        conditions = [models.Document.id == document_id]
+        if owner_id is not None:
+            conditions.append(models.Document.owner_id == owner_id)
+        return conditions
+
+    async def get_by_id(
+        self,
+        document_id: UUID,
+        owner_id: Optional[UUID] = None,
+    ) -> Optional[models.Document]:
+        """Читает только документ с содержимым текущей версии, без истории."""
+        stmt = select(models.Document).where(*self._owned(document_id, owner_id))
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
@@ -50,75 +137,238 @@ class DocumentRepository:
         self,
         document_id: UUID,
         version_number: int,
+        owner_id: Optional[UUID] = None,
     ) -> Optional[models.DocumentVersion]:
-        query = select(models.DocumentVersion).where(
-            models.DocumentVersion.document_id == document_id,
-            models.DocumentVersion.version_number == version_number,
+        base = (
+            select(func.max(models.DocumentVersion.version_number))
+            .where(
+                models.DocumentVersion.document_id == document_id,
+                models.DocumentVersion.version_number <= version_number,
+                models.DocumentVersion.content.is_not(None),
+            )
+            .scalar_subquery()
+        )
+        query = (
+            select(models.DocumentVersion)
+            .where(
+                models.DocumentVersion.document_id == document_id,
+                models.DocumentVersion.version_number.between(base, version_number),
+                exists().where(*self._owned(document_id, owner_id)),
+            )
+            .order_by(models.DocumentVersion.version_number)
         )
         result = await self.session.execute(query)
-        return result.scalar_one_or_none()
+        versions = self._materialize(list(result.scalars().all()))
+        if not versions or versions[-1].version_number != version_number:
+            return None
+        return versions[-1]
+
+    async def list_versions(self, document_id: UUID) -> List[models.DocumentVersion]:
+        versions = await self.list_versions_for_documents([document_id])
+        return versions.get(document_id, [])
+
+    async def list_versions_for_documents(
+        self,
+        document_ids: Sequence[UUID],
+    ) -> Dict[UUID, List[models.DocumentVersion]]:
+        """История нескольких документов одним запросом."""
+        if not document_ids:
+            return {}
+        query = (
+            select(models.DocumentVersion)
+            .where(models.DocumentVersion.document_id.in_(document_ids))
+            .order_by(
+                models.DocumentVersion.document_id,
+                models.DocumentVersion.version_number,
+            )
+        )
+        result = await self.session.execute(query)
+        return {
+            document_id: self._materialize(list(rows))
+            for document_id, rows in groupby(result.scalars(), key=lambda v: v.document_id)
+        }
+
+    async def insert_many(
+        self,
+        owner_id: UUID,
+        contents: Sequence[Dict[str, Any]],
+    ) -> List[UUID]:
+        """
+        Пакетная вставка новых документов: по одному многострочному INSERT
+        на документы и на их первые версии, без загрузки объектов обратно.
+        """
+        ids = [uuid.uuid4() for _ in contents]
+        await self.session.execute(
+            insert(models.Document.__table__),
+            [
+                {"id": document_id, "owner_id": owner_id, "current_version": 1, "content": content}
+                for document_id, content in zip(ids, contents)
+            ],
+        )
+        await self.session.execute(
+            insert(models.DocumentVersion.__table__),
+            [
+                {"id": uuid.uuid4(), "document_id": document_id, "version_number": 1, "content": content}
+                for document_id, content in zip(ids, contents)
+            ],
+        )
+        return ids
 
     async def create_new_version(
         self,
-        document: models.Document,
+        document_id: UUID,
         content: Dict[str, Any],
-    ) -> models.Document:
-        document.current_version += 1
-        new_version_number = document.current_version
+        owner_id: Optional[UUID] = None,
+    ) -> Optional[models.Document]:
+        """
+        Одним UPDATE ... RETURNING увеличивает номер версии и возвращает
+        прежнее содержимое для дельты. Подзапрос блокирует строку документа
+        до коммита, поэтому параллельные правки выстраиваются в очередь.
+        """
+        previous = (
+            select(models.Document.id, models.Document.content)
+            .where(*self._owned(document_id, owner_id))
+            .with_for_update()
+            .subquery()
+        )
+        stmt = (
+            update(models.Document)
+            .where(models.Document.id == previous.c.id)
+            .values(
+                current_version=models.Document.current_version + 1,
+                content=content,
+            )
+            .returning(models.Document, previous.c.content)
+            # Документ мог быть уже загружен в эту сессию: без populate_existing
+            # вернётся объект с прежним current_version
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        row = (await self.session.execute(stmt)).one_or_none()
+        if row is None:
+            return None
 
-        version = models.DocumentVersion(
-            document_id=document.id,
-            version_number=new_version_number,
-            content=content,
+        document, previous_content = row
+        self.session.add(
+            self._new_version(
+                document_id=document.id,
+                version_number=document.current_version,
+                previous_content=previous_content,
+                content=content,
+            )
         )
-        self.session.add(version)
-        self.session.add(document)
-        await self.session.commit()
-        await self.session.refresh(document)
         return document
 
-    async def update_version(
+    async def update_current_version_content(
             self,
-            document: models.Document,
+            document_id: UUID,
+            version_number: int,
             content: Dict[str, Any],
-            version_number: Optional[int] = None,
-    ) -> models.DocumentVersion:
-        if version_number is None:
-            version_number = document.current_version
-
-        stmt = (
-            select(models.DocumentVersion)
+    ) -> bool:
+        """
+        Перезаписывает содержимое версии, только если она всё ещё текущая.
+        False — документ успел получить новую версию, запись пропущена.
+        """
+        previous = (
+            select(models.Document.id, models.Document.content)
             .where(
-                models.DocumentVersion.document_id == document.id,
-                models.DocumentVersion.version_number == version_number,
+                models.Document.id == document_id,
+                models.Document.current_version == version_number,
             )
+            .with_for_update()
+            .subquery()
+        )
+        previous_content = await self.session.scalar(
+            update(models.Document)
+            .where(models.Document.id == previous.c.id)
+            .values(content=content)
+            .returning(previous.c.content)
+            .execution_options(synchronize_session=False)
         )
-        version = await self.session.scalar(stmt)
+        if previous_content is None:
+            return False
 
-        if version is None:
-            raise ValueError(
-                f"Version {version_number} for document {document.id} not found"
+        # Снимок перезаписывается целиком, к дельте дописываются
+        # изменения поверх прежнего содержимого
+        changes = json_delta.diff(previous_content, content)
+        is_snapshot = models.DocumentVersion.content.is_not(None)
+        await self.session.execute(
+            update(models.DocumentVersion)
+            .where(
+                models.DocumentVersion.document_id == document_id,
+                models.DocumentVersion.version_number == version_number,
             )
+            .values(
+                content=case((is_snapshot, literal(content, JSONB)), else_=None),
+                delta=case(
+                    (is_snapshot, None),
+                    else_=models.DocumentVersion.delta.op("||")(literal(changes, JSONB)),
+                ),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return True
 
-        version.content = content
-
-        self.session.add(version)
-        await self.session.commit()
-        await self.session.refresh(version)
-
-        return version
+    async def delete(self, document_id: UUID, owner_id: Optional[UUID] = None) -> bool:
+        # Версии удаляет ON DELETE CASCADE, загружать их не нужно
+        stmt = (
+            delete(models.Document)
+            .where(*self._owned(document_id, owner_id))
+            .returning(models.Document.id)
+        )
+        return await self.session.scalar(stmt) is not None
 
-    async def delete(self, document_id: UUID) -> None:
-        doc = await self.get_by_id(document_id)
-        if doc:
-            await self.session.delete(doc)
-            await self.session.commit()
+    async def list_by_owner(
+        self,
+        owner_id: UUID,
+        limit: int,
+        after: Optional[Cursor] = None,
+        min_score: Optional[float] = None,
+        max_score: Optional[float] = None,
+        text: Optional[str] = None,
+        contains: Optional[Dict[str, Any]] = None,
+        sort: DocumentSort = DocumentSort.CREATED_AT_DESC,
+    ) -> List[models.Document]:
+        """
+        Все фильтры выполняются в SQL: выражения совпадают с индексами
+        из модели Document, поэтому Postgres может их использовать.
+        """
+        keys = [models.Document.created_at, models.Document.id]
+        if sort in (DocumentSort.AIMARK_DESC, DocumentSort.AIMARK_ASC):
+            keys.insert(0, AIMARK)
+        descending = sort in (DocumentSort.CREATED_AT_DESC, DocumentSort.AIMARK_DESC)
 
-    async def list_by_owner(self, owner_id: UUID) -> List[models.Document]:
         query = (
             select(models.Document)
-            .options(selectinload(models.Document.versions))
             .where(models.Document.owner_id == owner_id)
+            .order_by(*(key.desc() if descending else key.asc() for key in keys))
+            .limit(limit)
         )
+
+        if min_score is not None or max_score is not None:
+            query = query.where(func.jsonb_typeof(AIMARK) == "number")
+            if min_score is not None:
+                query = query.where(AIMARK >= literal(min_score, JSONB))
+            if max_score is not None:
+                query = query.where(AIMARK <= literal(max_score, JSONB))
+        if text:
+            query = query.where(
+                CONTENT_TSVECTOR.op("@@")(func.plainto_tsquery(SIMPLE_CONFIG, text))
+            )
+        if contains:
+            query = query.where(models.Document.content.contains(contains))
+
+        if after is not None:
+            values = [after.created_at, after.id]
+            if len(keys) == 3:
+                if not after.sort_key:
+                    raise ValueError("Invalid cursor.")
+                values.insert(0, literal(after.sort_key[0], JSONB))
+            elif after.sort_key:
+                raise ValueError("Invalid cursor.")
+            if descending:
+                query = query.where(tuple_(*keys) < tuple_(*values))
+            else:
+                query = query.where(tuple_(*keys) > tuple_(*values))
+
         result = await self.session.execute(query)
-        return list(result.scalars().unique().all())
\ No newline at end of file
+        return list(result.scalars().all())
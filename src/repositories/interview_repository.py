@@ -1,31 +1,39 @@
 import uuid
-from typing import List, Optional
+from typing import List, Optional, Sequence, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import delete, func, insert, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.models.interview import InterviewChat, InterviewMessage, MessageRole
+from src.utils.pagination import Cursor, BEFORE
 
 
 class InterviewChatRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
+    async def release_connection(self) -> None:
+        """
+        Завершает текущую транзакцию, чтобы соединение вернулось в пул
+        (например, перед долгим вызовом LLM). Загруженные объекты остаются доступны.
+        """
+        await self.session.commit()
+
+    async def commit(self) -> None:
+        await self.session.commit()
+
     async def create_chat(
         self,
         owner_id: uuid.UUID,
         title: str | None = None,
         position: str | None = None,
     ) -> InterviewChat:
-        chat = InterviewChat(
-            owner_id=owner_id,
-            title=title,
-            position=position,
+        stmt = (
+            insert(InterviewChat)
+            .values(owner_id=owner_id, title=title, position=position)
+            .returning(InterviewChat)
         )
-        self.session.add(chat)
-        await self.session.commit()
-        await self.session.refresh(chat)
-        return chat
+        return await self.session.scalar(stmt)
 
     async def get_chat_by_id(
         self, chat_id: uuid.UUID, owner_id: uuid.UUID
@@ -38,20 +46,40 @@ class InterviewChatRepository:
         result = await self.session.execute(query)
         return result.scalar_one_or_none()
 
+    async def get_chat(self, chat_id: uuid.UUID) -> Optional[InterviewChat]:
+        query = select(InterviewChat).where(InterviewChat.id == chat_id)
+        result = await self.session.execute(query)
+        return result.scalar_one_or_none()
+
     async def list_chats_for_user(
-        self, owner_id: uuid.UUID
+        self,
+        owner_id: uuid.UUID,
+        limit: int,
+        after: Optional[Cursor] = None,
     ) -> List[InterviewChat]:
         query = (
             select(InterviewChat)
             .where(InterviewChat.owner_id == owner_id)
-            .order_by(InterviewChat.created_at.desc())
+            .order_by(InterviewChat.created_at.desc(), InterviewChat.id.desc())
+            .limit(limit)
         )
+        if after is not None:
+            query = query.where(
+                tuple_(InterviewChat.created_at, InterviewChat.id)
+                < tuple_(after.created_at, after.id)
+            )
         result = await self.session.execute(query)
         return result.scalars().all()
 
-    async def delete_chat(self, chat: InterviewChat) -> None:
-        await self.session.delete(chat)
-        await self.session.commit()
+    async def delete_chat(self, chat_id: uuid.UUID, owner_id: uuid.UUID) -> bool:
+        # Сообщения удаляет ON DELETE CASCADE
+        stmt = (
+            delete(InterviewChat)
+            .where(InterviewChat.id == chat_id)
+            .where(InterviewChat.owner_id == owner_id)
+            .returning(InterviewChat.id)
+        )
+        return await self.session.scalar(stmt) is not None
 
     async def add_message(
         self,
@@ -59,30 +87,115 @@ class InterviewChatRepository:
         role: MessageRole,
         content: str,
     ) -> InterviewMessage:
-        msg = InterviewMessage(chat_id=chat_id, role=role, content=content)
-        self.session.add(msg)
-        await self.session.commit()
-        await self.session.refresh(msg)
+        [msg] = await self.add_messages(chat_id, [(role, content)])
         return msg
 
+    async def add_messages(
+        self,
+        chat_id: uuid.UUID,
+        messages: Sequence[Tuple[MessageRole, str]],
+    ) -> List[InterviewMessage]:
+        """
+        Вставляет сообщения одним INSERT ... RETURNING в заданном порядке.
+        clock_timestamp(), в отличие от now(), растёт внутри транзакции,
+        поэтому порядок (created_at, id) совпадает с порядком вставки.
+        """
+        stmt = (
+            insert(InterviewMessage)
+            .values([
+                {
+                    "chat_id": chat_id,
+                    "role": role,
+                    "content": content,
+                    "created_at": func.clock_timestamp(),
+                }
+                for role, content in messages
+            ])
+            .returning(InterviewMessage)
+        )
+        result = await self.session.scalars(stmt)
+        return sorted(result.all(), key=lambda m: m.created_at)
+
     async def get_messages_for_chat(
-        self, chat_id: uuid.UUID
+        self, chat_id: uuid.UUID, offset: int = 0, limit: int | None = None
     ) -> List[InterviewMessage]:
         query = (
             select(InterviewMessage)
             .where(InterviewMessage.chat_id == chat_id)
             .order_by(InterviewMessage.created_at.asc())
+            .offset(offset)
+            .limit(limit)
         )
         result = await self.session.execute(query)
         return result.scalars().all()
 
+    async def get_messages_page(
+        self,
+        chat_id: uuid.UUID,
+        limit: int,
+        cursor: Optional[Cursor] = None,
+        tail: bool = False,
+    ) -> List[InterviewMessage]:
+        """
+        Страница сообщений в хронологическом порядке.
+        tail или курсор BEFORE — страница, заканчивающаяся самым свежим
+        сообщением (или сообщением курсора); иначе — идущая после курсора.
+        """
+        key = tuple_(InterviewMessage.created_at, InterviewMessage.id)
+        backwards = tail or (cursor is not None and cursor.direction == BEFORE)
+
+        query = select(InterviewMessage).where(InterviewMessage.chat_id == chat_id)
+        if backwards:
+            query = query.order_by(
+                InterviewMessage.created_at.desc(), InterviewMessage.id.desc()
+            )
+            if cursor is not None:
+                query = query.where(key < tuple_(cursor.created_at, cursor.id))
+        else:
+            query = query.order_by(
+                InterviewMessage.created_at.asc(), InterviewMessage.id.asc()
+            )
+            if cursor is not None:
+                query = query.where(key > tuple_(cursor.created_at, cursor.id))
+
+        result = await self.session.execute(query.limit(limit))
+        return list(result.scalars().all())
+
     async def update_title(
             self,
-            chat: InterviewChat,
+            chat_id: uuid.UUID,
             title: str,
-    ) -> InterviewChat:
-        chat.title = title
-        self.session.add(chat)
-        await self.session.commit()
-        await self.session.refresh(chat)
-        return chat
\ No newline at end of file
+    ) -> Optional[InterviewChat]:
+        # Не перезаписываем заголовок, если его успели задать
+        stmt = (
+            update(InterviewChat)
+            .where(InterviewChat.id == chat_id, InterviewChat.title.is_(None))
+            .values(title=title)
+            .returning(InterviewChat)
+        )
+        return await self.session.scalar(stmt)
+
+    async def update_summary(
+            self,
+            chat_id: uuid.UUID,
+            summary: str,
+            summarized_count: int,
+            previous_count: int,
+    ) -> Optional[InterviewChat]:
+        """
+        Записывает summary, только если summarized_count всё ещё равен
+        previous_count. None — те же сообщения уже свернул параллельный ход,
+        его summary не перезаписывается.
+        """
+        stmt = (
+            update(InterviewChat)
+            .where(
+                InterviewChat.id == chat_id,
+                InterviewChat.summarized_count == previous_count,
+            )
+            .values(summary=summary, summarized_count=summarized_count)
+            .returning(InterviewChat)
+            # chat из этой сессии получает новые summary и summarized_count
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        return await self.session.scalar(stmt)
@@ -0,0 +1,229 @@
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, case, exists, literal, or_, select, text, tuple_, update, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from src import models
+from src.models.job import JobStatus
+
+PENDING_DEDUPE_INDEX_WHERE = text("status = 'PENDING'")
+# Сколько раз повторять перевод в PENDING, если параллельная постановка
+# успела создать ожидающего двойника между проверкой и UPDATE
+REQUEUE_ATTEMPTS = 3
+
+
+class JobRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def enqueue(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        max_attempts: int,
+        run_at: Optional[datetime] = None,
+        dedupe_key: Optional[str] = None,
+    ) -> None:
+        """
+        Если ожидающая задача с тем же dedupe_key уже есть, новая не создаётся:
+        у существующей обновляются payload и run_at (debounce).
+        Не коммитит: задача фиксируется в транзакции вызывающего кода
+        вместе с изменениями, которые её породили.
+        """
+        await self.enqueue_many(kind, [(payload, dedupe_key)], max_attempts, run_at)
+
+    async def enqueue_many(
+        self,
+        kind: str,
+        items: Sequence[Tuple[Dict[str, Any], Optional[str]]],
+        max_attempts: int,
+        run_at: Optional[datetime] = None,
+    ) -> None:
+        """
+        Ставит задачи (payload, dedupe_key) одним многострочным INSERT.
+        dedupe_key внутри одного вызова должны быть уникальны.
+        """
+        if not items:
+            return
+        rows: List[Dict[str, Any]] = [
+            {
+                "id": uuid.uuid4(),
+                "kind": kind,
+                "payload": payload,
+                "dedupe_key": dedupe_key,
+                "status": JobStatus.PENDING,
+                "attempts": 0,
+                "max_attempts": max_attempts,
+                "run_at": run_at if run_at is not None else func.now(),
+            }
+            for payload, dedupe_key in items
+        ]
+        stmt = insert(models.Job).values(rows)
+        if any(dedupe_key is not None for _, dedupe_key in items):
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["dedupe_key"],
+                # Должно текстуально совпадать с postgresql_where индекса,
+                # иначе Postgres не сопоставит ON CONFLICT с частичным индексом
+                index_where=PENDING_DEDUPE_INDEX_WHERE,
+                set_={
+                    "payload": stmt.excluded.payload,
+                    "run_at": stmt.excluded.run_at,
+                    "updated_at": func.now(),
+                },
+            )
+        await self.session.execute(stmt)
+
+    async def claim(self, worker_id: str, limit: int) -> List[models.Job]:
+        """
+        Атомарно забирает до limit готовых задач. SKIP LOCKED позволяет
+        нескольким воркерам опрашивать таблицу, не блокируя друг друга.
+        """
+        ready = (
+            select(models.Job.id)
+            .where(
+                models.Job.status == JobStatus.PENDING,
+                models.Job.run_at <= func.now(),
+            )
+            .order_by(models.Job.run_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(models.Job)
+            .where(models.Job.id.in_(ready))
+            .values(
+                status=JobStatus.RUNNING,
+                attempts=models.Job.attempts + 1,
+                locked_at=func.now(),
+                locked_by=worker_id,
+            )
+            .returning(models.Job)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        jobs = list(result.scalars().all())
+        await self.session.commit()
+        return jobs
+
+    async def complete(self, job_id: UUID) -> None:
+        stmt = (
+            update(models.Job)
+            .where(models.Job.id == job_id)
+            .values(status=JobStatus.DONE, locked_at=None, locked_by=None)
+        )
+        await self.session.execute(stmt)
+        await self.session.commit()
+
+    @staticmethod
+    def _has_pending_twin():
+        """У задачи есть другая ожидающая задача с тем же dedupe_key."""
+        twin = aliased(models.Job)
+        return exists().where(
+            twin.dedupe_key == models.Job.dedupe_key,
+            twin.status == JobStatus.PENDING,
+            twin.id != models.Job.id,
+        )
+
+    async def _requeue(self, statements: Callable[[], Iterator[Any]]) -> List[Any]:
+        """
+        Выполняет UPDATE, возвращающие задачи в PENDING, одной транзакцией.
+        Если параллельно появился ожидающий двойник и сработал уникальный
+        индекс, повторяет: при следующей попытке двойник уже виден.
+        """
+        for attempt in range(REQUEUE_ATTEMPTS):
+            try:
+                results = [await self.session.execute(stmt) for stmt in statements()]
+                await self.session.commit()
+                return results
+            except IntegrityError:
+                await self.session.rollback()
+                if attempt == REQUEUE_ATTEMPTS - 1:
+                    raise
+
+    async def fail(
+        self,
+        job_id: UUID,
+        error: str,
+        retry_at: Optional[datetime],
+    ) -> None:
+        """
+        retry_at=None — попытки исчерпаны, задача уходит в dead-letter.
+        Если для того же dedupe_key уже ждёт более новая задача, повтор
+        не нужен: упавшая задача закрывается как поглощённая ею.
+        """
+        values: Dict[str, Any] = {
+            "last_error": error,
+            "locked_at": None,
+            "locked_by": None,
+        }
+        if retry_at is None:
+            stmt = (
+                update(models.Job)
+                .where(models.Job.id == job_id)
+                .values(status=JobStatus.DEAD, **values)
+            )
+            await self.session.execute(stmt)
+            await self.session.commit()
+            return
+
+        def statements():
+            superseded = self._has_pending_twin()
+            yield (
+                update(models.Job)
+                .where(models.Job.id == job_id)
+                .values(
+                    status=case(
+                        (superseded, literal(JobStatus.DONE, models.Job.status.type)),
+                        else_=literal(JobStatus.PENDING, models.Job.status.type),
+                    ),
+                    run_at=case((superseded, models.Job.run_at), else_=retry_at),
+                    **values,
+                )
+            )
+
+        await self._requeue(statements)
+
+    async def release_stale(self, locked_before: datetime) -> int:
+        """
+        Возвращает в очередь задачи воркеров, которые упали, не закончив работу.
+        Задача, у которой уже есть ожидающий двойник, или не самая новая из
+        зависших с тем же dedupe_key закрывается как поглощённая — иначе
+        перевод в PENDING нарушил бы uq_jobs_pending_dedupe_key.
+        """
+        stale = and_(
+            models.Job.status == JobStatus.RUNNING,
+            models.Job.locked_at < locked_before,
+        )
+        newer = aliased(models.Job)
+        has_newer_stale = exists().where(
+            newer.dedupe_key == models.Job.dedupe_key,
+            newer.status == JobStatus.RUNNING,
+            newer.locked_at < locked_before,
+            tuple_(newer.created_at, newer.id) > tuple_(models.Job.created_at, models.Job.id),
+        )
+        released_values = {"locked_at": None, "locked_by": None}
+
+        def statements():
+            yield (
+                update(models.Job)
+                .where(
+                    stale,
+                    models.Job.dedupe_key.is_not(None),
+                    or_(self._has_pending_twin(), has_newer_stale),
+                )
+                .values(
+                    status=JobStatus.DONE,
+                    last_error="Superseded by a newer pending job",
+                    **released_values,
+                )
+            )
+            yield update(models.Job).where(stale).values(status=JobStatus.PENDING, **released_values)
+
+        results = await self._requeue(statements)
+        return sum(result.rowcount for result in results)
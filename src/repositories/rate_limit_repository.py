@@ -0,0 +1,59 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src import models
+
+
+class RateLimitRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @staticmethod
+    def _refilled(capacity: float, rate: float):
+        bucket = models.RateLimitBucket
+        elapsed = func.extract("epoch", func.clock_timestamp() - bucket.updated_at)
+        return func.least(capacity, bucket.tokens + elapsed * rate)
+
+    async def take(
+        self,
+        key: str,
+        capacity: float,
+        rate: float,
+        cost: float,
+    ) -> Optional[float]:
+        """
+        Атомарно пополняет бакет и списывает cost одним upsert.
+        Возвращает остаток токенов или None, если токенов не хватило
+        (строка в этом случае не меняется).
+        """
+        refilled = self._refilled(capacity, rate)
+        stmt = insert(models.RateLimitBucket).values(
+            key=key,
+            tokens=capacity - cost,
+            updated_at=func.clock_timestamp(),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["key"],
+            set_={"tokens": refilled - cost, "updated_at": func.clock_timestamp()},
+            where=refilled >= cost,
+        ).returning(models.RateLimitBucket.tokens)
+        result = await self.session.execute(stmt)
+        await self.session.commit()
+        return result.scalar_one_or_none()
+
+    async def peek(self, key: str, capacity: float, rate: float) -> float:
+        stmt = select(self._refilled(capacity, rate)).where(models.RateLimitBucket.key == key)
+        tokens = await self.session.scalar(stmt)
+        await self.session.commit()
+        return capacity if tokens is None else float(tokens)
+
+    async def delete_stale(self, before: datetime) -> int:
+        # Давно не тронутый бакет уже полон — строка эквивалентна отсутствующей
+        stmt = delete(models.RateLimitBucket).where(models.RateLimitBucket.updated_at < before)
+        result = await self.session.execute(stmt)
+        await self.session.commit()
+        return result.rowcount
@@ -0,0 +1,61 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete, select, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src import models
+
+
+class ScoreCacheRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get(
+        self,
+        content_hash: str,
+        model: str,
+        prompt_version: str,
+        not_before: datetime,
+    ) -> Optional[models.ResumeScoreCache]:
+        query = select(models.ResumeScoreCache).where(
+            models.ResumeScoreCache.content_hash == content_hash,
+            models.ResumeScoreCache.model == model,
+            models.ResumeScoreCache.prompt_version == prompt_version,
+            models.ResumeScoreCache.created_at >= not_before,
+        )
+        result = await self.session.execute(query)
+        return result.scalar_one_or_none()
+
+    async def upsert(
+        self,
+        content_hash: str,
+        model: str,
+        prompt_version: str,
+        score: int,
+        reason: str,
+    ) -> None:
+        stmt = insert(models.ResumeScoreCache).values(
+            content_hash=content_hash,
+            model=model,
+            prompt_version=prompt_version,
+            score=score,
+            reason=reason,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["content_hash", "model", "prompt_version"],
+            set_={
+                "score": stmt.excluded.score,
+                "reason": stmt.excluded.reason,
+                "created_at": func.now(),
+            },
+        )
+        await self.session.execute(stmt)
+
+    async def delete_older_than(self, before: datetime) -> int:
+        stmt = delete(models.ResumeScoreCache).where(
+            models.ResumeScoreCache.created_at < before
+        )
+        result = await self.session.execute(stmt)
+        return result.rowcount
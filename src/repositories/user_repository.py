@@ -2,7 +2,8 @@ from typing import Optional
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, text, update
+from sqlalchemy.dialects.postgresql import insert
 
 from src import models
 
@@ -21,15 +22,31 @@ class UserRepository:
         result = await self.session.execute(query)
         return result.scalar_one_or_none()
 
-    async def create(self, name:str, email: str, password: str | None) -> models.User:
-        user = models.User(name=name, email=email, password=password)
-        self.session.add(user)
+    async def commit(self) -> None:
         await self.session.commit()
-        await self.session.refresh(user)
-        return user
+
+    async def create(self, name:str, email: str, password: str | None) -> Optional[models.User]:
+        """None — пользователь с таким email уже есть."""
+        stmt = (
+            insert(models.User)
+            .values(name=name, email=email, password=password)
+            .on_conflict_do_nothing(index_elements=["email"])
+            .returning(models.User)
+        )
+        return await self.session.scalar(stmt)
+
+    async def update_password(self, user_id: UUID, password: str) -> None:
+        stmt = update(models.User).where(models.User.id == user_id).values(password=password)
+        await self.session.execute(stmt)
+
+    async def notify(self, channel: str, payload: str) -> None:
+        # NOTIFY доставляется слушателям только после коммита транзакции
+        await self.session.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": channel, "payload": payload},
+        )
 
     async def delete(self, user_id: UUID) -> None:
         user = await self.get_by_id(user_id)
         if user:
-            await self.session.delete(user)
-            await self.session.commit()
\ No newline at end of file
+            await self.session.delete(user)
\ No newline at end of file
@@ -1,6 +1,7 @@
 import uuid
 from datetime import datetime
-from typing import Any, Dict, Optional
+from enum import Enum
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel
 
@@ -13,6 +14,13 @@ class DocumentUpdateRequest(BaseModel):
     content: Dict[str, Any]
 
 
+class DocumentSort(str, Enum):
+    CREATED_AT_DESC = "-created_at"
+    CREATED_AT_ASC = "created_at"
+    AIMARK_DESC = "-aimark"
+    AIMARK_ASC = "aimark"
+
+
 class DocumentVersionResponse(BaseModel):
     version_number: int
     content: Dict[str, Any]
@@ -32,4 +40,18 @@ class DocumentResponse(BaseModel):
     content: Dict[str, Any]
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class DocumentExport(DocumentResponse):
+    versions: Optional[List[DocumentVersionResponse]] = None
+
+
+class DocumentImportError(BaseModel):
+    line: int
+    error: str
+
+
+class DocumentImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: List[DocumentImportError]
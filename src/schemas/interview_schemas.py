@@ -42,6 +42,7 @@ class InterviewChat(BaseModel):
 
 class InterviewChatDetail(InterviewChat):
     messages: List[InterviewMessage]
+    next_cursor: Optional[str] = None
 
 
 class InterviewMessageWithReply(BaseModel):
@@ -1,11 +1,17 @@
 import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Depends, Request
 from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.middleware.cors import CORSMiddleware
 
+from .config import settings
+from .api.middleware import RateLimitMiddleware, ReadYourWritesMiddleware, ServerTimingMiddleware
 from .database import engine, Base, get_db
+from .services.user_service import user_cache_listener
+from .utils.google_oauth import google_oauth
 
 logging.basicConfig(
     level=logging.INFO,
@@ -13,7 +19,20 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.AUTH_USER_CACHE_SIZE > 0:
+        await user_cache_listener.start()
+    try:
+        yield
+    finally:
+        await user_cache_listener.stop()
+        await google_oauth.aclose()
+
+
 app = FastAPI(
+    lifespan=lifespan,
     title="CV",
     description="CV",
     version="1.0.0",
@@ -21,6 +40,11 @@ app = FastAPI(
     redoc_url="/api/redoc",
 )
 
+app.add_middleware(ReadYourWritesMiddleware)
+
+# Добавляется раньше CORS, чтобы CORS оставался внешним и ответы 429 тоже получали его заголовки
+app.add_middleware(RateLimitMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -29,6 +53,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Самый внешний: в замер попадают и остальные middleware
+app.add_middleware(ServerTimingMiddleware, sample_rate=settings.SERVER_TIMING_SAMPLE_RATE)
+
 
 
 from .api.routers import service as service_router
@@ -36,8 +63,15 @@ from .api.routers import auth as auth_router
 from .api.routers import documents as documents_router
 from .api.routers import interview as interview_router
 from .api import error_handler
+from .utils.passwords import PasswordHasherBusyError
+from .utils.rate_limit import RateLimitExceededError
+from .utils.resilience import LLMTimeoutError, LLMUnavailableError
 # Include routers
 app.add_exception_handler(RequestValidationError, error_handler.validation_exception_handler)
+app.add_exception_handler(LLMUnavailableError, error_handler.llm_unavailable_handler)
+app.add_exception_handler(LLMTimeoutError, error_handler.llm_timeout_handler)
+app.add_exception_handler(PasswordHasherBusyError, error_handler.password_hasher_busy_handler)
+app.add_exception_handler(RateLimitExceededError, error_handler.rate_limit_exceeded_handler)
 app.include_router(service_router.router, prefix="/api", tags=["service"])
 app.include_router(auth_router.router, prefix="/api", tags=["auth"])
 app.include_router(documents_router.router, prefix="/api", tags=["documents"])
@@ -1,32 +1,58 @@
-import asyncio
-from typing import Optional, Dict, Any, List
+import json
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
 from uuid import UUID
 
+from sqlalchemy.exc import DataError, DBAPIError, IntegrityError
+
 from src import models
+from src.config import settings
 from src.schemas import document_schemas as schemas
+from src.schemas.pagination import Page
 from src.repositories.document_repository import DocumentRepository
-from src.utils import ai
+from src.services.job_service import JobKind, JobService
+from src.services.score_cache_service import ScoreCacheService
+from src.utils.pagination import Cursor, decode_cursor, encode_cursor, split_page
+from src.utils.scoring_batcher import scoring_batcher
+
+logger = logging.getLogger(__name__)
+
+# SQLSTATE-классы ошибок из-за самих данных: data exception и integrity constraint violation
+ROW_ERROR_SQLSTATE_CLASSES = ("22", "23")
+
+
+def _is_row_error(error: DBAPIError) -> bool:
+    """
+    Ошибка вызвана содержимым строки, а не соединением или сервером.
+    asyncpg отдаёт data exception как общий DBAPIError, а не DataError,
+    поэтому кроме типа смотрим на SQLSTATE.
+    """
+    if isinstance(error, (IntegrityError, DataError)):
+        return True
+    sqlstate = getattr(error.orig, "sqlstate", None) or ""
+    return sqlstate[:2] in ROW_ERROR_SQLSTATE_CLASSES
 
 
 class DocumentService:
-    def __init__(self, document_repository: DocumentRepository):
+    def __init__(
+        self,
+        document_repository: DocumentRepository,
+        score_cache_service: ScoreCacheService,
+        job_service: JobService,
+    ):
         self.document_repository = document_repository
+        self.score_cache_service = score_cache_service
+        self.job_service = job_service
 
     @staticmethod
     def _document_to_schema(doc: models.Document) -> schemas.DocumentResponse:
-        current_version = None
-        if doc.versions:
-            current_version = doc.versions[-1]
-        else:
-            raise ValueError("Document has no versions")
-
         return schemas.DocumentResponse(
             id=doc.id,
             owner_id=doc.owner_id,
             current_version=doc.current_version,
             created_at=doc.created_at,
             updated_at=doc.updated_at,
-            content=current_version.content,
+            content=doc.content,
         )
 
     async def create_document(
@@ -38,10 +64,15 @@ class DocumentService:
             owner_id=owner_id,
             content=content,
         )
+        await self.document_repository.commit()
         return self._document_to_schema(doc)
 
-    async def get_document(self, document_id: UUID) -> Optional[schemas.DocumentResponse]:
-        doc = await self.document_repository.get_by_id(document_id)
+    async def get_document(
+        self,
+        document_id: UUID,
+        owner_id: Optional[UUID] = None,
+    ) -> Optional[schemas.DocumentResponse]:
+        doc = await self.document_repository.get_by_id(document_id, owner_id)
         if not doc:
             return None
         return self._document_to_schema(doc)
@@ -50,10 +81,12 @@ class DocumentService:
         self,
         document_id: UUID,
         version_number: int,
+        owner_id: Optional[UUID] = None,
     ) -> Optional[schemas.DocumentVersionResponse]:
         version = await self.document_repository.get_version(
             document_id=document_id,
             version_number=version_number,
+            owner_id=owner_id,
         )
         if not version:
             return None
@@ -68,39 +101,247 @@ class DocumentService:
         doc = await self.document_repository.get_by_id(document_id)
         if not doc:
             return None
-        content = doc.versions[doc.current_version - 1].content
-        score, reason = await ai.score_resume_json(content)
+        version_number = doc.current_version
+        content = doc.content
+
+        cached = await self.score_cache_service.get(content)
+        await self.document_repository.release_connection()
+        if cached is not None:
+            score, reason = cached
+        else:
+            score, reason = await scoring_batcher.score(content)
+            await self.score_cache_service.put(content, score, reason)
+
         scored_content = {**content, "aimark": score, "reason": reason}
 
-        await self.document_repository.update_version(
-            document=doc,
+        # Если пока шёл скоринг появилась новая версия, оценка устарела:
+        # её перезапишет задача, поставленная для новой версии
+        await self.document_repository.update_current_version_content(
+            document_id=document_id,
+            version_number=version_number,
             content=scored_content,
-            version_number=doc.current_version,
         )
+        await self.document_repository.commit()
 
         return
 
+    async def schedule_scoring(
+        self,
+        document_id: UUID,
+        delay_seconds: float = settings.SCORING_DEBOUNCE_SECONDS,
+    ) -> None:
+        # Частые сохранения сливаются в одну задачу: скоринг запускается
+        # после паузы и оценивает только последнюю версию
+        await self.job_service.enqueue(
+            JobKind.SCORE_DOCUMENT,
+            {"document_id": str(document_id)},
+            delay_seconds=delay_seconds,
+            dedupe_key=f"{JobKind.SCORE_DOCUMENT.value}:{document_id}",
+        )
+
+    async def schedule_scoring_many(self, document_ids: Sequence[UUID]) -> None:
+        await self.job_service.enqueue_many(
+            JobKind.SCORE_DOCUMENT,
+            [
+                (
+                    {"document_id": str(document_id)},
+                    f"{JobKind.SCORE_DOCUMENT.value}:{document_id}",
+                )
+                for document_id in document_ids
+            ],
+        )
+
     async def update_document(
         self,
         document_id: UUID,
         content: Dict[str, Any],
+        owner_id: Optional[UUID] = None,
     ) -> Optional[schemas.DocumentResponse]:
-        doc = await self.document_repository.get_by_id(document_id)
-        if not doc:
-            return None
-
         doc = await self.document_repository.create_new_version(
-            document=doc,
+            document_id=document_id,
             content=content,
+            owner_id=owner_id,
         )
+        if not doc:
+            return None
 
-        asyncio.create_task(self.score_document(document_id))
+        # Версия и задача скоринга фиксируются одним коммитом
+        await self.schedule_scoring(document_id)
+        await self.document_repository.commit()
         return self._document_to_schema(doc)
 
-    async def delete_document(self, document_id: UUID) -> bool:
-        await self.document_repository.delete(document_id)
-        return True
+    async def delete_document(
+        self,
+        document_id: UUID,
+        owner_id: Optional[UUID] = None,
+    ) -> bool:
+        deleted = await self.document_repository.delete(document_id, owner_id)
+        await self.document_repository.commit()
+        return deleted
+
+    async def list_documents(
+        self,
+        owner_id: UUID,
+        limit: int,
+        cursor: Optional[str] = None,
+        min_score: Optional[float] = None,
+        max_score: Optional[float] = None,
+        text: Optional[str] = None,
+        contains: Optional[str] = None,
+        sort: schemas.DocumentSort = schemas.DocumentSort.CREATED_AT_DESC,
+    ) -> Page[schemas.DocumentResponse]:
+        after = decode_cursor(cursor) if cursor else None
+
+        contains_filter = None
+        if contains:
+            try:
+                contains_filter = json.loads(contains)
+            except json.JSONDecodeError as e:
+                raise ValueError("contains must be a JSON object.") from e
+            if not isinstance(contains_filter, dict):
+                raise ValueError("contains must be a JSON object.")
+
+        rows = await self.document_repository.list_by_owner(
+            owner_id,
+            limit + 1,
+            after,
+            min_score=min_score,
+            max_score=max_score,
+            text=text,
+            contains=contains_filter,
+            sort=sort,
+        )
+
+        by_aimark = sort in (schemas.DocumentSort.AIMARK_DESC, schemas.DocumentSort.AIMARK_ASC)
+        docs, next_cursor = split_page(
+            rows,
+            limit,
+            lambda d: encode_cursor(
+                d.created_at,
+                d.id,
+                sort_key=[d.content.get("aimark")] if by_aimark else None,
+            ),
+        )
+        return Page[schemas.DocumentResponse](
+            items=[self._document_to_schema(doc) for doc in docs],
+            next_cursor=next_cursor,
+        )
+
+    async def export_documents(
+        self,
+        owner_id: UUID,
+        with_versions: bool = False,
+    ) -> AsyncIterator[str]:
+        """
+        NDJSON-выгрузка документов пользователя. Документы читаются
+        keyset-пачками, поэтому в памяти не больше одной пачки.
+        """
+        batch_size = settings.DOCUMENT_EXPORT_BATCH_SIZE
+        after = None
+        while True:
+            docs = await self.document_repository.list_by_owner(owner_id, batch_size, after)
+            if not docs:
+                return
 
-    async def list_documents(self, owner_id: UUID) -> List[schemas.DocumentResponse]:
-        docs = await self.document_repository.list_by_owner(owner_id)
-        return [self._document_to_schema(doc) for doc in docs]
\ No newline at end of file
+            versions = {}
+            if with_versions:
+                versions = await self.document_repository.list_versions_for_documents(
+                    [doc.id for doc in docs]
+                )
+
+            lines = []
+            for doc in docs:
+                item = schemas.DocumentExport(
+                    **self._document_to_schema(doc).model_dump(),
+                    versions=[
+                        schemas.DocumentVersionResponse.model_validate(v)
+                        for v in versions.get(doc.id, [])
+                    ] if with_versions else None,
+                )
+                lines.append(item.model_dump_json(exclude_none=True) + "\n")
+            yield "".join(lines)
+
+            if len(docs) < batch_size:
+                return
+            after = Cursor(docs[-1].created_at, docs[-1].id)
+
+    async def import_documents(
+        self,
+        owner_id: UUID,
+        lines: AsyncIterator[Tuple[int, Optional[bytes]]],
+        schedule_scoring: bool = False,
+    ) -> schemas.DocumentImportResult:
+        """
+        Загружает документы из NDJSON-строк вида {"content": {...}}
+        (подходит и формат выгрузки: остальные поля игнорируются).
+        Строки пишутся пачками, каждая пачка — отдельная транзакция.
+        Ошибочные строки пропускаются и попадают в отчёт.
+        """
+        result = schemas.DocumentImportResult(imported=0, failed=0, errors=[])
+
+        def reject(line_number: int, error: str) -> None:
+            result.failed += 1
+            if len(result.errors) < settings.DOCUMENT_IMPORT_MAX_REPORTED_ERRORS:
+                result.errors.append(schemas.DocumentImportError(line=line_number, error=error))
+
+        batch: List[Tuple[int, Dict[str, Any]]] = []
+        async for line_number, raw in lines:
+            if raw is None:
+                reject(line_number, "Line is too long.")
+                continue
+            try:
+                item = json.loads(raw)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                reject(line_number, "Invalid JSON.")
+                continue
+            content = item.get("content") if isinstance(item, dict) else None
+            if not isinstance(content, dict):
+                reject(line_number, "Expected an object with a 'content' object.")
+                continue
+
+            batch.append((line_number, content))
+            if len(batch) >= settings.DOCUMENT_IMPORT_BATCH_SIZE:
+                await self._import_batch(owner_id, batch, schedule_scoring, result, reject)
+                batch = []
+
+        if batch:
+            await self._import_batch(owner_id, batch, schedule_scoring, result, reject)
+        return result
+
+    async def _import_batch(
+        self,
+        owner_id: UUID,
+        batch: List[Tuple[int, Dict[str, Any]]],
+        schedule_scoring: bool,
+        result: schemas.DocumentImportResult,
+        reject: Callable[[int, str], None],
+    ) -> None:
+        try:
+            await self._store_batch(owner_id, [content for _, content in batch], schedule_scoring)
+            result.imported += len(batch)
+            return
+        except DBAPIError as e:
+            # Ошибки соединения и прочие сбои прерывают импорт,
+            # а не записываются на счёт строк
+            if not _is_row_error(e):
+                raise
+            await self.document_repository.rollback()
+            if len(batch) == 1:
+                logger.exception("Failed to import document from line %s", batch[0][0])
+                reject(batch[0][0], "Failed to store document.")
+                return
+
+        # Пачка не записалась — пишем строки по одной, чтобы отбросить только виновные
+        for item in batch:
+            await self._import_batch(owner_id, [item], schedule_scoring, result, reject)
+
+    async def _store_batch(
+        self,
+        owner_id: UUID,
+        contents: List[Dict[str, Any]],
+        schedule_scoring: bool,
+    ) -> None:
+        document_ids = await self.document_repository.insert_many(owner_id, contents)
+        if schedule_scoring:
+            await self.schedule_scoring_many(document_ids)
+        await self.document_repository.commit()
@@ -1,15 +1,47 @@
+import asyncio
+import logging
 import uuid
-from typing import List
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src import schemas
-from src.models.interview import MessageRole
+from src.config import settings
+from src.models.interview import InterviewChat, MessageRole
 from src.repositories.interview_repository import InterviewChatRepository
-from src.utils.ai import generate_interview_reply, generate_chat_title
+from src.schemas.pagination import Page
+from src.services.job_service import JobKind, JobService
+from src.utils.ai import (
+    generate_interview_reply,
+    generate_chat_title,
+    stream_interview_reply,
+    summarize_interview,
+)
+from src.utils.interview_context import split_for_summary, fit_to_budget
+from src.utils.pagination import AFTER, BEFORE, decode_cursor, encode_cursor, split_page
+
+logger = logging.getLogger(__name__)
+
+# Для заголовка достаточно начала разговора
+TITLE_CONTEXT_MESSAGES = 4
+
+# Фоновые сохранения частичных ответов; ссылки держатся до завершения задач
+_partial_saves: Set[asyncio.Task] = set()
+
+SYSTEM_PROMPT = {
+    "role": "system",
+    "content": (
+        "You act like a strict but constructive interviewer. "
+        "at the technical interview. Ask clarifying questions, "
+        "evaluate the answers and give brief feedback."
+    ),
+}
 
 
 class InterviewChatService:
-    def __init__(self, repo: InterviewChatRepository):
+    def __init__(self, repo: InterviewChatRepository, job_service: JobService):
         self.repo = repo
+        self.job_service = job_service
 
     async def create_chat(
         self,
@@ -18,37 +50,139 @@ class InterviewChatService:
         position: str | None,
     ) -> schemas.InterviewChat:
         chat = await self.repo.create_chat(owner_id, title, position)
+        await self.repo.commit()
         return schemas.InterviewChat.model_validate(chat)
 
     async def get_chat_detail(
-        self, chat_id: uuid.UUID, owner_id: uuid.UUID
+        self,
+        chat_id: uuid.UUID,
+        owner_id: uuid.UUID,
+        limit: int,
+        cursor: str | None = None,
+        tail: bool = False,
     ) -> schemas.InterviewChatDetail:
+        after = decode_cursor(cursor) if cursor else None
+
         chat = await self.repo.get_chat_by_id(chat_id, owner_id)
         if not chat:
             return None  # роутер кинет 404
 
-        messages = await self.repo.get_messages_for_chat(chat.id)
+        rows = await self.repo.get_messages_page(chat.id, limit + 1, after, tail)
+        # В режиме tail курсор ведёт к более старым сообщениям
+        direction = BEFORE if tail or (after and after.direction == BEFORE) else AFTER
+        messages, next_cursor = split_page(
+            rows, limit, lambda m: encode_cursor(m.created_at, m.id, direction)
+        )
+        if direction == BEFORE:
+            messages.reverse()
+
         return schemas.InterviewChatDetail(
             **schemas.InterviewChat.model_validate(chat).model_dump(),
             messages=[
                 schemas.InterviewMessage.model_validate(m) for m in messages
             ],
+            next_cursor=next_cursor,
         )
 
     async def list_chats_for_user(
-        self, owner_id: uuid.UUID
-    ) -> List[schemas.InterviewChat]:
-        chats = await self.repo.list_chats_for_user(owner_id)
-        return [schemas.InterviewChat.model_validate(c) for c in chats]
+        self,
+        owner_id: uuid.UUID,
+        limit: int,
+        cursor: str | None = None,
+    ) -> Page[schemas.InterviewChat]:
+        after = decode_cursor(cursor) if cursor else None
+        rows = await self.repo.list_chats_for_user(owner_id, limit + 1, after)
+        chats, next_cursor = split_page(
+            rows, limit, lambda c: encode_cursor(c.created_at, c.id)
+        )
+        return Page[schemas.InterviewChat](
+            items=[schemas.InterviewChat.model_validate(c) for c in chats],
+            next_cursor=next_cursor,
+        )
 
     async def delete_chat(
         self, chat_id: uuid.UUID, owner_id: uuid.UUID
     ) -> bool:
-        chat = await self.repo.get_chat_by_id(chat_id, owner_id)
-        if not chat:
-            return False
-        await self.repo.delete_chat(chat)
-        return True
+        deleted = await self.repo.delete_chat(chat_id, owner_id)
+        await self.repo.commit()
+        return deleted
+
+    async def _build_history(
+        self, chat: InterviewChat, pending: Optional[Dict[str, str]] = None
+    ) -> List[Dict[str, str]]:
+        """pending — ещё не сохранённое сообщение пользователя в конце истории."""
+        messages = await self.repo.get_messages_for_chat(
+            chat.id, offset=chat.summarized_count
+        )
+        await self.repo.release_connection()
+        history_messages = [
+            {"role": m.role.value, "content": m.content} for m in messages
+        ]
+        if pending is not None:
+            history_messages.append(pending)
+
+        to_fold, window = split_for_summary(
+            history_messages,
+            window_turns=settings.INTERVIEW_CONTEXT_WINDOW_TURNS,
+            slide_turns=settings.INTERVIEW_CONTEXT_SLIDE_TURNS,
+        )
+        if to_fold:
+            try:
+                summary = await summarize_interview(chat.summary, to_fold)
+                updated = await self.repo.update_summary(
+                    chat.id,
+                    summary,
+                    chat.summarized_count + len(to_fold),
+                    previous_count=chat.summarized_count,
+                )
+                await self.repo.release_connection()
+            except Exception:
+                updated = None
+            if updated is None:
+                # Summary не обновился (ошибка или те же сообщения уже свернул
+                # параллельный ход) — на этом ходе берём всё окно, бюджет ниже
+                # всё равно ограничит размер промпта
+                window = history_messages
+
+        context = [SYSTEM_PROMPT]
+        if chat.summary:
+            context.append({
+                "role": "system",
+                "content": f"Summary of the earlier part of the interview:\n{chat.summary}",
+            })
+
+        window = fit_to_budget(
+            [m["content"] for m in context],
+            window,
+            token_budget=settings.INTERVIEW_CONTEXT_TOKEN_BUDGET,
+        )
+        return [*context, *window]
+
+    async def _schedule_title(self, chat: InterviewChat) -> None:
+        # Заголовок генерируется фоновой задачей, чтобы не задерживать ответ
+        if chat.title:
+            return
+        await self.job_service.enqueue(
+            JobKind.GENERATE_CHAT_TITLE,
+            {"chat_id": str(chat.id)},
+            dedupe_key=f"{JobKind.GENERATE_CHAT_TITLE.value}:{chat.id}",
+        )
+
+    async def generate_title(self, chat_id: uuid.UUID) -> None:
+        chat = await self.repo.get_chat(chat_id)
+        if not chat or chat.title:
+            return
+
+        messages = await self.repo.get_messages_for_chat(
+            chat.id, limit=TITLE_CONTEXT_MESSAGES
+        )
+        await self.repo.release_connection()
+        history_messages = [
+            {"role": m.role.value, "content": m.content} for m in messages
+        ]
+        title = await generate_chat_title(history_messages)
+        await self.repo.update_title(chat.id, title)
+        await self.repo.commit()
 
     async def send_message(
         self,
@@ -60,43 +194,101 @@ class InterviewChatService:
         if not chat:
             return None
 
-        user_msg = await self.repo.add_message(
-            chat_id=chat.id,
-            role=MessageRole.USER,
-            content=content,
+        history_for_reply = await self._build_history(
+            chat, pending={"role": MessageRole.USER.value, "content": content}
         )
 
-        messages = await self.repo.get_messages_for_chat(chat.id)
-        history_messages = [
-            {"role": m.role.value, "content": m.content} for m in messages
-        ]
+        ai_answer = await generate_interview_reply(history_for_reply)
 
-        system_prompt = {
-            "role": "system",
-            "content": (
-                "You act like a strict but constructive interviewer. "
-                "at the technical interview. Ask clarifying questions, "
-                "evaluate the answers and give brief feedback."
-            ),
-        }
-        history_for_reply = [system_prompt, *history_messages]
+        # Вопрос и ответ сохраняются вместе: если модель не ответила,
+        # в истории не остаётся вопроса без ответа
+        user_msg, ai_msg = await self.repo.add_messages(
+            chat.id,
+            [(MessageRole.USER, content), (MessageRole.ASSISTANT, ai_answer)],
+        )
+        await self._schedule_title(chat)
+        await self.repo.commit()
 
-        ai_answer = await generate_interview_reply(history_for_reply)
+        return schemas.InterviewMessageWithReply(
+            user_message=schemas.InterviewMessage.model_validate(user_msg),
+            ai_message=schemas.InterviewMessage.model_validate(ai_msg),
+        )
 
-        ai_msg = await self.repo.add_message(
-            chat_id=chat.id,
-            role=MessageRole.ASSISTANT,
-            content=ai_answer,
+    async def stream_message(
+        self,
+        chat_id: uuid.UUID,
+        owner_id: uuid.UUID,
+        content: str,
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]] | None:
+        """
+        Возвращает поток событий ответа. None — чат не найден
+        (проверка выполняется до начала стрима).
+        """
+        chat = await self.repo.get_chat_by_id(chat_id, owner_id)
+        if not chat:
+            return None
+
+        history_for_reply = await self._build_history(
+            chat, pending={"role": MessageRole.USER.value, "content": content}
         )
 
-        if not chat.title:
+        return self._stream_reply(chat, content, history_for_reply)
+
+    async def _stream_reply(
+        self,
+        chat: InterviewChat,
+        content: str,
+        history_for_reply: List[Dict[str, str]],
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Вопрос и ответ сохраняются вместе после стрима, поэтому user_message
+        приходит после дельт. Если модель упала до первого чанка, не
+        сохраняется ничего.
+        """
+        parts: List[str] = []
+        saved = False
+        try:
             try:
-                title = await generate_chat_title(history_messages)
-                await self.repo.update_title(chat, title)
+                async for chunk in stream_interview_reply(history_for_reply):
+                    parts.append(chunk)
+                    yield "delta", {"text": chunk}
             except Exception:
-                pass
+                yield "error", {"detail": "AI reply was interrupted."}
+                return
 
-        return schemas.InterviewMessageWithReply(
-            user_message=schemas.InterviewMessage.model_validate(user_msg),
-            ai_message=schemas.InterviewMessage.model_validate(ai_msg),
-        )
\ No newline at end of file
+            user_msg, ai_msg = await self.repo.add_messages(
+                chat.id,
+                [(MessageRole.USER, content), (MessageRole.ASSISTANT, "".join(parts))],
+            )
+            await self._schedule_title(chat)
+            await self.repo.commit()
+            saved = True
+            yield "user_message", schemas.InterviewMessage.model_validate(user_msg).model_dump(mode="json")
+            yield "ai_message", schemas.InterviewMessage.model_validate(ai_msg).model_dump(mode="json")
+        finally:
+            # Клиент отключился или модель упала посреди ответа:
+            # сохраняем вопрос и то, что успели сгенерировать, чтобы история не рвалась
+            if not saved and parts:
+                self._save_partial_exchange(chat.id, content, "".join(parts))
+
+    def _save_partial_exchange(self, chat_id: uuid.UUID, content: str, reply: str) -> None:
+        """
+        Сохраняет в фоновой задаче и в своей сессии. При отключении клиента
+        запрос уже отменён: любой await здесь сразу прерывается, а get_db
+        откатывает и закрывает сессию запроса.
+        """
+        task = asyncio.create_task(self._write_partial_exchange(chat_id, content, reply))
+        _partial_saves.add(task)
+        task.add_done_callback(_partial_saves.discard)
+
+    async def _write_partial_exchange(self, chat_id: uuid.UUID, content: str, reply: str) -> None:
+        try:
+            async with AsyncSession(self.repo.session.bind, expire_on_commit=False) as session:
+                repo = InterviewChatRepository(session)
+                await repo.add_messages(
+                    chat_id,
+                    [(MessageRole.USER, content), (MessageRole.ASSISTANT, reply)],
+                )
+                await repo.commit()
+        except Exception:
+            logger.exception("Failed to save partial interview reply for chat %s", chat_id)
@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from src.config import settings
+from src.repositories.job_repository import JobRepository
+
+
+class JobKind(str, Enum):
+    SCORE_DOCUMENT = "score_document"
+    GENERATE_CHAT_TITLE = "generate_chat_title"
+
+
+class JobService:
+    def __init__(self, job_repository: JobRepository):
+        self.job_repository = job_repository
+
+    async def enqueue(
+        self,
+        kind: JobKind,
+        payload: Dict[str, Any],
+        delay_seconds: float = 0,
+        dedupe_key: Optional[str] = None,
+    ) -> None:
+        await self.enqueue_many(kind, [(payload, dedupe_key)], delay_seconds)
+
+    async def enqueue_many(
+        self,
+        kind: JobKind,
+        items: Sequence[Tuple[Dict[str, Any], Optional[str]]],
+        delay_seconds: float = 0,
+    ) -> None:
+        run_at = None
+        if delay_seconds:
+            run_at = datetime.now(timezone.utc) + timedelta(seconds=delay_seconds)
+
+        await self.job_repository.enqueue_many(
+            kind=kind.value,
+            items=items,
+            max_attempts=settings.JOB_MAX_ATTEMPTS,
+            run_at=run_at,
+        )
@@ -0,0 +1,78 @@
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Protocol
+
+from sqlalchemy.orm import sessionmaker
+
+from src.config import settings
+from src.database import async_session_maker
+from src.repositories.rate_limit_repository import RateLimitRepository
+from src.utils.rate_limit import InMemoryRateLimitStore, RateLimit, RateLimitResult
+
+
+class RateLimitStore(Protocol):
+    async def take(self, key: str, limit: RateLimit, cost: float = 1.0) -> RateLimitResult:
+        ...
+
+
+class PostgresRateLimitStore:
+    """Бакеты в таблице rate_limit_buckets: лимит общий для всех процессов."""
+
+    def __init__(self, session_maker: sessionmaker, stale_seconds: float, purge_interval_seconds: float):
+        self.session_maker = session_maker
+        self.stale_seconds = stale_seconds
+        self.purge_interval_seconds = purge_interval_seconds
+        self._last_purge_at = 0.0
+
+    async def take(self, key: str, limit: RateLimit, cost: float = 1.0) -> RateLimitResult:
+        async with self.session_maker() as session:
+            repo = RateLimitRepository(session)
+            tokens = await repo.take(key, limit.capacity, limit.rate, cost)
+            if tokens is not None:
+                result = limit.result(True, tokens, cost)
+            else:
+                result = limit.result(False, await repo.peek(key, limit.capacity, limit.rate), cost)
+            await self._purge_stale(repo)
+        return result
+
+    async def _purge_stale(self, repo: RateLimitRepository) -> None:
+        now = time.monotonic()
+        if now - self._last_purge_at < self.purge_interval_seconds:
+            return
+        self._last_purge_at = now
+        before = datetime.now(timezone.utc) - timedelta(seconds=self.stale_seconds)
+        await repo.delete_stale(before)
+
+
+class RateLimitService:
+    def __init__(self, store: RateLimitStore, enabled: bool = True):
+        self.store = store
+        self.enabled = enabled
+
+    async def hit(self, limit: RateLimit, key: str, cost: float = 1.0) -> Optional[RateLimitResult]:
+        """None — ограничение выключено."""
+        if not self.enabled:
+            return None
+        return await self.store.take(f"{limit.name}:{key}", limit, cost)
+
+
+IP_LIMIT = RateLimit("ip", settings.RATE_LIMIT_IP_BURST, settings.RATE_LIMIT_IP_PER_MINUTE)
+USER_LIMIT = RateLimit("user", settings.RATE_LIMIT_USER_BURST, settings.RATE_LIMIT_USER_PER_MINUTE)
+# Отдельный, более строгий бакет для маршрутов, которые вызывают LLM
+LLM_LIMIT = RateLimit("llm", settings.RATE_LIMIT_LLM_BURST, settings.RATE_LIMIT_LLM_PER_MINUTE)
+
+
+def _create_store() -> RateLimitStore:
+    if settings.RATE_LIMIT_STORE == "postgres":
+        return PostgresRateLimitStore(
+            async_session_maker,
+            stale_seconds=settings.RATE_LIMIT_STALE_SECONDS,
+            purge_interval_seconds=settings.RATE_LIMIT_PURGE_INTERVAL_SECONDS,
+        )
+    return InMemoryRateLimitStore(
+        max_keys=settings.RATE_LIMIT_MAX_KEYS,
+        stale_seconds=settings.RATE_LIMIT_STALE_SECONDS,
+    )
+
+
+rate_limit_service = RateLimitService(_create_store(), enabled=settings.RATE_LIMIT_ENABLED)
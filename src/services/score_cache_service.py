@@ -0,0 +1,80 @@
+import hashlib
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional, Tuple
+
+from src.config import settings
+from src.repositories.score_cache_repository import ScoreCacheRepository
+from src.utils import ai
+from src.utils.cache import TTLCache
+
+# Поля, которые дописывает сам скоринг — в хэш содержимого они не входят
+SCORING_FIELDS = ("aimark", "reason")
+
+_memory_cache: TTLCache[Tuple[str, str, str], Tuple[int, str]] = TTLCache(
+    maxsize=settings.SCORE_CACHE_LRU_SIZE,
+    ttl=settings.SCORE_CACHE_TTL_SECONDS,
+)
+_last_purge_at = 0.0
+
+
+def content_hash(content: Any) -> str:
+    if isinstance(content, dict):
+        content = {k: v for k, v in content.items() if k not in SCORING_FIELDS}
+    canonical = json.dumps(
+        content,
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ScoreCacheService:
+    def __init__(self, score_cache_repository: ScoreCacheRepository):
+        self.score_cache_repository = score_cache_repository
+
+    @staticmethod
+    def _key(content: Any) -> Tuple[str, str, str]:
+        model = settings.GEMINI_MODEL
+        if ai.provider.name != "gemini":
+            # Оценки тестовых провайдеров не должны смешиваться с настоящими
+            model = f"{ai.provider.name}:{model}"
+        return content_hash(content), model, ai.SCORING_PROMPT_VERSION
+
+    async def get(self, content: Any) -> Optional[Tuple[int, str]]:
+        key = self._key(content)
+        cached = _memory_cache.get(key)
+        if cached is not None:
+            return cached
+
+        not_before = datetime.now(timezone.utc) - timedelta(
+            seconds=settings.SCORE_CACHE_TTL_SECONDS
+        )
+        row = await self.score_cache_repository.get(*key, not_before=not_before)
+        if row is None:
+            return None
+
+        result = (row.score, row.reason)
+        _memory_cache.set(key, result)
+        return result
+
+    async def put(self, content: Any, score: int, reason: str) -> None:
+        key = self._key(content)
+        await self.score_cache_repository.upsert(*key, score=score, reason=reason)
+        _memory_cache.set(key, (score, reason))
+        await self._purge_expired()
+
+    async def _purge_expired(self) -> None:
+        global _last_purge_at
+
+        now = time.monotonic()
+        if now - _last_purge_at < settings.SCORE_CACHE_PURGE_INTERVAL_SECONDS:
+            return
+        _last_purge_at = now
+
+        before = datetime.now(timezone.utc) - timedelta(
+            seconds=settings.SCORE_CACHE_TTL_SECONDS
+        )
+        await self.score_cache_repository.delete_older_than(before)
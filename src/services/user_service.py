@@ -1,12 +1,49 @@
+import logging
 import uuid
 
-import bcrypt
 from typing import Optional
 
 from pydantic import EmailStr
 
 from src import schemas, models
+from src.config import settings
 from src.repositories.user_repository import UserRepository
+from src.utils.cache import TTLCache
+from src.utils.passwords import PasswordHasher, PasswordHasherBusyError
+from src.utils.pg_notify import PgNotificationListener, asyncpg_dsn
+
+logger = logging.getLogger(__name__)
+
+password_hasher = PasswordHasher(
+    rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+    retry_after=settings.PASSWORD_HASH_RETRY_AFTER_SECONDS,
+)
+
+# Канал, по которому процессы сообщают друг другу об удалённых пользователях
+USER_INVALIDATION_CHANNEL = "user_invalidated"
+
+# Проверенные пользователи: get_current_user не ходит в базу на каждый запрос
+_user_cache: TTLCache[uuid.UUID, schemas.User] = TTLCache(
+    maxsize=settings.AUTH_USER_CACHE_SIZE,
+    ttl=settings.AUTH_USER_CACHE_TTL_SECONDS,
+)
+
+
+def _invalidate_cached_user(payload: str) -> None:
+    try:
+        _user_cache.pop(uuid.UUID(payload))
+    except ValueError:
+        pass
+
+
+user_cache_listener = PgNotificationListener(
+    dsn=asyncpg_dsn(settings.DATABASE_URL),
+    channel=USER_INVALIDATION_CHANNEL,
+    callback=_invalidate_cached_user,
+    on_reconnect=_user_cache.clear,
+)
 
 
 class UserService:
@@ -20,20 +57,31 @@ class UserService:
                             email=user.email)
 
     async def get(self, user_id: uuid.UUID) -> Optional[schemas.User]:
+        cached = _user_cache.get(user_id)
+        if cached is not None:
+            return cached
+
         user = await self.user_repository.get_by_id(user_id)
-        return user
+        if not user:
+            return None
+        result = self.user_model_to_schema(user)
+        _user_cache.set(user_id, result)
+        return result
 
     async def delete(self, user_id: uuid.UUID) -> bool:
         await self.user_repository.delete(user_id)
+        await self.user_repository.notify(USER_INVALIDATION_CHANNEL, str(user_id))
+        await self.user_repository.commit()
+        _user_cache.pop(user_id)
         return True
 
     async def register_user(self, name: str, email: str, password: str) -> schemas.User:
-        existing_user = await self.user_repository.get_by_email(email)
-        if existing_user:
-            raise ValueError("User with this email already exists.")
-
-        hashed_password = self._hash_password(password)
+        hashed_password = await password_hasher.hash(password)
+        # Уникальность email проверяет сам INSERT (ON CONFLICT DO NOTHING)
         user = await self.user_repository.create(name=name, email=email, password=hashed_password)
+        if user is None:
+            raise ValueError("User with this email already exists.")
+        await self.user_repository.commit()
         return self.user_model_to_schema(user)
 
     async def authenticate_user(self, email: str, password: str) -> Optional[models.User]:
@@ -41,11 +89,26 @@ class UserService:
         if not user:
             return None
 
-        if not self._verify_password(password, user.password):
+        # Не держим соединение, пока bcrypt проверяет пароль
+        await self.user_repository.commit()
+        if not await password_hasher.verify(password, user.password):
             return None
 
+        if password_hasher.needs_rehash(user.password):
+            await self._rehash(user, password)
+
         return user
 
+    async def _rehash(self, user: models.User, password: str) -> None:
+        # Work factor изменился: пароль известен только сейчас, при входе
+        try:
+            new_hash = await password_hasher.hash(password)
+        except PasswordHasherBusyError:
+            return  # пересчитаем при следующем входе
+        await self.user_repository.update_password(user.id, new_hash)
+        await self.user_repository.commit()
+        logger.info("Rehashed password of user %s with new work factor", user.id)
+
     async def register_or_login(self, email: str, password: Optional[str] = None) -> schemas.User:
         user = await self.user_repository.get_by_email(email)
         if user:
@@ -54,8 +117,9 @@ class UserService:
         if not password:
             raise ValueError("Password required for new registration.")
 
-        hashed_password = self._hash_password(password)
+        hashed_password = await password_hasher.hash(password)
         new_user = await self.user_repository.create(email=email, password=hashed_password)
+        await self.user_repository.commit()
         return self.user_model_to_schema(new_user)
 
     async def register_or_login_google(self,
@@ -70,19 +134,8 @@ class UserService:
             email=email,
             password=None
         )
+        if new_user is None:
+            # Параллельный вход тем же аккаунтом успел создать пользователя
+            new_user = await self.user_repository.get_by_email(email)
+        await self.user_repository.commit()
         return self.user_model_to_schema(new_user)
-
-    @staticmethod
-    def _hash_password(password: str) -> str:
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(password.encode("utf-8"), salt)
-        return hashed.decode("utf-8")
-
-    @staticmethod
-    def _verify_password(plain_password: str, hashed_password: str) -> bool:
-        if not hashed_password or not plain_password:
-            return False
-        return bcrypt.checkpw(
-            plain_password.encode("utf-8"),
-            hashed_password.encode("utf-8")
-        )
\ No newline at end of file
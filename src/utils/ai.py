@@ -1,55 +1,113 @@
 import json
 import re
-from typing import List, Dict, Tuple
-import asyncio
-
-from google import genai
-from google.genai import types
+from enum import Enum
+from typing import AsyncIterator, List, Dict, Tuple
 
 from src.config import settings
+from src.utils.concurrency import ConcurrencyGovernor
+from src.utils.llm import create_provider
+from src.utils.resilience import CircuitBreaker, ResilienceLayer, RetryBudget
+from src.utils.timing import measure, record_llm_tokens
+
+
+class AICallType(str, Enum):
+    INTERVIEW_REPLY = "interview_reply"
+    CHAT_TITLE = "chat_title"
+    RESUME_SCORING = "resume_scoring"
+    INTERVIEW_SUMMARY = "interview_summary"
+
+
+# Провайдер выбирается через LLM_PROVIDER (gemini / fake)
+provider = create_provider(settings)
+
+# Отдельные бюджеты на каждый тип вызова, чтобы скоринг не вытеснял интервью
+governor = ConcurrencyGovernor({
+    AICallType.INTERVIEW_REPLY.value: settings.AI_MAX_CONCURRENT_INTERVIEW_REPLY,
+    AICallType.CHAT_TITLE.value: settings.AI_MAX_CONCURRENT_CHAT_TITLE,
+    AICallType.RESUME_SCORING.value: settings.AI_MAX_CONCURRENT_RESUME_SCORING,
+    AICallType.INTERVIEW_SUMMARY.value: settings.AI_MAX_CONCURRENT_INTERVIEW_SUMMARY,
+})
+
+resilience = ResilienceLayer(
+    deadlines={
+        AICallType.INTERVIEW_REPLY.value: settings.LLM_DEADLINE_INTERVIEW_REPLY_SECONDS,
+        AICallType.CHAT_TITLE.value: settings.LLM_DEADLINE_CHAT_TITLE_SECONDS,
+        AICallType.RESUME_SCORING.value: settings.LLM_DEADLINE_RESUME_SCORING_SECONDS,
+        AICallType.INTERVIEW_SUMMARY.value: settings.LLM_DEADLINE_INTERVIEW_SUMMARY_SECONDS,
+    },
+    hedge_call_types=settings.LLM_HEDGE_CALL_TYPES,
+    hedge_percentile=settings.LLM_HEDGE_PERCENTILE,
+    hedge_min_samples=settings.LLM_HEDGE_MIN_SAMPLES,
+    max_retries=settings.LLM_MAX_RETRIES,
+    retry_backoff=settings.LLM_RETRY_BACKOFF_SECONDS,
+    retry_budgets={
+        call_type.value: RetryBudget(
+            ratio=settings.LLM_RETRY_BUDGET_RATIO,
+            max_tokens=settings.LLM_RETRY_BUDGET_MAX_TOKENS,
+        )
+        for call_type in AICallType
+    },
+    breakers={
+        call_type.value: CircuitBreaker(
+            failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+            open_seconds=settings.LLM_BREAKER_OPEN_SECONDS,
+        )
+        for call_type in AICallType
+    },
+)
 
 
-# Инициализация Gemini-клиента
-client = genai.Client(api_key=settings.GEMINI_API_KEY)
-
-
-async def _generate_with_gemini(
+async def _generate(
     model: str,
     system_instruction: str,
     prompt: str,
+    call_type: AICallType,
     temperature: float = 0.4,
 ) -> str:
-
-    config = types.GenerateContentConfig(
-        system_instruction=system_instruction,
-        temperature=temperature,
-    )
-
-    def _call():
-        return client.models.generate_content(
-            model=model,
-            contents=prompt,
-            config=config,
-        )
-
-    response = await asyncio.to_thread(_call)
+    async def _call():
+        async with governor.slot(call_type.value):
+            return await provider.generate(
+                model=model,
+                system_instruction=system_instruction,
+                prompt=prompt,
+                temperature=temperature,
+                call_type=call_type.value,
+            )
+
+    with measure("llm"):
+        response = await resilience.call(call_type.value, _call)
+    record_llm_tokens(response.input_tokens, response.output_tokens)
     return response.text
 
 
-from typing import List, Dict
+async def _stream(
+    model: str,
+    system_instruction: str,
+    prompt: str,
+    call_type: AICallType,
+    temperature: float = 0.4,
+) -> AsyncIterator[str]:
+    async def _call():
+        async with governor.slot(call_type.value):
+            async for chunk in provider.stream(
+                model=model,
+                system_instruction=system_instruction,
+                prompt=prompt,
+                temperature=temperature,
+                call_type=call_type.value,
+            ):
+                yield chunk
+
+    # Провайдеры не отдают число токенов в потоке — замеряется только время
+    with measure("llm"):
+        async for chunk in resilience.stream(call_type.value, _call):
+            yield chunk
 
-async def generate_interview_reply(
-    messages: List[Dict[str, str]],
-    model: str | None = None,
-) -> str:
-    has_assistant_messages = any(m.get("role") == "assistant" for m in messages)
 
-    if not has_assistant_messages:
-        return "Hello! What position are you applying for?"
+INTERVIEW_GREETING = "Hello! What position are you applying for?"
 
-    if model is None:
-        model = getattr(settings, "GEMINI_MODEL", "gemini-2.5-flash")
 
+def _build_interview_prompt(messages: List[Dict[str, str]]) -> Tuple[str, str]:
     system_instruction: str | None = None
     conversation_lines: List[str] = []
 
@@ -71,16 +129,57 @@ async def generate_interview_reply(
             "Ask follow-up questions, assess answers and provide concise feedback."
         )
 
-    prompt = "\n".join(conversation_lines)
+    return system_instruction, "\n".join(conversation_lines)
 
-    return await _generate_with_gemini(
+
+async def generate_interview_reply(
+    messages: List[Dict[str, str]],
+    model: str | None = None,
+) -> str:
+    has_assistant_messages = any(m.get("role") == "assistant" for m in messages)
+
+    if not has_assistant_messages:
+        return INTERVIEW_GREETING
+
+    if model is None:
+        model = getattr(settings, "GEMINI_MODEL", "gemini-2.5-flash")
+
+    system_instruction, prompt = _build_interview_prompt(messages)
+
+    return await _generate(
         model=model,
         system_instruction=system_instruction,
         prompt=prompt,
+        call_type=AICallType.INTERVIEW_REPLY,
         temperature=0.4,
     )
 
 
+async def stream_interview_reply(
+    messages: List[Dict[str, str]],
+    model: str | None = None,
+) -> AsyncIterator[str]:
+    has_assistant_messages = any(m.get("role") == "assistant" for m in messages)
+
+    if not has_assistant_messages:
+        yield INTERVIEW_GREETING
+        return
+
+    if model is None:
+        model = getattr(settings, "GEMINI_MODEL", "gemini-2.5-flash")
+
+    system_instruction, prompt = _build_interview_prompt(messages)
+
+    async for chunk in _stream(
+        model=model,
+        system_instruction=system_instruction,
+        prompt=prompt,
+        call_type=AICallType.INTERVIEW_REPLY,
+        temperature=0.4,
+    ):
+        yield chunk
+
+
 async def generate_chat_title(
     messages: List[Dict[str, str]],
     model: str | None = None,
@@ -107,25 +206,84 @@ async def generate_chat_title(
         "Just display one headline."
     )
 
-    title = await _generate_with_gemini(
+    title = await _generate(
         model=model,
         system_instruction=system_instruction,
         prompt=prompt,
+        call_type=AICallType.CHAT_TITLE,
         temperature=0.3,
     )
 
     return title.strip()
 
 
+# Увеличивать при любом изменении промпта скоринга — сбрасывает кэш оценок
+SCORING_PROMPT_VERSION = "1"
+
+
+async def summarize_interview(
+    previous_summary: str | None,
+    messages: List[Dict[str, str]],
+    model: str | None = None,
+) -> str:
+    if model is None:
+        model = getattr(settings, "GEMINI_MODEL", "gemini-2.5-flash")
+
+    conversation_lines = [
+        f"{m.get('role', 'user').upper()}: {m.get('content', '')}"
+        for m in messages
+        if m.get("role") != "system"
+    ]
+
+    prompt_parts = []
+    if previous_summary:
+        prompt_parts.append(f"Current summary:\n{previous_summary}")
+    prompt_parts.append("New messages:\n" + "\n".join(conversation_lines))
+    prompt = "\n\n".join(prompt_parts)
+
+    system_instruction = (
+        "You maintain a running summary of a technical interview. "
+        "Merge the current summary with the new messages into one updated summary. "
+        "Keep the position, topics covered, questions asked, the candidate's key answers "
+        "and your assessment of them. Be concise: at most 200 words. "
+        "Output only the summary text."
+    )
+
+    summary = await _generate(
+        model=model,
+        system_instruction=system_instruction,
+        prompt=prompt,
+        call_type=AICallType.INTERVIEW_SUMMARY,
+        temperature=0.2,
+    )
+
+    return summary.strip()
+
+
+def _resume_to_json_str(resume: dict | list | str) -> str:
+    if isinstance(resume, (dict, list)):
+        return json.dumps(resume, ensure_ascii=False, indent=2)
+    return str(resume)
+
+
+def _parse_score(data: dict) -> Tuple[int, str]:
+    if "score" not in data:
+        raise ValueError(f"No 'score' field in Gemini response: {data!r}")
+
+    score = int(data["score"])
+    score = max(1, min(100, score))
+
+    reason = str(data.get("reason", "")).strip()
+
+    return score, reason
+
+
 async def score_resume_json(
     resume: dict | list | str,
 ) -> Tuple[int, str]:
     model = getattr(settings, "GEMINI_MODEL", "gemini-2.5-flash")
 
-    if isinstance(resume, (dict, list)):
-        resume_json_str = json.dumps(resume, ensure_ascii=False, indent=2)
-    else:
-        resume_json_str = str(resume)
+    resume_json_str = _resume_to_json_str(resume)
 
     system_instruction = (
         "You are a strict technical recruiter. "
@@ -143,10 +301,11 @@ async def score_resume_json(
         f"```json\n{resume_json_str}\n```"
     )
 
-    raw = await _generate_with_gemini(
+    raw = await _generate(
         model=model,
         system_instruction=system_instruction,
         prompt=prompt,
+        call_type=AICallType.RESUME_SCORING,
         temperature=0.2,
     )
 
@@ -161,12 +320,62 @@ async def score_resume_json(
     except json.JSONDecodeError as e:
         raise ValueError(f"Cannot parse JSON from Gemini response: {text!r}") from e
 
-    if "score" not in data:
-        raise ValueError(f"No 'score' field in Gemini response: {data!r}")
+    return _parse_score(data)
 
-    score = int(data["score"])
-    score = max(1, min(100, score))
 
-    reason = str(data.get("reason", "")).strip()
+async def score_resumes_json_batch(
+    resumes: List[dict | list | str],
+) -> List[Tuple[int, str] | None]:
+    """
+    Оценивает несколько резюме одним запросом к модели.
+    Возвращает результаты в порядке входа; None — модель не вернула
+    корректную оценку для этого резюме.
+    """
+    model = getattr(settings, "GEMINI_MODEL", "gemini-2.5-flash")
+
+    system_instruction = (
+        "You are a strict technical recruiter. "
+        "You will receive several candidate resumes, each as JSON with a numeric id. "
+        "Evaluate each candidate independently: the overall quality of the candidate "
+        "and their suitability for a strong software engineering role on a scale "
+        "from 1 to 100. 1 = very poor candidate, 100 = outstanding candidate.\n\n"
+        "Respond ONLY with a JSON array containing one object per resume:\n"
+        '[{"id": <resume id>, "score": <integer 1-100>, "reason": "<short explanation>"}]\n'
+        "Do not include any other text, no markdown, no code fences."
+    )
+
+    blocks = [
+        f"Resume id {i}:\n```json\n{_resume_to_json_str(resume)}\n```"
+        for i, resume in enumerate(resumes)
+    ]
+    prompt = "Here are the candidate resumes:\n\n" + "\n\n".join(blocks)
+
+    raw = await _generate(
+        model=model,
+        system_instruction=system_instruction,
+        prompt=prompt,
+        call_type=AICallType.RESUME_SCORING,
+        temperature=0.2,
+    )
+
+    text = raw.strip()
+
+    json_match = re.search(r"\[.*\]", text, re.DOTALL)
+    if not json_match:
+        raise ValueError(f"Cannot find JSON array in Gemini response: {text!r}")
+
+    try:
+        items = json.loads(json_match.group(0))
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Cannot parse JSON from Gemini response: {text!r}") from e
+
+    results: List[Tuple[int, str] | None] = [None] * len(resumes)
+    for item in items if isinstance(items, list) else []:
+        try:
+            index = int(item["id"])
+            if 0 <= index < len(resumes):
+                results[index] = _parse_score(item)
+        except (KeyError, TypeError, ValueError):
+            continue
 
-    return score, reason
\ No newline at end of file
+    return results
@@ -0,0 +1,70 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict
+
+
+@dataclass
+class LimiterStats:
+    limit: int
+    in_flight: int = 0
+    waiting: int = 0
+    max_waiting: int = 0
+    acquired: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+
+class ConcurrencyGovernor:
+    """
+    Набор именованных семафоров: у каждого типа вызова свой бюджет,
+    поэтому поток одного типа не может занять слоты другого.
+    """
+
+    def __init__(self, limits: Dict[str, int]):
+        self._semaphores = {
+            name: asyncio.Semaphore(limit) for name, limit in limits.items()
+        }
+        self._stats = {
+            name: LimiterStats(limit=limit) for name, limit in limits.items()
+        }
+
+    @asynccontextmanager
+    async def slot(self, name: str) -> AsyncIterator[None]:
+        semaphore = self._semaphores[name]
+        stats = self._stats[name]
+
+        stats.waiting += 1
+        stats.max_waiting = max(stats.max_waiting, stats.waiting)
+        started = time.perf_counter()
+        try:
+            await semaphore.acquire()
+        finally:
+            stats.waiting -= 1
+
+        waited = time.perf_counter() - started
+        stats.acquired += 1
+        stats.total_wait_seconds += waited
+        stats.max_wait_seconds = max(stats.max_wait_seconds, waited)
+        stats.in_flight += 1
+        try:
+            yield
+        finally:
+            stats.in_flight -= 1
+            semaphore.release()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        result = {}
+        for name, stats in self._stats.items():
+            avg_wait = stats.total_wait_seconds / stats.acquired if stats.acquired else 0.0
+            result[name] = {
+                "limit": stats.limit,
+                "in_flight": stats.in_flight,
+                "queue_depth": stats.waiting,
+                "max_queue_depth": stats.max_waiting,
+                "acquired": stats.acquired,
+                "avg_wait_seconds": round(avg_wait, 4),
+                "max_wait_seconds": round(stats.max_wait_seconds, 4),
+            }
+        return result
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import math
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+import jwt
+
+from src.config import settings
+
+GOOGLE_ISSUERS = ("https://accounts.google.com", "accounts.google.com")
+
+
+class GoogleOAuthError(Exception):
+    pass
+
+
+class GoogleOAuthClient:
+    """
+    Один HTTP-клиент с пулом соединений на всё время жизни приложения.
+    id_token проверяется локально по закэшированному JWKS, поэтому
+    после обмена кода на токены запрос к userinfo не нужен.
+    """
+
+    def __init__(
+        self,
+        client_id: str,
+        client_secret: str,
+        token_url: str,
+        jwks_url: str,
+        jwks_cache_seconds: float,
+        jwks_min_refresh_seconds: float,
+        timeout_seconds: float,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.token_url = token_url
+        self.jwks_url = jwks_url
+        self.jwks_cache_seconds = jwks_cache_seconds
+        self.jwks_min_refresh_seconds = jwks_min_refresh_seconds
+        self.timeout_seconds = timeout_seconds
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._keys: Dict[str, Any] = {}
+        # monotonic() отсчитывается от загрузки системы: с 0.0 пустой набор
+        # ключей на недавно запущенном хосте выглядел бы свежим
+        self._keys_fetched_at = -math.inf
+        self._refresh_lock = asyncio.Lock()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout_seconds, transport=self.transport)
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def exchange_code(self, code: str, redirect_uri: str) -> Dict[str, Any]:
+        data = {
+            "code": code,
+            "client_id": self.client_id,
+            "client_secret": self.client_secret,
+            "redirect_uri": redirect_uri,
+            "grant_type": "authorization_code",
+        }
+        try:
+            response = await self.client.post(self.token_url, data=data)
+            response.raise_for_status()
+            return response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            raise GoogleOAuthError("Token exchange failed") from e
+
+    async def _refresh_keys(self, force: bool) -> None:
+        async with self._refresh_lock:
+            age = time.monotonic() - self._keys_fetched_at
+            # Пока ждали блокировку, ключи мог обновить другой запрос
+            fresh = age < (self.jwks_min_refresh_seconds if force else self.jwks_cache_seconds)
+            if fresh and self._keys:
+                return
+            try:
+                response = await self.client.get(self.jwks_url)
+                response.raise_for_status()
+                keys = {
+                    jwk["kid"]: jwt.PyJWK(jwk).key
+                    for jwk in response.json()["keys"]
+                    if "kid" in jwk
+                }
+            except (httpx.HTTPError, ValueError, KeyError, jwt.PyJWKError) as e:
+                if self._keys:
+                    return  # оставляем прежние ключи, обновим позже
+                raise GoogleOAuthError("Failed to load Google signing keys") from e
+            self._keys = keys
+            self._keys_fetched_at = time.monotonic()
+
+    async def _signing_key(self, kid: str) -> Any:
+        await self._refresh_keys(force=False)
+        if kid not in self._keys:
+            # Google ротирует ключи: неизвестный kid — повод перечитать JWKS
+            await self._refresh_keys(force=True)
+        try:
+            return self._keys[kid]
+        except KeyError:
+            raise GoogleOAuthError("Unknown id_token signing key") from None
+
+    async def verify_id_token(self, id_token: str) -> Dict[str, Any]:
+        try:
+            header = jwt.get_unverified_header(id_token)
+            key = await self._signing_key(header["kid"])
+            claims = jwt.decode(
+                id_token,
+                key,
+                algorithms=["RS256"],
+                audience=self.client_id,
+                options={"require": ["exp", "iat", "iss", "aud", "sub"]},
+            )
+        except (jwt.InvalidTokenError, KeyError, json.JSONDecodeError) as e:
+            raise GoogleOAuthError("Invalid id_token") from e
+
+        if claims["iss"] not in GOOGLE_ISSUERS:
+            raise GoogleOAuthError("Invalid id_token issuer")
+        if not claims.get("email") or not claims.get("email_verified"):
+            raise GoogleOAuthError("Google account email is not verified")
+        return claims
+
+
+google_oauth = GoogleOAuthClient(
+    client_id=settings.GOOGLE_AUTH_CLIENT_ID,
+    client_secret=settings.GOOGLE_AUTH_SECRET,
+    token_url=settings.GOOGLE_TOKEN_URL,
+    jwks_url=settings.GOOGLE_JWKS_URL,
+    jwks_cache_seconds=settings.GOOGLE_JWKS_CACHE_SECONDS,
+    jwks_min_refresh_seconds=settings.GOOGLE_JWKS_MIN_REFRESH_SECONDS,
+    timeout_seconds=settings.GOOGLE_HTTP_TIMEOUT_SECONDS,
+)
@@ -0,0 +1,49 @@
+from typing import Dict, List, Tuple
+
+MESSAGES_PER_TURN = 2
+
+
+def estimate_tokens(text: str) -> int:
+    # Грубая оценка без токенизатора: ~4 символа на токен
+    return len(text) // 4 + 1
+
+
+def split_for_summary(
+    messages: List[Dict[str, str]],
+    window_turns: int,
+    slide_turns: int,
+) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+    """
+    Делит ещё не суммаризированные сообщения на (уходящие в summary, окно).
+    Окно сдвигается шагами по slide_turns ходов, а не на каждом ходе,
+    поэтому summary пересчитывается редко.
+    """
+    window_size = window_turns * MESSAGES_PER_TURN
+    if len(messages) <= window_size + slide_turns * MESSAGES_PER_TURN:
+        return [], messages
+
+    cut = len(messages) - window_size
+    return messages[:cut], messages[cut:]
+
+
+def fit_to_budget(
+    fixed_parts: List[str],
+    window: List[Dict[str, str]],
+    token_budget: int,
+) -> List[Dict[str, str]]:
+    """
+    Оставляет самые свежие сообщения окна, которые помещаются в бюджет.
+    Последний ход (вопрос и ответ) сохраняется всегда.
+    """
+    used = sum(estimate_tokens(part) for part in fixed_parts)
+    kept: List[Dict[str, str]] = []
+
+    for m in reversed(window):
+        cost = estimate_tokens(m["content"]) + 2
+        if len(kept) >= MESSAGES_PER_TURN and used + cost > token_budget:
+            break
+        kept.append(m)
+        used += cost
+
+    kept.reverse()
+    return kept
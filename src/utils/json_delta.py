@@ -0,0 +1,52 @@
+import copy
+from typing import Any, List, Sequence
+
+# Дельта — список операций ["set", path, value] / ["del", path],
+# где path — список ключей и индексов от корня документа
+
+
+def diff(old: Any, new: Any, path: Sequence[Any] = ()) -> List[list]:
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops: List[list] = []
+        for key in old:
+            if key not in new:
+                ops.append(["del", [*path, key]])
+        for key, value in new.items():
+            if key not in old:
+                ops.append(["set", [*path, key], value])
+            elif old[key] != value:
+                ops.extend(diff(old[key], value, (*path, key)))
+        return ops
+
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        # Правка одного элемента не переписывает весь список (опыт работы,
+        # навыки); при вставке или удалении индексы сдвигаются — тогда целиком
+        ops = []
+        for index, (old_item, new_item) in enumerate(zip(old, new)):
+            if old_item != new_item:
+                ops.extend(diff(old_item, new_item, (*path, index)))
+        return ops
+
+    if old == new:
+        return []
+    # Скаляры и списки другой длины заменяются целиком
+    return [["set", list(path), new]]
+
+
+def apply(base: Any, ops: List[list]) -> Any:
+    result = copy.deepcopy(base)
+    for op in ops:
+        action, path = op[0], op[1]
+        if not path:
+            result = copy.deepcopy(op[2]) if action == "set" else None
+            continue
+
+        target = result
+        for key in path[:-1]:
+            target = target[key]
+
+        if action == "set":
+            target[path[-1]] = copy.deepcopy(op[2])
+        else:
+            target.pop(path[-1], None)
+    return result
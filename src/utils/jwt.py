@@ -4,11 +4,15 @@ import jwt
 from datetime import datetime, timedelta
 from typing import Optional
 
+from starlette.requests import Request
+
 from src.config import settings
 
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60  # 1 час
 
+_NOT_DECODED = object()
+
 
 def create_access_token(user_id: uuid.UUID) -> str:
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -28,4 +32,23 @@ def decode_access_token(token: str) -> Optional[uuid.UUID]:
     except jwt.ExpiredSignatureError:
         return None
     except jwt.InvalidTokenError:
-        return None
\ No newline at end of file
+        return None
+
+
+def bearer_user_id(authorization: Optional[str]) -> Optional[uuid.UUID]:
+    """user_id из заголовка Authorization или None, если токена нет или он невалиден."""
+    if not authorization or not authorization.startswith("Bearer "):
+        return None
+    return decode_access_token(authorization[len("Bearer "):].strip())
+
+
+def request_user_id(request: Request) -> Optional[uuid.UUID]:
+    """
+    bearer_user_id текущего запроса. Токен разбирается один раз: middleware,
+    get_db и get_current_user берут результат из request.state.
+    """
+    user_id = getattr(request.state, "user_id", _NOT_DECODED)
+    if user_id is _NOT_DECODED:
+        user_id = bearer_user_id(request.headers.get("Authorization"))
+        request.state.user_id = user_id
+    return user_id
@@ -0,0 +1,29 @@
+from src.config import Settings
+from src.utils.llm.base import LLMProvider, LLMResponse
+
+
+def create_provider(settings: Settings) -> LLMProvider:
+    if settings.LLM_PROVIDER == "gemini":
+        from src.utils.llm.gemini import GeminiProvider
+
+        return GeminiProvider(
+            api_key=settings.GEMINI_API_KEY,
+            max_connections=settings.AI_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.AI_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        )
+
+    if settings.LLM_PROVIDER == "fake":
+        from src.utils.llm.fake import FakeProvider
+
+        return FakeProvider(
+            seed=settings.FAKE_LLM_SEED,
+            latency_distribution=settings.FAKE_LLM_LATENCY_DISTRIBUTION,
+            latency_ms=settings.FAKE_LLM_LATENCY_MS,
+            latency_spread_ms=settings.FAKE_LLM_LATENCY_SPREAD_MS,
+            error_rate=settings.FAKE_LLM_ERROR_RATE,
+        )
+
+    raise ValueError(f"Unknown LLM provider: {settings.LLM_PROVIDER}")
+
+
+__all__ = ["LLMProvider", "LLMResponse", "create_provider"]
@@ -0,0 +1,36 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+
+@dataclass
+class LLMResponse:
+    text: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+
+class LLMProvider(ABC):
+    name: str
+
+    @abstractmethod
+    async def generate(
+        self,
+        model: str,
+        system_instruction: str,
+        prompt: str,
+        temperature: float,
+        call_type: str,
+    ) -> LLMResponse:
+        ...
+
+    @abstractmethod
+    def stream(
+        self,
+        model: str,
+        system_instruction: str,
+        prompt: str,
+        temperature: float,
+        call_type: str,
+    ) -> AsyncIterator[str]:
+        ...
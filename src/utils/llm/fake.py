@@ -0,0 +1,146 @@
+import asyncio
+import hashlib
+import json
+import random
+import re
+from typing import AsyncIterator
+
+from src.utils.llm.base import LLMProvider, LLMResponse
+
+INTERVIEW_QUESTIONS = [
+    "Can you walk me through a recent project you are proud of?",
+    "How would you design a rate limiter for a public API?",
+    "What trade-offs do you consider when choosing between SQL and NoSQL storage?",
+    "Tell me about a production incident you debugged. What was the root cause?",
+    "How do you make sure your code is easy to test?",
+    "Explain how you would profile a slow endpoint.",
+]
+
+
+class FakeProviderError(Exception):
+    # Имитирует 503 провайдера: ResilienceLayer считает ошибку временной
+    code = 503
+
+
+class FakeProvider(LLMProvider):
+    """
+    Локальный провайдер без сети для нагрузочных тестов и разработки.
+    Ответы детерминированы (зависят от seed и промпта), задержки и ошибки
+    настраиваются.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        seed: int = 0,
+        latency_distribution: str = "fixed",
+        latency_ms: float = 0.0,
+        latency_spread_ms: float = 0.0,
+        error_rate: float = 0.0,
+        stream_chunk_words: int = 3,
+    ):
+        if latency_distribution not in ("fixed", "uniform", "normal", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {latency_distribution}")
+
+        self.seed = seed
+        self.latency_distribution = latency_distribution
+        self.latency_ms = latency_ms
+        self.latency_spread_ms = latency_spread_ms
+        self.error_rate = error_rate
+        self.stream_chunk_words = max(1, stream_chunk_words)
+        # Отдельный генератор для задержек и ошибок: последовательность
+        # воспроизводима при одном и том же seed
+        self._rng = random.Random(seed)
+
+    def _latency_seconds(self) -> float:
+        mean = self.latency_ms
+        spread = self.latency_spread_ms
+
+        if self.latency_distribution == "uniform":
+            value = self._rng.uniform(mean - spread, mean + spread)
+        elif self.latency_distribution == "normal":
+            value = self._rng.gauss(mean, spread)
+        elif self.latency_distribution == "lognormal":
+            # spread задаёт sigma лог-нормального распределения в долях от mean
+            sigma = spread / mean if mean > 0 else 0.0
+            value = mean * self._rng.lognormvariate(0.0, sigma)
+        else:
+            value = mean
+
+        return max(0.0, value) / 1000
+
+    def _maybe_fail(self) -> None:
+        if self.error_rate > 0 and self._rng.random() < self.error_rate:
+            raise FakeProviderError("Injected fake LLM failure")
+
+    def _prompt_rng(self, system_instruction: str, prompt: str) -> random.Random:
+        digest = hashlib.sha256(
+            f"{self.seed}\n{system_instruction}\n{prompt}".encode("utf-8")
+        ).digest()
+        return random.Random(int.from_bytes(digest[:8], "big"))
+
+    def _render(self, system_instruction: str, prompt: str, call_type: str) -> str:
+        rng = self._prompt_rng(system_instruction, prompt)
+
+        if call_type == "resume_scoring":
+            ids = [int(i) for i in re.findall(r"Resume id (\d+)", prompt)]
+            if ids:
+                return json.dumps([
+                    {"id": i, "score": rng.randint(1, 100), "reason": "Fake batch score."}
+                    for i in ids
+                ])
+            return json.dumps({"score": rng.randint(1, 100), "reason": "Fake score."})
+
+        if call_type == "chat_title":
+            words = re.findall(r"\w+", prompt.split(":", 1)[-1])[:5]
+            return "Interview: " + " ".join(words) if words else "Interview"
+
+        if call_type == "interview_summary":
+            return f"Summary of {prompt.count(chr(10)) + 1} lines of interview."
+
+        return rng.choice(INTERVIEW_QUESTIONS)
+
+    async def generate(
+        self,
+        model: str,
+        system_instruction: str,
+        prompt: str,
+        temperature: float,
+        call_type: str,
+    ) -> LLMResponse:
+        await asyncio.sleep(self._latency_seconds())
+        self._maybe_fail()
+
+        text = self._render(system_instruction, prompt, call_type)
+        return LLMResponse(
+            text=text,
+            input_tokens=(len(system_instruction) + len(prompt)) // 4 + 1,
+            output_tokens=len(text) // 4 + 1,
+        )
+
+    async def stream(
+        self,
+        model: str,
+        system_instruction: str,
+        prompt: str,
+        temperature: float,
+        call_type: str,
+    ) -> AsyncIterator[str]:
+        total = self._latency_seconds()
+        text = self._render(system_instruction, prompt, call_type)
+        words = text.split(" ")
+        chunks = [
+            " ".join(words[i:i + self.stream_chunk_words]) + " "
+            for i in range(0, len(words), self.stream_chunk_words)
+        ]
+        chunks[-1] = chunks[-1].rstrip()
+
+        # Первый чанк приходит через ~20% общей задержки, остальные равномерно
+        await asyncio.sleep(total * 0.2)
+        self._maybe_fail()
+        step = total * 0.8 / len(chunks)
+        for i, chunk in enumerate(chunks):
+            if i:
+                await asyncio.sleep(step)
+            yield chunk
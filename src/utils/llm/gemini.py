@@ -0,0 +1,76 @@
+from typing import AsyncIterator
+
+import httpx
+from google import genai
+from google.genai import types
+
+from src.utils.llm.base import LLMProvider, LLMResponse
+
+
+class GeminiProvider(LLMProvider):
+    name = "gemini"
+
+    def __init__(
+        self,
+        api_key: str,
+        max_connections: int,
+        max_keepalive_connections: int,
+    ):
+        # Один общий пул HTTP-соединений на процесс
+        self.client = genai.Client(
+            api_key=api_key,
+            http_options=types.HttpOptions(
+                async_client_args={
+                    "limits": httpx.Limits(
+                        max_connections=max_connections,
+                        max_keepalive_connections=max_keepalive_connections,
+                    ),
+                },
+            ),
+        )
+
+    async def generate(
+        self,
+        model: str,
+        system_instruction: str,
+        prompt: str,
+        temperature: float,
+        call_type: str,
+    ) -> LLMResponse:
+        config = types.GenerateContentConfig(
+            system_instruction=system_instruction,
+            temperature=temperature,
+        )
+        response = await self.client.aio.models.generate_content(
+            model=model,
+            contents=prompt,
+            config=config,
+        )
+
+        usage = response.usage_metadata
+        return LLMResponse(
+            text=response.text or "",
+            input_tokens=(usage.prompt_token_count or 0) if usage else 0,
+            output_tokens=(usage.candidates_token_count or 0) if usage else 0,
+        )
+
+    async def stream(
+        self,
+        model: str,
+        system_instruction: str,
+        prompt: str,
+        temperature: float,
+        call_type: str,
+    ) -> AsyncIterator[str]:
+        config = types.GenerateContentConfig(
+            system_instruction=system_instruction,
+            temperature=temperature,
+        )
+        stream = await self.client.aio.models.generate_content_stream(
+            model=model,
+            contents=prompt,
+            config=config,
+        )
+        async for chunk in stream:
+            if chunk.text:
+                yield chunk.text
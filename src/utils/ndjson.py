@@ -0,0 +1,50 @@
+from typing import AsyncIterator, Optional, Tuple
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes],
+    max_line_bytes: int,
+) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """
+    Режет поток байтов на строки NDJSON, держа в памяти не больше одной строки.
+    Отдаёт (номер строки, строка); пустые строки пропускаются, а строка
+    длиннее max_line_bytes отдаётся как None и дальше не накапливается.
+    """
+    buffer = bytearray()
+    oversized = False
+    line_number = 0
+
+    def finish_line() -> Optional[Tuple[int, Optional[bytes]]]:
+        if oversized or len(buffer) > max_line_bytes:
+            return line_number, None
+        if buffer.strip():
+            return line_number, bytes(buffer)
+        return None
+
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if end == -1:
+                if not oversized:
+                    buffer += chunk[start:]
+                    if len(buffer) > max_line_bytes:
+                        oversized = True
+                        buffer.clear()
+                break
+
+            line_number += 1
+            if not oversized:
+                buffer += chunk[start:end]
+            item = finish_line()
+            if item is not None:
+                yield item
+            buffer.clear()
+            oversized = False
+            start = end + 1
+
+    if buffer or oversized:
+        line_number += 1
+        item = finish_line()
+        if item is not None:
+            yield item
@@ -0,0 +1,58 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Callable, List, NamedTuple, Optional, Sequence, Tuple, TypeVar
+from uuid import UUID
+
+T = TypeVar("T")
+
+AFTER = "after"
+BEFORE = "before"
+
+
+class Cursor(NamedTuple):
+    created_at: datetime
+    id: UUID
+    direction: str = AFTER
+    # Значения дополнительных ключей сортировки перед (created_at, id),
+    # None — сортировка только по (created_at, id)
+    sort_key: Optional[List[Any]] = None
+
+
+def encode_cursor(
+    created_at: datetime,
+    item_id: UUID,
+    direction: str = AFTER,
+    sort_key: Optional[List[Any]] = None,
+) -> str:
+    payload = [created_at.isoformat(), str(item_id), direction]
+    if sort_key is not None:
+        payload.append(sort_key)
+    raw = json.dumps(payload)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, item_id, direction, *rest = json.loads(base64.urlsafe_b64decode(padded))
+        if direction not in (AFTER, BEFORE):
+            raise ValueError(direction)
+        sort_key = rest[0] if rest else None
+        if len(rest) > 1 or (sort_key is not None and not isinstance(sort_key, list)):
+            raise ValueError(rest)
+        return Cursor(datetime.fromisoformat(created_at), UUID(item_id), direction, sort_key)
+    except (ValueError, TypeError, binascii.Error) as e:
+        raise ValueError("Invalid cursor.") from e
+
+
+def split_page(
+    rows: Sequence[T],
+    limit: int,
+    cursor_for: Callable[[T], str],
+) -> Tuple[List[T], Optional[str]]:
+    """rows запрошены с limit + 1: лишняя строка означает, что есть следующая страница."""
+    items = list(rows[:limit])
+    next_cursor = cursor_for(items[-1]) if len(rows) > limit and items else None
+    return items, next_cursor
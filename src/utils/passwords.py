@@ -0,0 +1,81 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+import bcrypt
+
+from src.utils.timing import measure
+
+T = TypeVar("T")
+
+
+class PasswordHasherBusyError(Exception):
+    """Очередь хэширования заполнена: запрос отклоняется сразу, а не ждёт."""
+
+    def __init__(self, retry_after: float):
+        super().__init__("Password hashing is overloaded")
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """
+    bcrypt в отдельном пуле потоков (bcrypt отпускает GIL на время
+    вычисления), поэтому хэширование не блокирует event loop.
+    Одновременно принимается не больше workers + max_queue операций,
+    остальные сразу получают PasswordHasherBusyError.
+    """
+
+    def __init__(self, rounds: int, workers: int, max_queue: int, retry_after: float):
+        self.rounds = rounds
+        self.workers = workers
+        self.retry_after = retry_after
+        self._limit = workers + max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._pending = 0
+        self._rejected = 0
+
+    async def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        if self._pending >= self._limit:
+            self._rejected += 1
+            raise PasswordHasherBusyError(retry_after=self.retry_after)
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            with measure("bcrypt"):
+                return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        hashed = await self._run(
+            bcrypt.hashpw, password.encode("utf-8"), bcrypt.gensalt(rounds=self.rounds)
+        )
+        return hashed.decode("utf-8")
+
+    async def verify(self, password: str, hashed_password: Optional[str]) -> bool:
+        if not hashed_password or not password:
+            return False
+        try:
+            return await self._run(
+                bcrypt.checkpw, password.encode("utf-8"), hashed_password.encode("utf-8")
+            )
+        except ValueError:
+            # Повреждённый или не-bcrypt хэш
+            return False
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """Хэш создан с другим work factor: "$2b$<rounds>$..."."""
+        try:
+            return int(hashed_password.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return False
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "rounds": self.rounds,
+            "workers": self.workers,
+            "pending": self._pending,
+            "limit": self._limit,
+            "rejected": self._rejected,
+        }
@@ -0,0 +1,77 @@
+import asyncio
+import logging
+from typing import Callable, Optional
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+logger = logging.getLogger(__name__)
+
+
+def asyncpg_dsn(database_url: str) -> str:
+    """URL SQLAlchemy (postgresql+asyncpg://...) в DSN для asyncpg.connect."""
+    url = make_url(database_url).set(drivername="postgresql")
+    return url.render_as_string(hide_password=False)
+
+
+class PgNotificationListener:
+    """
+    Держит отдельное соединение с LISTEN на канал и вызывает callback на
+    каждое уведомление. При обрыве переподключается; on_reconnect
+    вызывается после каждого подключения, так как уведомления,
+    пришедшие без слушателя, потеряны.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        channel: str,
+        callback: Callable[[str], None],
+        on_reconnect: Optional[Callable[[], None]] = None,
+        reconnect_seconds: float = 5.0,
+    ):
+        self.dsn = dsn
+        self.channel = channel
+        self.callback = callback
+        self.on_reconnect = on_reconnect
+        self.reconnect_seconds = reconnect_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    def _on_notification(self, connection, pid, channel, payload) -> None:
+        try:
+            self.callback(payload)
+        except Exception:
+            logger.exception("Failed to handle notification on %s", channel)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                try:
+                    closed = asyncio.Event()
+                    connection.add_termination_listener(lambda _: closed.set())
+                    await connection.add_listener(self.channel, self._on_notification)
+                    if self.on_reconnect is not None:
+                        self.on_reconnect()
+                    await closed.wait()
+                finally:
+                    await connection.close()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("LISTEN %s failed, reconnecting", self.channel)
+            await asyncio.sleep(self.reconnect_seconds)
@@ -0,0 +1,78 @@
+import time
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+from src.utils.cache import TTLCache
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Token bucket: capacity — допустимый всплеск, per_minute — скорость пополнения."""
+
+    name: str
+    capacity: float
+    per_minute: float
+
+    @property
+    def rate(self) -> float:
+        return self.per_minute / 60
+
+    def result(self, allowed: bool, tokens: float, cost: float) -> "RateLimitResult":
+        tokens = max(0.0, tokens)
+        return RateLimitResult(
+            allowed=allowed,
+            limit=int(self.capacity),
+            remaining=int(tokens),
+            reset_seconds=(self.capacity - tokens) / self.rate,
+            retry_after=0.0 if allowed else (cost - tokens) / self.rate,
+        )
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    # Через сколько секунд бакет снова полон
+    reset_seconds: float
+    retry_after: float
+
+    def headers(self) -> Dict[str, str]:
+        headers = {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(int(-(-self.reset_seconds // 1))),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, int(-(-self.retry_after // 1))))
+        return headers
+
+
+class RateLimitExceededError(Exception):
+    def __init__(self, result: RateLimitResult):
+        super().__init__("Rate limit exceeded")
+        self.result = result
+
+
+class InMemoryRateLimitStore:
+    """
+    Бакеты в памяти процесса. При нескольких воркерах у каждого свои
+    бакеты — для общего лимита нужен RATE_LIMIT_STORE=postgres.
+    Вытесненный бакет считается полным.
+    """
+
+    def __init__(self, max_keys: int, stale_seconds: float):
+        self._buckets: TTLCache[str, Tuple[float, float]] = TTLCache(
+            maxsize=max_keys, ttl=stale_seconds
+        )
+
+    async def take(self, key: str, limit: RateLimit, cost: float = 1.0) -> RateLimitResult:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key) or (limit.capacity, now)
+        tokens = min(limit.capacity, tokens + (now - updated_at) * limit.rate)
+
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        self._buckets.set(key, (tokens, now))
+        return limit.result(allowed, tokens, cost)
@@ -0,0 +1,357 @@
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Optional, TypeVar
+
+import httpx
+
+T = TypeVar("T")
+
+# 408 и 429 — провайдер перегружен, а не отверг запрос
+TRANSIENT_STATUS_CODES = {408, 429}
+
+
+class LLMError(Exception):
+    pass
+
+
+class LLMUnavailableError(LLMError):
+    """Circuit breaker открыт: провайдер считается недоступным."""
+
+    def __init__(self, retry_after: float):
+        super().__init__("LLM provider is temporarily unavailable")
+        self.retry_after = retry_after
+
+
+class LLMTimeoutError(LLMError):
+    def __init__(self, call_type: str, deadline: float):
+        super().__init__(f"LLM call {call_type!r} exceeded deadline of {deadline}s")
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code
+    # google.genai.errors.APIError и похожие ошибки SDK
+    code = getattr(error, "code", None)
+    if code is None:
+        code = getattr(error, "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """
+    Таймауты, сетевые ошибки, 408/429 и 5xx. Остальное (4xx, ошибки
+    валидации и разбора ответа) повтор не исправит, и о здоровье
+    провайдера оно ничего не говорит.
+    """
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError, httpx.TransportError)):
+        return True
+    status = _status_code(error)
+    return status is not None and (status in TRANSIENT_STATUS_CODES or status >= 500)
+
+
+class LatencyTracker:
+    def __init__(self, window: int = 200):
+        self._samples: deque = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, q: float, min_samples: int = 1) -> Optional[float]:
+        if len(self._samples) < max(1, min_samples):
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[index]
+
+
+class RetryBudget:
+    """
+    Каждый запрос пополняет бюджет на ratio токенов, каждый повтор тратит один.
+    Так повторы не превышают заданной доли трафика и не множат нагрузку при сбое.
+    """
+
+    def __init__(self, ratio: float, max_tokens: float):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+
+    def on_request(self) -> None:
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, open_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and self.retry_after() <= 0:
+            return self.HALF_OPEN
+        return self._state
+
+    def retry_after(self) -> float:
+        if self._state != self.OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.open_seconds - time.monotonic())
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probe_in_flight:
+            # Пропускаем один пробный запрос
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._state = self.CLOSED
+        self._failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._probe_in_flight = False
+        self._failures += 1
+        if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+
+    def abandon(self) -> None:
+        """Пробный запрос отменён, не дойдя до результата."""
+        self._probe_in_flight = False
+
+
+class ResilienceLayer:
+    def __init__(
+        self,
+        deadlines: Dict[str, float],
+        hedge_call_types: Iterable[str],
+        hedge_percentile: float,
+        hedge_min_samples: int,
+        max_retries: int,
+        retry_backoff: float,
+        retry_budgets: Dict[str, RetryBudget],
+        breakers: Dict[str, CircuitBreaker],
+        is_transient: Callable[[BaseException], bool] = is_transient_error,
+    ):
+        """
+        Бюджет повторов и breaker у каждого типа вызова свои: сбои скоринга
+        не открывают breaker и не тратят повторы ответов интервью.
+        """
+        self.deadlines = deadlines
+        self.hedge_call_types = set(hedge_call_types)
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.retry_budgets = retry_budgets
+        self.breakers = breakers
+        self.is_transient = is_transient
+        self._latency = {name: LatencyTracker() for name in deadlines}
+        self._counters = {
+            name: {
+                "calls": 0,
+                "failures": 0,
+                "timeouts": 0,
+                "retries": 0,
+                "hedges": 0,
+                "hedge_wins": 0,
+                "short_circuited": 0,
+                "rejected": 0,
+            }
+            for name in deadlines
+        }
+
+    def _check_breaker(self, call_type: str) -> None:
+        breaker = self.breakers[call_type]
+        if not breaker.allow():
+            self._counters[call_type]["short_circuited"] += 1
+            raise LLMUnavailableError(retry_after=breaker.retry_after())
+
+    def _hedge_delay(self, call_type: str) -> Optional[float]:
+        if call_type not in self.hedge_call_types:
+            return None
+        return self._latency[call_type].percentile(
+            self.hedge_percentile, min_samples=self.hedge_min_samples
+        )
+
+    async def call(self, call_type: str, factory: Callable[[], Awaitable[T]]) -> T:
+        """
+        Выполняет вызов с общим дедлайном на все попытки, хеджированием
+        медленных запросов и ограниченными повторами.
+        """
+        self._check_breaker(call_type)
+        breaker = self.breakers[call_type]
+        retry_budget = self.retry_budgets[call_type]
+        retry_budget.on_request()
+        counters = self._counters[call_type]
+        counters["calls"] += 1
+
+        deadline = self.deadlines[call_type]
+        loop = asyncio.get_running_loop()
+        expires_at = loop.time() + deadline
+        attempt = 0
+
+        while True:
+            started = loop.time()
+            try:
+                result = await self._attempt(call_type, factory, expires_at - started)
+            except asyncio.CancelledError:
+                breaker.abandon()
+                raise
+            except Exception as e:
+                timed_out = isinstance(e, asyncio.TimeoutError)
+                if not self.is_transient(e):
+                    # Провайдер ответил, но запрос плохой: не повторяем и не считаем сбоем
+                    counters["rejected"] += 1
+                    breaker.abandon()
+                    raise
+                counters["timeouts" if timed_out else "failures"] += 1
+                breaker.record_failure()
+
+                backoff = self.retry_backoff * 2 ** attempt * random.uniform(0.5, 1.0)
+                can_retry = (
+                    attempt < self.max_retries
+                    and loop.time() + backoff < expires_at
+                    and breaker.state == CircuitBreaker.CLOSED
+                    and retry_budget.try_spend()
+                )
+                if not can_retry:
+                    if timed_out:
+                        raise LLMTimeoutError(call_type, deadline) from e
+                    raise
+
+                attempt += 1
+                counters["retries"] += 1
+                await asyncio.sleep(backoff)
+                continue
+
+            breaker.record_success()
+            self._latency[call_type].record(loop.time() - started)
+            return result
+
+    async def _attempt(
+        self,
+        call_type: str,
+        factory: Callable[[], Awaitable[T]],
+        timeout: float,
+    ) -> T:
+        if timeout <= 0:
+            raise asyncio.TimeoutError()
+
+        loop = asyncio.get_running_loop()
+        expires_at = loop.time() + timeout
+        primary = asyncio.ensure_future(factory())
+        tasks = {primary}
+        last_error: Optional[BaseException] = None
+
+        try:
+            hedge_after = self._hedge_delay(call_type)
+            if hedge_after is not None and hedge_after < timeout:
+                done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+                if not done:
+                    # Основной запрос дольше p95 — отправляем дубликат
+                    self._counters[call_type]["hedges"] += 1
+                    tasks.add(asyncio.ensure_future(factory()))
+
+            while tasks:
+                remaining = expires_at - loop.time()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                done, _ = await asyncio.wait(
+                    tasks, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    raise asyncio.TimeoutError()
+                for task in done:
+                    tasks.discard(task)
+                    if task.exception() is None:
+                        if task is not primary:
+                            self._counters[call_type]["hedge_wins"] += 1
+                        return task.result()
+                    last_error = task.exception()
+
+            raise last_error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def stream(
+        self,
+        call_type: str,
+        factory: Callable[[], AsyncIterator[T]],
+    ) -> AsyncIterator[T]:
+        """Потоковые вызовы не повторяются и не хеджируются: только дедлайн и breaker."""
+        self._check_breaker(call_type)
+        breaker = self.breakers[call_type]
+        counters = self._counters[call_type]
+        counters["calls"] += 1
+
+        deadline = self.deadlines[call_type]
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        iterator = factory()
+        finished = False
+
+        try:
+            while True:
+                remaining = started + deadline - loop.time()
+                try:
+                    chunk = await asyncio.wait_for(iterator.__anext__(), timeout=max(remaining, 0))
+                except StopAsyncIteration:
+                    break
+                yield chunk
+            finished = True
+        except asyncio.TimeoutError as e:
+            counters["timeouts"] += 1
+            breaker.record_failure()
+            raise LLMTimeoutError(call_type, deadline) from e
+        except Exception as e:
+            if self.is_transient(e):
+                counters["failures"] += 1
+                breaker.record_failure()
+            else:
+                counters["rejected"] += 1
+            raise
+        finally:
+            if finished:
+                breaker.record_success()
+                self._latency[call_type].record(loop.time() - started)
+            else:
+                # После record_failure abandon ничего не меняет
+                breaker.abandon()
+            await iterator.aclose()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "calls": {
+                name: {
+                    **counters,
+                    "p95_seconds": self._latency[name].percentile(0.95),
+                    "breaker": {
+                        "state": self.breakers[name].state,
+                        "retry_after_seconds": round(self.breakers[name].retry_after(), 2),
+                    },
+                    "retry_budget_tokens": round(self.retry_budgets[name].tokens, 2),
+                }
+                for name, counters in self._counters.items()
+            },
+        }
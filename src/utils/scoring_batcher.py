@@ -0,0 +1,87 @@
+import asyncio
+from typing import Any, List, Optional, Set, Tuple
+
+from src.config import settings
+from src.utils import ai
+
+
+class ScoringBatcher:
+    """
+    Собирает запросы на скоринг в течение короткого окна (или до max_batch_size)
+    и отправляет их модели одним запросом. Резюме, для которых батч не дал
+    оценку, перескориваются по одному.
+    """
+
+    def __init__(self, max_batch_size: int, max_wait_seconds: float):
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def score(self, resume: Any) -> Tuple[int, str]:
+        if self.max_batch_size <= 1:
+            return await ai.score_resume_json(resume)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((resume, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait_seconds, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        task = asyncio.create_task(self._run_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        results: List[Optional[Tuple[int, str]]] = [None] * len(batch)
+        if len(batch) > 1:
+            try:
+                results = await ai.score_resumes_json_batch([resume for resume, _ in batch])
+            except Exception:
+                pass
+
+        await asyncio.gather(*(
+            self._resolve(resume, future, result)
+            for (resume, future), result in zip(batch, results)
+        ))
+
+    @staticmethod
+    async def _resolve(
+        resume: Any,
+        future: asyncio.Future,
+        result: Optional[Tuple[int, str]],
+    ) -> None:
+        if future.done():
+            return
+
+        if result is None:
+            try:
+                result = await ai.score_resume_json(resume)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                return
+
+        if not future.done():
+            future.set_result(result)
+
+
+scoring_batcher = ScoringBatcher(
+    max_batch_size=settings.SCORING_BATCH_MAX_SIZE,
+    max_wait_seconds=settings.SCORING_BATCH_MAX_WAIT_MS / 1000,
+)
@@ -0,0 +1,113 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+@dataclass
+class PhaseStats:
+    seconds: float = 0.0
+    count: int = 0
+
+
+@dataclass
+class RequestTiming:
+    """Сколько времени запрос провёл в БД, LLM и bcrypt."""
+
+    started: float = field(default_factory=time.perf_counter)
+    phases: Dict[str, PhaseStats] = field(default_factory=dict)
+    llm_input_tokens: int = 0
+    llm_output_tokens: int = 0
+
+    def add(self, phase: str, seconds: float) -> None:
+        stats = self.phases.setdefault(phase, PhaseStats())
+        stats.seconds += seconds
+        stats.count += 1
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def header(self) -> str:
+        """
+        Значение Server-Timing. app — всё, что не попало в фазы:
+        код обработчика, валидация и сериализация pydantic.
+        Фазы, выполнявшиеся параллельно, суммируются.
+        """
+        total = self.elapsed()
+        parts = [
+            f'{name};dur={stats.seconds * 1000:.1f};desc="count={stats.count}"'
+            for name, stats in self.phases.items()
+        ]
+        own = total - sum(stats.seconds for stats in self.phases.values())
+        parts.append(f"app;dur={max(own, 0.0) * 1000:.1f}")
+        parts.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(parts)
+
+    def summary(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {"total_ms": round(self.elapsed() * 1000, 1)}
+        for name, stats in self.phases.items():
+            result[f"{name}_ms"] = round(stats.seconds * 1000, 1)
+            result[f"{name}_count"] = stats.count
+        if self.llm_input_tokens or self.llm_output_tokens:
+            result["llm_input_tokens"] = self.llm_input_tokens
+            result["llm_output_tokens"] = self.llm_output_tokens
+        return result
+
+
+# Объект изменяемый: задачи, созданные внутри запроса, получают копию
+# контекста со ссылкой на тот же RequestTiming и пишут в него же
+_current_timing: ContextVar[Optional[RequestTiming]] = ContextVar("request_timing", default=None)
+
+
+def start_timing() -> Any:
+    """Возвращает токен для stop_timing."""
+    return _current_timing.set(RequestTiming())
+
+
+def stop_timing(token: Any) -> None:
+    _current_timing.reset(token)
+
+
+def current_timing() -> Optional[RequestTiming]:
+    return _current_timing.get()
+
+
+@contextmanager
+def measure(phase: str) -> Iterator[None]:
+    """Вне замеряемого запроса ничего не делает."""
+    timing = _current_timing.get()
+    if timing is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.add(phase, time.perf_counter() - started)
+
+
+def record_llm_tokens(input_tokens: int, output_tokens: int) -> None:
+    timing = _current_timing.get()
+    if timing is not None:
+        timing.llm_input_tokens += input_tokens or 0
+        timing.llm_output_tokens += output_tokens or 0
+
+
+def install_sqlalchemy_timing(engine: AsyncEngine) -> None:
+    """Считает запросы и время в БД для замеряемых запросов."""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if _current_timing.get() is not None:
+            context._timing_started = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        timing = _current_timing.get()
+        started = getattr(context, "_timing_started", None)
+        if timing is not None and started is not None:
+            timing.add("db", time.perf_counter() - started)
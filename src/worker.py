@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import os
+import random
+import signal
+import socket
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+from uuid import UUID
+
+from src import models
+from src.config import settings
+from src.database import async_session_maker
+from src.repositories.document_repository import DocumentRepository
+from src.repositories.interview_repository import InterviewChatRepository
+from src.repositories.job_repository import JobRepository
+from src.repositories.score_cache_repository import ScoreCacheRepository
+from src.services.document_service import DocumentService
+from src.services.interview_service import InterviewChatService
+from src.services.job_service import JobKind, JobService
+from src.services.score_cache_service import ScoreCacheService
+from src.utils.resilience import LLMUnavailableError
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+async def handle_score_document(payload: Dict[str, Any]) -> None:
+    async with async_session_maker() as session:
+        service = DocumentService(
+            DocumentRepository(session),
+            ScoreCacheService(ScoreCacheRepository(session)),
+            JobService(JobRepository(session)),
+        )
+        document_id = UUID(payload["document_id"])
+        try:
+            await service.score_document(document_id)
+        except LLMUnavailableError as e:
+            # Провайдер недоступен — откладываем скоринг, не расходуя попытки задачи
+            await service.schedule_scoring(
+                document_id,
+                delay_seconds=max(e.retry_after, settings.SCORING_DEBOUNCE_SECONDS),
+            )
+            await session.commit()
+
+
+async def handle_generate_chat_title(payload: Dict[str, Any]) -> None:
+    async with async_session_maker() as session:
+        service = InterviewChatService(
+            InterviewChatRepository(session),
+            JobService(JobRepository(session)),
+        )
+        await service.generate_title(UUID(payload["chat_id"]))
+
+
+HANDLERS: Dict[str, JobHandler] = {
+    JobKind.SCORE_DOCUMENT.value: handle_score_document,
+    JobKind.GENERATE_CHAT_TITLE.value: handle_generate_chat_title,
+}
+
+
+class Worker:
+    def __init__(
+        self,
+        handlers: Dict[str, JobHandler],
+        concurrency: int,
+        poll_interval: float,
+    ):
+        self.handlers = handlers
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._in_flight: Set[asyncio.Task] = set()
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        logger.info("Worker %s is stopping", self.worker_id)
+        self._stopping.set()
+
+    async def run(self) -> None:
+        logger.info("Worker %s started, concurrency=%s", self.worker_id, self.concurrency)
+        last_stale_check = 0.0
+
+        while not self._stopping.is_set():
+            if time.monotonic() - last_stale_check > settings.JOB_LOCK_TIMEOUT_SECONDS:
+                last_stale_check = time.monotonic()
+                await self._release_stale()
+
+            jobs = []
+            free_slots = self.concurrency - len(self._in_flight)
+            if free_slots > 0:
+                try:
+                    async with async_session_maker() as session:
+                        jobs = await JobRepository(session).claim(self.worker_id, free_slots)
+                except Exception:
+                    logger.exception("Failed to claim jobs")
+
+            for job in jobs:
+                task = asyncio.create_task(self._execute(job))
+                self._in_flight.add(task)
+                task.add_done_callback(self._in_flight.discard)
+
+            if jobs and len(self._in_flight) < self.concurrency:
+                continue
+
+            await self._wait_for_work()
+
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    async def _wait_for_work(self) -> None:
+        waiters = {asyncio.create_task(self._stopping.wait())}
+        if len(self._in_flight) >= self.concurrency:
+            # Все слоты заняты — ждём освобождения любого из них
+            waiters |= self._in_flight
+        await asyncio.wait(
+            waiters,
+            timeout=self.poll_interval,
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+        for waiter in waiters - self._in_flight:
+            waiter.cancel()
+
+    async def _execute(self, job: models.Job) -> None:
+        try:
+            if job.attempts > job.max_attempts:
+                raise RuntimeError("Job exceeded max attempts")
+            handler = self.handlers.get(job.kind)
+            if handler is None:
+                raise LookupError(f"No handler for job kind {job.kind!r}")
+            await handler(job.payload)
+        except Exception as e:
+            logger.exception("Job %s (%s) failed on attempt %s", job.id, job.kind, job.attempts)
+            await self._fail(job, e)
+            return
+
+        try:
+            async with async_session_maker() as session:
+                await JobRepository(session).complete(job.id)
+        except Exception:
+            logger.exception("Failed to mark job %s as done", job.id)
+
+    async def _fail(self, job: models.Job, error: Exception) -> None:
+        retry_at = self._retry_at(job)
+        if retry_at is None:
+            logger.error("Job %s (%s) moved to dead-letter", job.id, job.kind)
+        try:
+            async with async_session_maker() as session:
+                await JobRepository(session).fail(job.id, repr(error), retry_at)
+        except Exception:
+            logger.exception("Failed to record failure of job %s", job.id)
+
+    @staticmethod
+    def _retry_at(job: models.Job) -> Optional[datetime]:
+        if job.attempts >= job.max_attempts:
+            return None
+        delay = min(
+            settings.JOB_RETRY_MAX_SECONDS,
+            settings.JOB_RETRY_BASE_SECONDS * 2 ** (job.attempts - 1),
+        )
+        delay *= random.uniform(0.5, 1.0)
+        return datetime.now(timezone.utc) + timedelta(seconds=delay)
+
+    async def _release_stale(self) -> None:
+        locked_before = datetime.now(timezone.utc) - timedelta(
+            seconds=settings.JOB_LOCK_TIMEOUT_SECONDS
+        )
+        try:
+            async with async_session_maker() as session:
+                released = await JobRepository(session).release_stale(locked_before)
+            if released:
+                logger.warning("Released %s stale jobs", released)
+        except Exception:
+            logger.exception("Failed to release stale jobs")
+
+
+async def run_worker() -> None:
+    worker = Worker(
+        handlers=HANDLERS,
+        concurrency=settings.JOB_WORKER_CONCURRENCY,
+        poll_interval=settings.JOB_POLL_INTERVAL_SECONDS,
+    )
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    await worker.run()
@@ -0,0 +1,33 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from src import models
+from src.server import app
+from src.utils import jwt as jwt_utils
+
+
+async def _create_user(session_maker):
+    async with session_maker() as session:
+        user = models.User(email="candidate@example.com")
+        session.add(user)
+        await session.commit()
+        return user.id
+
+
+def test_bearer_token_is_decoded_once_per_request(pg_session_maker, monkeypatch):
+    user_id = asyncio.run(_create_user(pg_session_maker))
+    token = jwt_utils.create_access_token(user_id)
+    decoded = []
+
+    def counting_decode(value):
+        decoded.append(value)
+        return user_id
+
+    monkeypatch.setattr(jwt_utils, "decode_access_token", counting_decode)
+
+    response = TestClient(app).get("/api/auth/me", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    assert response.json()["email"] == "candidate@example.com"
+    assert decoded == [token]
@@ -0,0 +1,42 @@
+import asyncio
+
+from src import models
+from src.repositories.document_repository import DocumentRepository
+from src.utils import json_delta
+
+
+def test_versions_in_one_session_get_consecutive_numbers(pg_session_maker):
+    contents = [{"title": f"Resume v{number}", "skills": ["python"]} for number in range(1, 5)]
+
+    async def scenario():
+        async with pg_session_maker() as session:
+            user = models.User(email="candidate@example.com")
+            session.add(user)
+            await session.flush()
+            repo = DocumentRepository(session, snapshot_interval=2)
+            document = await repo.create_document(user.id, contents[0])
+            await repo.commit()
+            numbers = []
+            for content in contents[1:]:
+                # Документ уже в identity map сессии
+                document = await repo.create_new_version(document.id, content)
+                await repo.commit()
+                numbers.append(document.current_version)
+            versions = [await repo.get_version(document.id, n) for n in range(1, 5)]
+            return numbers, [version.content for version in versions]
+
+    numbers, stored = asyncio.run(scenario())
+
+    assert numbers == [2, 3, 4]
+    assert stored == contents
+
+
+def test_delta_of_list_item_edit_touches_only_that_item():
+    old = {"experience": [{"company": "A", "highlights": ["x", "y"]}, {"company": "B"}]}
+    new = {"experience": [{"company": "A", "highlights": ["x", "z"]}, {"company": "B"}]}
+
+    ops = json_delta.diff(old, new)
+
+    assert ops == [["set", ["experience", 0, "highlights", 1], "z"]]
+    assert json_delta.apply(old, ops) == new
+    assert json_delta.apply(old, json_delta.diff(old, {"experience": []})) == {"experience": []}
@@ -0,0 +1,68 @@
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import DBAPIError
+
+from src import models
+from src.repositories.document_repository import DocumentRepository
+from src.repositories.job_repository import JobRepository
+from src.repositories.score_cache_repository import ScoreCacheRepository
+from src.services.document_service import DocumentService
+from src.services.job_service import JobService
+from src.services.score_cache_service import ScoreCacheService
+
+
+def _service(session) -> DocumentService:
+    return DocumentService(
+        DocumentRepository(session),
+        ScoreCacheService(ScoreCacheRepository(session)),
+        JobService(JobRepository(session)),
+    )
+
+
+async def _lines(contents):
+    for number, content in enumerate(contents, start=1):
+        yield number, json.dumps({"content": content}).encode()
+
+
+async def _owner(session_maker):
+    async with session_maker() as session:
+        user = models.User(email="importer@example.com")
+        session.add(user)
+        await session.commit()
+        return user.id
+
+
+def test_import_skips_rows_the_database_rejects(pg_session_maker):
+    # \u0000 не помещается в jsonb: Postgres отклоняет строку с data exception
+    contents = [{"name": "First"}, {"name": "Broken\u0000"}, {"name": "Third"}]
+
+    async def scenario():
+        owner_id = await _owner(pg_session_maker)
+        async with pg_session_maker() as session:
+            result = await _service(session).import_documents(owner_id, _lines(contents))
+        async with pg_session_maker() as session:
+            stored = await session.scalar(select(func.count()).select_from(models.Document))
+        return result, stored
+
+    result, stored = asyncio.run(scenario())
+
+    assert (result.imported, result.failed, stored) == (2, 1, 2)
+    assert [error.line for error in result.errors] == [2]
+
+
+def test_import_stops_on_connection_error(pg_session_maker, monkeypatch):
+    async def lost_connection(self, owner_id, contents):
+        raise DBAPIError("INSERT INTO documents", {}, ConnectionResetError("connection lost"))
+
+    monkeypatch.setattr(DocumentRepository, "insert_many", lost_connection)
+
+    async def scenario():
+        owner_id = await _owner(pg_session_maker)
+        async with pg_session_maker() as session:
+            await _service(session).import_documents(owner_id, _lines([{"name": "First"}]))
+
+    with pytest.raises(DBAPIError):
+        asyncio.run(scenario())
@@ -0,0 +1,157 @@
+import asyncio
+import json
+import time
+from urllib.parse import parse_qs
+
+import httpx
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from src.utils import google_oauth as google_oauth_module
+from src.utils.google_oauth import GoogleOAuthClient, GoogleOAuthError
+
+CLIENT_ID = "test-client-id"
+
+
+class StandInGoogle:
+    """Локальная замена token- и JWKS-эндпоинтов Google."""
+
+    def __init__(self):
+        self.keys = {}
+        self.current_kid = None
+        self.jwks_requests = 0
+        self.claims = {}
+        self.rotate("key-1")
+        self.app = Starlette(routes=[
+            Route("/token", self.token, methods=["POST"]),
+            Route("/certs", self.certs),
+        ])
+
+    def rotate(self, kid: str) -> None:
+        self.keys[kid] = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.current_kid = kid
+
+    def id_token(self, **overrides) -> str:
+        now = int(time.time())
+        claims = {
+            "iss": "https://accounts.google.com",
+            "aud": CLIENT_ID,
+            "sub": "1234567890",
+            "email": "candidate@example.com",
+            "email_verified": True,
+            "name": "Candidate",
+            "iat": now,
+            "exp": now + 3600,
+            **overrides,
+        }
+        return jwt.encode(
+            claims,
+            self.keys[self.current_kid],
+            algorithm="RS256",
+            headers={"kid": self.current_kid},
+        )
+
+    async def token(self, request: Request) -> JSONResponse:
+        form = parse_qs((await request.body()).decode())
+        if form.get("code") != ["valid-code"] or form.get("client_id") != [CLIENT_ID]:
+            return JSONResponse({"error": "invalid_grant"}, status_code=400)
+        return JSONResponse({"access_token": "access", "id_token": self.id_token(**self.claims)})
+
+    async def certs(self, request: Request) -> JSONResponse:
+        self.jwks_requests += 1
+        keys = []
+        for kid, private_key in self.keys.items():
+            jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+            keys.append({**jwk, "kid": kid, "alg": "RS256", "use": "sig"})
+        return JSONResponse({"keys": keys})
+
+
+@pytest.fixture
+def google():
+    return StandInGoogle()
+
+
+def _client(google: StandInGoogle) -> GoogleOAuthClient:
+    return GoogleOAuthClient(
+        client_id=CLIENT_ID,
+        client_secret="secret",
+        token_url="https://oauth.test/token",
+        jwks_url="https://oauth.test/certs",
+        jwks_cache_seconds=3600,
+        jwks_min_refresh_seconds=0,
+        timeout_seconds=5,
+        transport=httpx.ASGITransport(app=google.app),
+    )
+
+
+async def _login(client: GoogleOAuthClient, code: str = "valid-code"):
+    try:
+        tokens = await client.exchange_code(code, redirect_uri="https://app.test/google/callback/")
+        return await client.verify_id_token(tokens.get("id_token", ""))
+    finally:
+        await client.aclose()
+
+
+def test_first_login_loads_keys_on_recently_booted_host(google, monkeypatch):
+    # monotonic() меньше срока кэша — так выглядит хост, загруженный минуту назад
+    monkeypatch.setattr(google_oauth_module.time, "monotonic", lambda: 60.0)
+
+    claims = asyncio.run(_login(_client(google)))
+
+    assert claims["email"] == "candidate@example.com"
+    assert google.jwks_requests == 1
+
+
+def test_keys_are_cached_between_logins(google):
+    client = _client(google)
+
+    async def scenario():
+        for _ in range(3):
+            await client.verify_id_token(google.id_token())
+        await client.aclose()
+
+    asyncio.run(scenario())
+
+    assert google.jwks_requests == 1
+
+
+def test_unknown_kid_refreshes_keys(google):
+    client = _client(google)
+
+    async def scenario():
+        await client.verify_id_token(google.id_token())
+        google.rotate("key-2")
+        claims = await client.verify_id_token(google.id_token())
+        await client.aclose()
+        return claims
+
+    claims = asyncio.run(scenario())
+
+    assert claims["sub"] == "1234567890"
+    assert google.jwks_requests == 2
+
+
+@pytest.mark.parametrize(
+    "claims",
+    [
+        {"aud": "someone-else"},
+        {"iss": "https://evil.example.com"},
+        {"email_verified": False},
+        {"exp": int(time.time()) - 60},
+    ],
+)
+def test_invalid_id_token_is_rejected(google, claims):
+    google.claims = claims
+
+    with pytest.raises(GoogleOAuthError):
+        asyncio.run(_login(_client(google)))
+
+
+def test_rejected_code_fails_token_exchange(google):
+    with pytest.raises(GoogleOAuthError, match="Token exchange failed"):
+        asyncio.run(_login(_client(google), code="stolen-code"))
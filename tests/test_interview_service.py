@@ -0,0 +1,175 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from src import models
+from src.api.routers.interview import _to_sse
+from src.models.interview import MessageRole
+from src.repositories.interview_repository import InterviewChatRepository
+from src.repositories.job_repository import JobRepository
+from src.services import interview_service
+from src.services.interview_service import InterviewChatService
+from src.services.job_service import JobKind, JobService
+
+
+@pytest.fixture
+def model_stream(monkeypatch):
+    """Подменяет потоковый ответ модели: чанки, затем обрыв или зависание."""
+    def use(chunks, then=None) -> None:
+        async def stream(messages):
+            for chunk in chunks:
+                yield chunk
+            if then == "fail":
+                raise RuntimeError("Model stream broke")
+            if then == "hang":
+                await asyncio.Event().wait()
+
+        monkeypatch.setattr(interview_service, "stream_interview_reply", stream)
+    return use
+
+
+def _service(session):
+    return InterviewChatService(InterviewChatRepository(session), JobService(JobRepository(session)))
+
+
+async def _chat_with_greeting(session_maker):
+    async with session_maker() as session:
+        user = models.User(email="candidate@example.com")
+        session.add(user)
+        await session.commit()
+        repo = InterviewChatRepository(session)
+        chat = await repo.create_chat(user.id)
+        await repo.add_messages(
+            chat.id,
+            [(MessageRole.USER, "Hi"), (MessageRole.ASSISTANT, "Hello! What position?")],
+        )
+        await repo.commit()
+        return user.id, chat.id
+
+
+async def _stream(session_maker, owner_id, chat_id, content):
+    async with session_maker() as session:
+        service = _service(session)
+        events = await service.stream_message(chat_id, owner_id, content)
+        return [event async for event in events]
+
+
+async def _messages(session_maker, chat_id):
+    async with session_maker() as session:
+        result = await session.execute(
+            select(models.InterviewMessage)
+            .where(models.InterviewMessage.chat_id == chat_id)
+            .order_by(models.InterviewMessage.created_at)
+        )
+        return [(m.role, m.content) for m in result.scalars().all()]
+
+
+def test_stream_saves_question_and_answer_together(pg_session_maker, model_stream):
+    model_stream(["Tell me ", "about your ", "last project."])
+
+    async def scenario():
+        owner_id, chat_id = await _chat_with_greeting(pg_session_maker)
+        events = await _stream(pg_session_maker, owner_id, chat_id, "Backend developer")
+        async with pg_session_maker() as session:
+            jobs = (await session.execute(select(models.Job.kind))).scalars().all()
+        return events, await _messages(pg_session_maker, chat_id), jobs
+
+    events, messages, jobs = asyncio.run(scenario())
+    names = [name for name, _ in events]
+    assert names == ["delta", "delta", "delta", "user_message", "ai_message"]
+    assert jobs == [JobKind.GENERATE_CHAT_TITLE.value]
+    assert messages[-2:] == [
+        (MessageRole.USER, "Backend developer"),
+        (MessageRole.ASSISTANT, "Tell me about your last project."),
+    ]
+
+
+def test_stream_failure_before_first_chunk_saves_nothing(pg_session_maker, model_stream):
+    model_stream([], then="fail")
+
+    async def scenario():
+        owner_id, chat_id = await _chat_with_greeting(pg_session_maker)
+        events = await _stream(pg_session_maker, owner_id, chat_id, "Backend developer")
+        return events, await _messages(pg_session_maker, chat_id)
+
+    events, messages = asyncio.run(scenario())
+    assert [name for name, _ in events] == ["error"]
+    assert len(messages) == 2
+
+
+def test_client_disconnect_mid_stream_saves_partial_reply(pg_session_maker, model_stream):
+    model_stream(["Tell me ", "about your "], then="hang")
+
+    async def scenario():
+        owner_id, chat_id = await _chat_with_greeting(pg_session_maker)
+        session = pg_session_maker()
+        service = _service(session)
+        events = await service.stream_message(chat_id, owner_id, "Backend developer")
+        received = []
+
+        async def client():
+            async for chunk in _to_sse(events):
+                received.append(chunk)
+
+        task = asyncio.create_task(client())
+        while len(received) < 2:
+            await asyncio.sleep(0)
+        # Так StreamingResponse прерывает ответ, когда клиент отключился
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # get_db закрывает сессию запроса, пока частичный ответ сохраняется
+        await session.close()
+        await asyncio.gather(*interview_service._partial_saves)
+        return await _messages(pg_session_maker, chat_id)
+
+    messages = asyncio.run(scenario())
+    assert messages[-2:] == [
+        (MessageRole.USER, "Backend developer"),
+        (MessageRole.ASSISTANT, "Tell me about your "),
+    ]
+
+
+def test_stream_failure_mid_reply_saves_partial_reply(pg_session_maker, model_stream):
+    model_stream(["Tell me ", "about your "], then="fail")
+
+    async def scenario():
+        owner_id, chat_id = await _chat_with_greeting(pg_session_maker)
+        events = await _stream(pg_session_maker, owner_id, chat_id, "Backend developer")
+        await asyncio.gather(*interview_service._partial_saves)
+        return events, await _messages(pg_session_maker, chat_id)
+
+    events, messages = asyncio.run(scenario())
+    assert [name for name, _ in events] == ["delta", "delta", "error"]
+    assert messages[-2:] == [
+        (MessageRole.USER, "Backend developer"),
+        (MessageRole.ASSISTANT, "Tell me about your "),
+    ]
+
+
+def test_concurrent_summary_update_keeps_first_summary(pg_session_maker):
+    async def scenario():
+        owner_id, chat_id = await _chat_with_greeting(pg_session_maker)
+        async with pg_session_maker() as first, pg_session_maker() as second:
+            first_repo = InterviewChatRepository(first)
+            second_repo = InterviewChatRepository(second)
+            # Оба хода прочитали чат до того, как любой из них свернул историю
+            first_chat = await first_repo.get_chat_by_id(chat_id, owner_id)
+            second_chat = await second_repo.get_chat_by_id(chat_id, owner_id)
+            first_result = await first_repo.update_summary(
+                chat_id, "First", 2, previous_count=first_chat.summarized_count
+            )
+            await first_repo.commit()
+            second_result = await second_repo.update_summary(
+                chat_id, "Second", 2, previous_count=second_chat.summarized_count
+            )
+            await second_repo.commit()
+        async with pg_session_maker() as session:
+            chat = await session.get(models.InterviewChat, chat_id)
+        return first_result, second_result, chat
+
+    first_result, second_result, chat = asyncio.run(scenario())
+    assert first_result is not None and first_result.summary == "First"
+    assert second_result is None
+    assert (chat.summary, chat.summarized_count) == ("First", 2)
@@ -0,0 +1,103 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+
+from src import models
+from src.models.job import JobStatus
+from src.repositories.job_repository import JobRepository
+
+KIND = "score_document"
+
+
+async def _enqueue(session_maker, payload, dedupe_key):
+    async with session_maker() as session:
+        await JobRepository(session).enqueue(KIND, payload, max_attempts=5, dedupe_key=dedupe_key)
+        await session.commit()
+
+
+async def _claim(session_maker, limit=10):
+    async with session_maker() as session:
+        return await JobRepository(session).claim("test-worker", limit)
+
+
+async def _jobs(session_maker):
+    async with session_maker() as session:
+        result = await session.execute(select(models.Job).order_by(models.Job.created_at))
+        return list(result.scalars().all())
+
+
+def test_enqueue_merges_pending_job_with_same_dedupe_key(pg_session_maker):
+    async def scenario():
+        await _enqueue(pg_session_maker, {"v": 1}, "doc:1")
+        await _enqueue(pg_session_maker, {"v": 2}, "doc:1")
+        await _enqueue(pg_session_maker, {"v": 3}, "doc:2")
+        await _enqueue(pg_session_maker, {"v": 4}, None)
+        return await _jobs(pg_session_maker)
+
+    jobs = asyncio.run(scenario())
+    by_key = {job.dedupe_key: job for job in jobs}
+    assert len(jobs) == 3
+    assert by_key["doc:1"].payload == {"v": 2}
+    assert all(job.status == JobStatus.PENDING for job in jobs)
+
+
+def test_failed_job_is_superseded_by_pending_twin(pg_session_maker):
+    async def scenario():
+        await _enqueue(pg_session_maker, {"v": 1}, "doc:1")
+        [running] = await _claim(pg_session_maker)
+        await _enqueue(pg_session_maker, {"v": 2}, "doc:1")
+
+        retry_at = datetime.now(timezone.utc) + timedelta(minutes=5)
+        async with pg_session_maker() as session:
+            await JobRepository(session).fail(running.id, "boom", retry_at)
+        return running.id, await _jobs(pg_session_maker)
+
+    failed_id, jobs = asyncio.run(scenario())
+    statuses = {job.id: job.status for job in jobs}
+    assert statuses.pop(failed_id) == JobStatus.DONE
+    assert list(statuses.values()) == [JobStatus.PENDING]
+
+
+def test_failed_job_without_twin_is_requeued(pg_session_maker):
+    async def scenario():
+        await _enqueue(pg_session_maker, {"v": 1}, "doc:1")
+        [running] = await _claim(pg_session_maker)
+        retry_at = datetime.now(timezone.utc) + timedelta(minutes=5)
+        async with pg_session_maker() as session:
+            await JobRepository(session).fail(running.id, "boom", retry_at)
+        return retry_at, await _jobs(pg_session_maker)
+
+    retry_at, [job] = asyncio.run(scenario())
+    assert job.status == JobStatus.PENDING
+    assert job.run_at == retry_at
+    assert job.last_error == "boom"
+
+
+def test_release_stale_skips_jobs_that_would_duplicate_a_pending_key(pg_session_maker):
+    async def scenario():
+        # doc:2 — две зависшие задачи с одним ключом
+        await _enqueue(pg_session_maker, {"v": 1}, "doc:2")
+        [older] = await _claim(pg_session_maker)
+        await _enqueue(pg_session_maker, {"v": 2}, "doc:2")
+        await _enqueue(pg_session_maker, {"v": 1}, None)
+        claimed = await _claim(pg_session_maker)
+        # doc:1 — зависшая задача и ожидающий двойник
+        await _enqueue(pg_session_maker, {"v": 1}, "doc:1")
+        [with_twin] = await _claim(pg_session_maker)
+        await _enqueue(pg_session_maker, {"v": 2}, "doc:1")
+
+        locked_before = datetime.now(timezone.utc) + timedelta(seconds=5)
+        async with pg_session_maker() as session:
+            released = await JobRepository(session).release_stale(locked_before)
+        return released, with_twin.id, older.id, claimed, await _jobs(pg_session_maker)
+
+    released, with_twin_id, older_id, claimed, jobs = asyncio.run(scenario())
+    statuses = {job.id: job.status for job in jobs}
+    assert released == 4
+    assert statuses[with_twin_id] == JobStatus.DONE
+    assert statuses[older_id] == JobStatus.DONE
+    assert all(statuses[job.id] == JobStatus.PENDING for job in claimed)
+    assert sorted(job.dedupe_key or "" for job in jobs if job.status == JobStatus.PENDING) == [
+        "", "doc:1", "doc:2",
+    ]
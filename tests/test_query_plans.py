@@ -0,0 +1,234 @@
+"""
+EXPLAIN каждого запроса репозиториев на засеянной базе: последовательное
+сканирование большой таблицы означает, что запросу не хватает индекса.
+"""
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterator, List, Tuple
+
+from sqlalchemy import event, text
+
+from src.models.interview import MessageRole
+from src.repositories.document_repository import DocumentRepository
+from src.repositories.interview_repository import InterviewChatRepository
+from src.repositories.job_repository import JobRepository
+from src.repositories.rate_limit_repository import RateLimitRepository
+from src.repositories.score_cache_repository import ScoreCacheRepository
+from src.repositories.user_repository import UserRepository
+from src.schemas.document_schemas import DocumentSort
+from src.utils.pagination import BEFORE, Cursor
+
+USERS = 2_000
+DOCUMENTS_PER_USER = 10
+VERSIONS_PER_DOCUMENT = 3
+CHATS_PER_USER = 3
+MESSAGES_PER_CHAT = 10
+JOBS = 30_000
+
+# Таблицы, которые в проде растут без ограничений
+LARGE_TABLES = {
+    "users",
+    "documents",
+    "document_versions",
+    "interview_chats",
+    "interview_messages",
+    "jobs",
+    "resume_score_cache",
+}
+
+SEED_SQL = [
+    f"""
+    INSERT INTO users (id, email, name)
+    SELECT gen_random_uuid(), 'user' || n || '@example.com', 'User ' || n
+    FROM generate_series(1, {USERS}) AS n
+    """,
+    f"""
+    INSERT INTO documents (id, owner_id, current_version, content, created_at)
+    SELECT gen_random_uuid(), u.id, {VERSIONS_PER_DOCUMENT},
+           jsonb_build_object('name', 'Resume ' || n, 'skills', jsonb_build_array('python', 'sql'),
+                              'aimark', (n * 7) % 100),
+           now() - n * interval '1 minute'
+    FROM users u, generate_series(1, {DOCUMENTS_PER_USER}) AS n
+    """,
+    f"""
+    INSERT INTO document_versions (id, document_id, version_number, content, delta)
+    SELECT gen_random_uuid(), d.id, v,
+           CASE WHEN v = 1 THEN jsonb_build_object('name', 'Resume v1') END,
+           CASE WHEN v > 1 THEN jsonb_build_array(jsonb_build_array('set', jsonb_build_array('name'), 'Resume v' || v)) END
+    FROM documents d, generate_series(1, {VERSIONS_PER_DOCUMENT}) AS v
+    """,
+    f"""
+    INSERT INTO interview_chats (id, owner_id, title, position, created_at)
+    SELECT gen_random_uuid(), u.id, 'Chat ' || n, 'Backend', now() - n * interval '1 hour'
+    FROM users u, generate_series(1, {CHATS_PER_USER}) AS n
+    """,
+    f"""
+    INSERT INTO interview_messages (id, chat_id, role, content, created_at)
+    SELECT gen_random_uuid(), c.id,
+           (CASE WHEN n % 2 = 1 THEN 'USER' ELSE 'ASSISTANT' END)::messagerole,
+           'Message ' || n, c.created_at + n * interval '1 second'
+    FROM interview_chats c, generate_series(1, {MESSAGES_PER_CHAT}) AS n
+    """,
+    f"""
+    INSERT INTO jobs (id, kind, payload, dedupe_key, status, attempts, max_attempts, run_at)
+    SELECT gen_random_uuid(), 'score_document', '{{}}'::json, 'score_document:' || n,
+           (CASE WHEN n % 100 = 0 THEN 'PENDING' ELSE 'DONE' END)::jobstatus, 1, 5,
+           now() - n * interval '1 second'
+    FROM generate_series(1, {JOBS}) AS n
+    """,
+    """
+    INSERT INTO resume_score_cache (content_hash, model, prompt_version, score, reason)
+    SELECT md5(id::text) || md5(id::text), 'gemini', 'v1', 50, ''
+    FROM documents
+    """,
+    "ANALYZE",
+]
+
+
+async def _seed(session_maker) -> Tuple[Any, Any, Any, Any]:
+    async with session_maker() as session:
+        for statement in SEED_SQL:
+            await session.execute(text(statement))
+        await session.commit()
+        row = (await session.execute(text(
+            """
+            SELECT u.id, u.email, d.id, c.id
+            FROM users u
+            JOIN documents d ON d.owner_id = u.id
+            JOIN interview_chats c ON c.owner_id = u.id
+            LIMIT 1
+            """
+        ))).one()
+        return tuple(row)
+
+
+async def _exercise_repositories(session_maker, owner_id, email, document_id, chat_id) -> None:
+    now = datetime.now(timezone.utc)
+    cursor = Cursor(created_at=now, id=document_id)
+
+    async with session_maker() as session:
+        users = UserRepository(session)
+        await users.get_by_id(owner_id)
+        await users.get_by_email(email)
+        created = await users.create("New", "new@example.com", None)
+        await users.update_password(owner_id, "hash")
+        await users.delete(created.id)
+        await users.commit()
+
+    async with session_maker() as session:
+        documents = DocumentRepository(session)
+        await documents.get_by_id(document_id)
+        await documents.get_by_id(document_id, owner_id)
+        await documents.get_version(document_id, 2, owner_id)
+        await documents.list_versions(document_id)
+        await documents.list_versions_for_documents([document_id])
+        for sort in DocumentSort:
+            after = cursor
+            if sort in (DocumentSort.AIMARK_DESC, DocumentSort.AIMARK_ASC):
+                after = cursor._replace(sort_key=[50])
+            await documents.list_by_owner(owner_id, 20, sort=sort)
+            await documents.list_by_owner(owner_id, 20, after=after, sort=sort)
+        await documents.list_by_owner(owner_id, 20, min_score=10, max_score=90)
+        await documents.list_by_owner(owner_id, 20, text="python")
+        await documents.list_by_owner(owner_id, 20, contains={"skills": ["sql"]})
+        await documents.create_new_version(document_id, {"name": "v4"})
+        await documents.update_current_version_content(document_id, 4, {"name": "v4 fixed"})
+        created = await documents.create_document(owner_id, {"name": "New resume"})
+        await documents.insert_many(owner_id, [{"name": "Imported"}])
+        await documents.create_new_version(document_id, {"name": "v5"}, owner_id)
+        await documents.delete(created.id, owner_id)
+        await documents.commit()
+
+    async with session_maker() as session:
+        chats = InterviewChatRepository(session)
+        await chats.get_chat_by_id(chat_id, owner_id)
+        await chats.get_chat(chat_id)
+        await chats.list_chats_for_user(owner_id, 20)
+        await chats.list_chats_for_user(owner_id, 20, Cursor(created_at=now, id=chat_id))
+        await chats.get_messages_for_chat(chat_id, offset=2, limit=5)
+        await chats.get_messages_page(chat_id, 20)
+        await chats.get_messages_page(chat_id, 20, tail=True)
+        await chats.get_messages_page(
+            chat_id, 20, Cursor(created_at=now, id=chat_id, direction=BEFORE)
+        )
+        await chats.add_message(chat_id, MessageRole.USER, "Hi")
+        await chats.add_messages(chat_id, [(MessageRole.USER, "Hi"), (MessageRole.ASSISTANT, "Hello")])
+        await chats.update_title(chat_id, "Title")
+        await chats.update_summary(chat_id, "Summary", 2, previous_count=0)
+        created = await chats.create_chat(owner_id)
+        await chats.delete_chat(created.id, owner_id)
+        await chats.commit()
+
+    async with session_maker() as session:
+        jobs = JobRepository(session)
+        await jobs.enqueue("score_document", {}, 5, dedupe_key="score_document:1")
+        await session.commit()
+        claimed = await jobs.claim("plan-test", 5)
+        await jobs.complete(claimed[0].id)
+        await jobs.fail(claimed[1].id, "boom", now + timedelta(minutes=1))
+        await jobs.fail(claimed[2].id, "boom", None)
+        await jobs.release_stale(now - timedelta(minutes=5))
+
+    async with session_maker() as session:
+        cache = ScoreCacheRepository(session)
+        await cache.get("0" * 64, "gemini", "v1", now - timedelta(days=30))
+        await cache.upsert("0" * 64, "gemini", "v1", 42, "")
+        await cache.delete_older_than(now - timedelta(days=30))
+        await session.commit()
+
+    async with session_maker() as session:
+        buckets = RateLimitRepository(session)
+        await buckets.take("user:1", 10, 1, 1)
+        await buckets.peek("user:1", 10, 1)
+        await buckets.delete_stale(now - timedelta(hours=1))
+        await session.commit()
+
+
+def _plan_nodes(plan: dict) -> Iterator[dict]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+async def _seq_scans(session_maker, statements: List[Tuple[str, Any]]) -> List[str]:
+    problems = []
+    async with session_maker() as session:
+        connection = await session.connection()
+        for statement, parameters in statements:
+            if isinstance(parameters, list):
+                parameters = parameters[0]  # executemany — план одинаковый
+            result = await connection.exec_driver_sql(
+                f"EXPLAIN (FORMAT JSON) {statement}", parameters
+            )
+            plan = result.scalar_one()
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            for node in _plan_nodes(plan[0]["Plan"]):
+                if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in LARGE_TABLES:
+                    problems.append(f"Seq Scan on {node['Relation Name']}:\n{statement}")
+        await session.rollback()
+    return problems
+
+
+def test_repository_queries_do_not_scan_large_tables(pg_session_maker):
+    async def scenario():
+        owner_id, email, document_id, chat_id = await _seed(pg_session_maker)
+
+        statements: List[Tuple[str, Any]] = []
+        sync_engine = pg_session_maker.kw["bind"].sync_engine
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().split(None, 1)[0].upper() in {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"}:
+                statements.append((statement, parameters))
+
+        event.listen(sync_engine, "before_cursor_execute", capture)
+        try:
+            await _exercise_repositories(pg_session_maker, owner_id, email, document_id, chat_id)
+        finally:
+            event.remove(sync_engine, "before_cursor_execute", capture)
+
+        return len(statements), await _seq_scans(pg_session_maker, statements)
+
+    checked, problems = asyncio.run(scenario())
+    assert checked > 40
+    assert not problems, "\n\n".join(problems)
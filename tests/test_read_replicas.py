@@ -0,0 +1,84 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.middleware import ReadYourWritesMiddleware
+from src.config import settings
+from src.database import ReplicaRouter, db_router, get_db
+from src.dependencies.misc import use_read_replica
+
+
+class FakeSession:
+    def __init__(self, name: str):
+        self.name = name
+
+    async def connection(self):
+        return None
+
+    async def rollback(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+def _router() -> ReplicaRouter:
+    return ReplicaRouter(
+        primary=lambda: FakeSession("primary"),
+        replicas=[lambda: FakeSession("replica")],
+        sticky_seconds=5,
+        retry_seconds=30,
+    )
+
+
+@pytest.mark.parametrize(
+    ("last_write_ago", "expected"),
+    [(None, "replica"), (1, "primary"), (60, "replica"), (-60, "replica")],
+)
+def test_last_write_time_keeps_reads_on_primary(last_write_ago, expected):
+    last_write_at = None if last_write_ago is None else time.time() - last_write_ago
+
+    session = asyncio.run(_router().open_session(True, None, last_write_at))
+
+    assert session.name == expected
+
+
+def test_write_cookie_makes_reads_sticky(monkeypatch):
+    def worker_app() -> FastAPI:
+        app = FastAPI()
+        app.add_middleware(ReadYourWritesMiddleware)
+
+        @app.post("/write")
+        async def write(session=Depends(get_db)):
+            return {"db": session.name}
+
+        @app.get("/read", dependencies=[Depends(use_read_replica)])
+        async def read(session=Depends(get_db)):
+            return {"db": session.name}
+
+        return app
+
+    router = _router()
+    monkeypatch.setattr(db_router, "primary", router.primary)
+    monkeypatch.setattr(db_router, "replicas", router.replicas)
+    monkeypatch.setattr(db_router, "_unhealthy_until", [0.0])
+
+    # Запросы без токена: память процесса не помогает, работает только cookie
+    writer = TestClient(worker_app())
+    response = writer.post("/write")
+    assert response.json() == {"db": "primary"}
+    cookie = response.cookies[settings.DB_READ_STICKY_COOKIE]
+
+    reader = TestClient(worker_app())
+    assert reader.get("/read").json() == {"db": "replica"}
+    reader.cookies.set(settings.DB_READ_STICKY_COOKIE, cookie)
+    assert reader.get("/read").json() == {"db": "primary"}
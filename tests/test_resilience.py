@@ -0,0 +1,124 @@
+import asyncio
+
+import httpx
+import pytest
+
+from src.utils.resilience import (
+    CircuitBreaker,
+    LLMUnavailableError,
+    ResilienceLayer,
+    RetryBudget,
+    is_transient_error,
+)
+
+CALL_TYPES = ("interview_reply", "resume_scoring")
+
+
+class ProviderError(Exception):
+    def __init__(self, code: int):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+def _layer(failure_threshold: int = 2) -> ResilienceLayer:
+    return ResilienceLayer(
+        deadlines={name: 5.0 for name in CALL_TYPES},
+        hedge_call_types=[],
+        hedge_percentile=0.95,
+        hedge_min_samples=20,
+        max_retries=2,
+        retry_backoff=0.0,
+        retry_budgets={name: RetryBudget(ratio=1.0, max_tokens=10) for name in CALL_TYPES},
+        breakers={
+            name: CircuitBreaker(failure_threshold=failure_threshold, open_seconds=60)
+            for name in CALL_TYPES
+        },
+    )
+
+
+def _failing(error: Exception):
+    calls = []
+
+    async def factory():
+        calls.append(1)
+        raise error
+
+    return factory, calls
+
+
+@pytest.mark.parametrize(
+    "error, transient",
+    [
+        (asyncio.TimeoutError(), True),
+        (httpx.ConnectError("refused"), True),
+        (ProviderError(429), True),
+        (ProviderError(503), True),
+        (ProviderError(400), False),
+        (ValueError("bad json"), False),
+    ],
+)
+def test_is_transient_error(error, transient):
+    assert is_transient_error(error) is transient
+
+
+def test_non_transient_error_is_not_retried_and_keeps_breaker_closed():
+    layer = _layer(failure_threshold=1)
+    factory, calls = _failing(ProviderError(400))
+
+    with pytest.raises(ProviderError):
+        asyncio.run(layer.call("interview_reply", factory))
+
+    assert len(calls) == 1
+    assert layer.breakers["interview_reply"].state == CircuitBreaker.CLOSED
+    counters = layer.snapshot()["calls"]["interview_reply"]
+    assert (counters["rejected"], counters["failures"]) == (1, 0)
+
+
+def test_non_transient_stream_error_is_counted_once():
+    layer = _layer()
+
+    async def broken_stream():
+        yield "Tell me "
+        raise ProviderError(400)
+
+    async def scenario():
+        async for _ in layer.stream("interview_reply", broken_stream):
+            pass
+
+    with pytest.raises(ProviderError):
+        asyncio.run(scenario())
+
+    counters = layer.snapshot()["calls"]["interview_reply"]
+    assert (counters["rejected"], counters["failures"]) == (1, 0)
+
+
+def test_transient_error_is_retried():
+    layer = _layer(failure_threshold=10)
+    factory, calls = _failing(ProviderError(503))
+
+    with pytest.raises(ProviderError):
+        asyncio.run(layer.call("interview_reply", factory))
+
+    assert len(calls) == 3
+    counters = layer.snapshot()["calls"]["interview_reply"]
+    assert (counters["rejected"], counters["failures"]) == (0, 3)
+
+
+def test_breakers_are_isolated_per_call_type():
+    layer = _layer(failure_threshold=2)
+    factory, _ = _failing(ProviderError(503))
+
+    async def scenario():
+        # Два неудачных запроса подряд (попытка и повтор) открывают breaker скоринга
+        with pytest.raises(ProviderError):
+            await layer.call("resume_scoring", factory)
+        with pytest.raises(LLMUnavailableError):
+            await layer.call("resume_scoring", factory)
+
+        async def ok():
+            return "reply"
+
+        return await layer.call("interview_reply", ok)
+
+    assert asyncio.run(scenario()) == "reply"
+    assert layer.breakers["interview_reply"].state == CircuitBreaker.CLOSED